@@ -0,0 +1,83 @@
+"""Скорость и размер снимков заказов: двоичный формат, JSON и pickle
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_codec --orders 2000 --lines 1 10 100
+
+Для каждого размера заказа выводятся кодирования и декодирования в
+секунду, средний размер снимка и чтение итога из OrderSnapshot без
+разбора линий.
+"""
+import argparse
+import pickle
+import random
+import time
+from decimal import Decimal
+from typing import Callable, List
+from src.domain.entities import Order
+from src.domain.value_objects import Money
+from src.infrastructure.serialization.order_codec import (
+    OrderSnapshot,
+    decode_order,
+    encode_order,
+    order_from_json,
+    order_to_json,
+)
+
+
+CODECS = {
+    "binary": (encode_order, decode_order),
+    "json": (lambda order: order_to_json(order, indent=None), order_from_json),
+    "pickle": (lambda order: pickle.dumps(order, pickle.HIGHEST_PROTOCOL), pickle.loads),
+}
+
+
+def make_orders(count: int, lines: int, seed: int = 42) -> List[Order]:
+    rnd = random.Random(seed)
+    orders = []
+    for i in range(count):
+        order = Order(id=f"order_{i}", customer_id=f"cust_{rnd.randrange(1000)}")
+        for j in range(lines):
+            price = Money(Decimal(rnd.randrange(1, 100000)) / 100, rnd.choice(("USD", "EUR")))
+            order.add_line(f"prod_{j}", f"Product {j}", rnd.randint(1, 10), price)
+        order.clear_events()
+        orders.append(order)
+    return orders
+
+
+def best_rate(operation: Callable[[], object], count: int, repeat: int) -> float:
+    """Операций в секунду в самом быстром из repeat прогонов"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best if best else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    
+    print(f"{'lines':>5} {'codec':<8} {'encode/s':>12} {'decode/s':>12} {'bytes':>8}")
+    for lines in args.lines:
+        orders = make_orders(args.orders, lines)
+        for name, (encode, decode) in CODECS.items():
+            snapshots = [encode(order) for order in orders]
+            encode_rate = best_rate(lambda: [encode(order) for order in orders], len(orders), args.repeat)
+            decode_rate = best_rate(lambda: [decode(data) for data in snapshots], len(orders), args.repeat)
+            size = sum(map(len, snapshots)) / len(snapshots)
+            print(f"{lines:>5} {name:<8} {encode_rate:>12,.0f} {decode_rate:>12,.0f} {size:>8.0f}")
+        
+        snapshots = [encode_order(order) for order in orders]
+        lazy_rate = best_rate(
+            lambda: [OrderSnapshot(data).subtotals for data in snapshots], len(orders), args.repeat
+        )
+        print(f"{lines:>5} {'lazy':<8} {'':>12} {lazy_rate:>12,.0f}   (OrderSnapshot.subtotals)")
+
+
+if __name__ == "__main__":
+    main()
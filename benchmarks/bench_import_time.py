@@ -0,0 +1,160 @@
+"""Время запуска: импорт пакета и подготовка обработчика оплаты
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_import_time --runs 5
+
+Каждый сценарий выполняется в отдельном интерпретаторе с -X importtime;
+учитываются только импорты, сделанные самим сценарием (без site и прочего
+запуска интерпретатора), в отчет попадает самый быстрый из runs прогонов.
+Код возврата 1, если сценарий превысил бюджет или загрузил модули, которые
+ему не нужны (например, sqlite3 для in-memory обработчика).
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MARKER = "-- scenario --"
+
+
+@dataclass(frozen=True)
+class ImportScenario:
+    """Сценарий запуска: код, бюджет и модули, которые он не должен загружать"""
+    code: str
+    budget_ms: float
+    forbidden: FrozenSet[str] = frozenset()
+
+
+# Адаптеры и тяжелые модули стандартной библиотеки, нужные только части процессов
+_ADAPTER_MODULES = frozenset({
+    "sqlite3",
+    "multiprocessing",
+    "concurrent.futures",
+    "asyncio",
+    "src.infrastructure.repositories.sqlite_order_repository",
+    "src.infrastructure.repositories.file_order_repository",
+    "src.infrastructure.payment_gateways.resilient_payment_gateway",
+    "src.application.settlement",
+})
+
+SCENARIOS: Dict[str, ImportScenario] = {
+    "facade": ImportScenario(
+        code="import src",
+        budget_ms=10.0,
+        forbidden=_ADAPTER_MODULES | {"src.domain", "src.application", "src.infrastructure"},
+    ),
+    "pay_order_worker": ImportScenario(
+        code=(
+            "import src\n"
+            "src.PayOrderUseCaseImpl(src.create_repository('memory'), src.create_payment_gateway('fake'))"
+        ),
+        budget_ms=150.0,
+        forbidden=_ADAPTER_MODULES,
+    ),
+}
+
+
+@dataclass
+class ImportTimeResult:
+    """Результат сценария"""
+    total_us: int
+    # (модуль, собственное время, время вместе с вложенными импортами) в мкс
+    modules: List[Tuple[str, int, int]] = field(default_factory=list)
+    
+    @property
+    def total_ms(self) -> float:
+        return self.total_us / 1000
+    
+    def loaded(self) -> List[str]:
+        return [name for name, _, _ in self.modules]
+    
+    def slowest(self, count: int = 10) -> List[Tuple[str, int, int]]:
+        """Модули с наибольшим собственным временем импорта"""
+        return sorted(self.modules, key=lambda module: module[1], reverse=True)[:count]
+
+
+def parse_importtime(output: str) -> ImportTimeResult:
+    """Разбор вывода -X importtime после маркера сценария
+    
+    Время сценария - сумма кумулятивных времен импортов верхнего уровня.
+    """
+    _, _, output = output.partition(_MARKER)
+    total = 0
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # заголовок таблицы
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+        # Вложенные импорты выводятся с отступом в два пробела на уровень
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+    return ImportTimeResult(total, modules)
+
+
+def measure(code: str, runs: int = 5, python: Optional[str] = None) -> ImportTimeResult:
+    """Самый быстрый из runs прогонов кода в новом интерпретаторе"""
+    script = f"import sys\nsys.stderr.write({_MARKER!r} + '\\n')\n{code}\n"
+    env = dict(os.environ)
+    # Пакет импортируется из корня проекта, а не из PYTHONPATH окружения
+    env.pop("PYTHONPATH", None)
+    best = None
+    for _ in range(max(runs, 1)):
+        completed = subprocess.run(
+            [python or sys.executable, "-X", "importtime", "-c", script],
+            cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, check=False,
+        )
+        if completed.returncode:
+            raise RuntimeError(f"Scenario failed:\n{completed.stderr}")
+        result = parse_importtime(completed.stderr)
+        if best is None or result.total_us < best.total_us:
+            best = result
+    return best
+
+
+def check_scenario(name: str, result: ImportTimeResult, budget_scale: float = 1.0) -> List[str]:
+    """Описания нарушений бюджета сценария"""
+    scenario = SCENARIOS[name]
+    problems = []
+    budget_ms = scenario.budget_ms * budget_scale
+    if result.total_ms > budget_ms:
+        problems.append(f"{name}: import time {result.total_ms:.1f}ms > budget {budget_ms:.1f}ms")
+    unexpected = sorted(scenario.forbidden.intersection(result.loaded()))
+    if unexpected:
+        problems.append(f"{name}: unexpected imports {', '.join(unexpected)}")
+    return problems
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="прогонов каждого сценария")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="запускать только указанные сценарии")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="множитель бюджетов (для медленных машин)")
+    parser.add_argument("--top", type=int, default=5, help="показать самые медленные модули")
+    args = parser.parse_args(argv)
+    
+    problems = []
+    for name in args.scenario or SCENARIOS:
+        result = measure(SCENARIOS[name].code, args.runs)
+        print(f"{name:<18} {result.total_ms:>8.1f} ms  (budget {SCENARIOS[name].budget_ms * args.budget_scale:.1f} ms)")
+        for module, self_us, cumulative_us in result.slowest(args.top):
+            print(f"    {module:<60} {self_us / 1000:>6.2f} ms self {cumulative_us / 1000:>7.2f} ms total")
+        problems.extend(check_scenario(name, result, args.budget_scale))
+    
+    for problem in problems:
+        print(f"REGRESSION {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Сверка заказов с журналом платежей: скорость и выгрузка на диск
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_reconciliation --orders 200000 --max-in-memory 1000000 50000
+
+Заказы и списания генерируются потоком (в памяти их нет целиком); для
+каждого max_in_memory выводятся записей в секунду, число выгруженных на
+диск записей и пиковый RSS процесса. Доля расхождений - около 1%.
+"""
+import argparse
+import random
+import resource
+import time
+from decimal import Decimal
+from typing import Iterator, Tuple
+from src.application.reconciliation import Reconciler
+from src.domain.entities import Order
+from src.domain.value_objects import Money
+
+
+def make_orders(count: int) -> Iterator[Order]:
+    for i in range(count):
+        order = Order(id=f"order_{i}", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal(i % 1000 + 1)))
+        order.pay()
+        yield order
+
+
+def make_charges(count: int, seed: int = 42) -> Iterator[Tuple[str, Money, bool]]:
+    rnd = random.Random(seed)
+    for i in range(count):
+        amount = Money(Decimal(i % 1000 + 1))
+        roll = rnd.random()
+        if roll < 0.003:
+            continue
+        if roll < 0.006:
+            yield f"order_{i}", amount, True
+        elif roll < 0.009:
+            amount = Money(amount.amount + 1)
+        elif roll < 0.02:
+            yield f"order_{i}", amount, False
+        yield f"order_{i}", amount, True
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=200000)
+    parser.add_argument("--partitions", type=int, default=64)
+    parser.add_argument("--max-in-memory", type=int, nargs="+", default=[1_000_000, 50_000])
+    args = parser.parse_args(argv)
+    
+    print(f"{'max_in_memory':>13} {'records/s':>12} {'spilled':>10} {'mismatches':>10} {'peak MB':>8}")
+    for max_in_memory in args.max_in_memory:
+        reconciler = Reconciler(partitions=args.partitions, max_in_memory=max_in_memory)
+        started = time.perf_counter()
+        report = reconciler.reconcile(make_orders(args.orders), make_charges(args.orders))
+        elapsed = time.perf_counter() - started
+        records = report.orders_checked + report.charges_checked
+        mismatches = sum(report.mismatches.values())
+        print(f"{max_in_memory:>13,} {records / elapsed:>12,.0f} {report.spilled_records:>10,} "
+              f"{mismatches:>10,} {peak_rss_mb():>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
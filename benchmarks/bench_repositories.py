@@ -0,0 +1,75 @@
+"""Сравнение пропускной способности репозиториев заказов
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_repositories --orders 2000 --lines 1 10 100
+"""
+import argparse
+import tempfile
+import time
+from decimal import Decimal
+from typing import Callable, Dict, List
+from src.domain.entities import Order
+from src.domain.interfaces import OrderRepository
+from src.domain.value_objects import Money
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.sqlite_order_repository import SQLiteOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+def make_orders(count: int, lines: int) -> List[Order]:
+    orders = []
+    for i in range(count):
+        order = Order(id=f"order_{i}", customer_id=f"cust_{i % 100}")
+        for j in range(lines):
+            order.add_line(f"prod_{j}", f"Product {j}", j % 5 + 1, Money(Decimal('9.99')))
+        orders.append(order)
+    return orders
+
+
+def measure(action: Callable[[], None], operations: int) -> float:
+    """Операций в секунду"""
+    started = time.perf_counter()
+    action()
+    return operations / (time.perf_counter() - started)
+
+
+def bench_repository(repository: OrderRepository, orders: List[Order]) -> Dict[str, float]:
+    ids = [order.id for order in orders]
+    use_case = PayOrderUseCaseImpl(repository, FakePaymentGateway())
+    
+    return {
+        "save": measure(lambda: [repository.save(order) for order in orders], len(orders)),
+        "save_many": measure(lambda: repository.save_many(orders), len(orders)),
+        "get": measure(lambda: [repository.get_by_id(order_id) for order_id in ids], len(ids)),
+        "get_many": measure(lambda: repository.get_many(ids), len(ids)),
+        "pay": measure(
+            lambda: [use_case.execute(PayOrderRequest(order_id=order_id)) for order_id in ids],
+            len(ids),
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=2000, help="число заказов")
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 10, 100], help="линий в заказе")
+    args = parser.parse_args(argv)
+    
+    print(f"{'backend':<10} {'lines':>6} " + " ".join(f"{name:>12}" for name in
+                                                   ("save", "save_many", "get", "get_many", "pay")))
+    for lines in args.lines:
+        with tempfile.TemporaryDirectory() as directory:
+            backends = {
+                "memory": InMemoryOrderRepository(),
+                "sqlite": SQLiteOrderRepository(f"{directory}/orders.db"),
+            }
+            for name, repository in backends.items():
+                results = bench_repository(repository, make_orders(args.orders, lines))
+                print(f"{name:<10} {lines:>6} " + " ".join(f"{ops:>12,.0f}" for ops in results.values()))
+            backends["sqlite"].close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Масштабирование многопроцессного расчета заказов по числу обработчиков
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_settlement --orders 20000 --lines 20 --workers 1 2 4 8
+
+Каждый обработчик строит свой in-memory репозиторий с заказами своего шарда,
+поэтому замер показывает масштабирование CPU-части оплаты (Decimal в Money)
+без конкуренции за общее хранилище. wall - полное время вместе с запуском
+процессов и построением заказов, pay - время оплаты в самом медленном шарде.
+"""
+import argparse
+import os
+from decimal import Decimal
+from src.domain.entities import Order
+from src.domain.value_objects import Money
+from src.application.dto import PayOrderRequest
+from src.application.settlement import ProcessSettlementRunner, SettlementContextFactory, shard_for
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class GeneratedOrdersFactory(SettlementContextFactory):
+    """Репозиторий с заказами шарда, сгенерированными в процессе обработчика"""
+    
+    def __init__(self, orders: int, lines: int):
+        self.orders = orders
+        self.lines = lines
+    
+    def create(self, shard, shards):
+        repository = InMemoryOrderRepository()
+        for i in range(self.orders):
+            order_id = f"order_{i}"
+            if shard_for(order_id, shards) != shard:
+                continue
+            order = Order(id=order_id, customer_id=f"cust_{i % 100}")
+            for j in range(self.lines):
+                order.add_line(f"prod_{j}", f"Product {j}", j % 5 + 1,
+                               Money(Decimal(i % 1000 + j) / 100))
+            repository.save(order)
+        return repository, FakePaymentGateway()
+    
+    def collect_charges(self, gateway):
+        # Журнал не нужен для замера - не гоняем его через pickle
+        return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args(argv)
+    
+    factory = GeneratedOrdersFactory(args.orders, args.lines)
+    requests = [PayOrderRequest(order_id=f"order_{i}") for i in range(args.orders)]
+    
+    print(f"{'workers':>7} {'wall s':>8} {'pay s':>8} {'orders/sec':>12} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        result = ProcessSettlementRunner(factory, workers=workers).run(requests)
+        pay_elapsed = max(shard.elapsed for shard in result.shards)
+        throughput = len(requests) / pay_elapsed
+        baseline = baseline or throughput
+        print(f"{workers:>7} {result.elapsed:>8.2f} {pay_elapsed:>8.2f} "
+              f"{throughput:>12,.0f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,577 @@
+"""Нагрузочный и длительный (soak) прогон оплаты заказов
+
+Запуск из корня проекта:
+    python -m benchmarks.soak --duration 60 --rate 500 --concurrency 8 \\
+        --repository sqlite --gateway-latency 0.002 --output soak.json
+
+Генератор создает заказы с перекошенным распределением числа линий
+(Парето), «горячими» покупателями и долей пустых заказов, повторяет
+часть отклоненных оплат и повторно присылает уже оплаченные заказы.
+Запросы подаются с заданной частотой (--rate, открытый цикл: задержка
+считается от запланированного момента, поэтому отставание генератора
+видно в хвосте задержек) или без пауз в --concurrency потоков (замкнутый
+цикл). Каждые --interval секунд фиксируются пропускная способность,
+p50/p95/p99, смесь исходов и память процесса; по окнам после прогрева
+считается прирост памяти в минуту. С --baseline результат сравнивается с
+сохраненным отчетом, как в benchmarks.suite; --max-memory-growth задает
+допустимый прирост (КиБ в минуту). При нарушении код возврата равен 1.
+
+С репозиторием memory память растет вместе с числом заказов - для поиска
+утечек удобнее file или sqlite. Остальное состояние прогона ограничено:
+отклоняемые шлюзом заказы определяются хешем ID (DeclinedOrders), журнал
+платежей шлюза держит в памяти последние записи и выгружает остальные
+во временный файл, а outbox репозиториям не передается, поэтому доменные
+события не записываются и не копятся.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from collections import deque
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from benchmarks.suite import compare_with_baseline, percentile
+from src.application.dto import PayOrderRequest, PayOrderResponse
+from src.application.interfaces import PayOrderUseCase
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.domain.entities import Order
+from src.domain.interfaces import OrderRepository
+from src.domain.value_objects import Money
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.registry import create_payment_gateway, create_repository
+
+
+REPOSITORIES = ("memory", "concurrent", "caching", "file", "sqlite")
+
+# Исходы по тексту ошибки PayOrderResponse
+_OUTCOMES = (
+    ("Payment failed", "payment_declined"),
+    ("Cannot pay empty order", "empty_order"),
+    ("Order is already paid", "already_paid"),
+    ("Payment request deadline exceeded", "deadline_exceeded"),
+)
+
+
+@dataclass
+class WorkloadParams:
+    """Параметры синтетического потока заказов"""
+    # Число линий - Парето с показателем line_alpha (меньше - длиннее хвост)
+    line_alpha: float = 1.5
+    max_lines: int = 100
+    # Доля заказов без линий
+    empty_rate: float = 0.01
+    customers: int = 100000
+    # Доля заказов от hot_customers самых активных покупателей
+    hot_customers: int = 50
+    hot_share: float = 0.3
+    # Доля запросов, повторно оплачивающих уже оплаченный заказ
+    duplicate_rate: float = 0.02
+    # Доля отклоненных и сбойных оплат, которые клиент повторяет
+    retry_rate: float = 0.5
+    # Повторов одного заказа не больше max_retries
+    max_retries: int = 3
+    # Доля заказов, которые шлюз отклоняет всегда
+    decline_rate: float = 0.01
+    currencies: List[str] = field(default_factory=lambda: ["USD"])
+    seed: int = 42
+
+
+class DeclinedOrders:
+    """Заказы, которые шлюз отклоняет всегда, - доля rate по crc32 ID
+    
+    Подставляется в fail_on_orders FakePaymentGateway вместо множества:
+    проверка зависит только от ID, поэтому память не растет с числом заказов.
+    """
+    
+    _SCALE = 1_000_000
+    
+    def __init__(self, rate: float, seed: int = 0):
+        self._threshold = int(rate * self._SCALE)
+        self._salt = f"{seed}:".encode("utf-8")
+    
+    def __contains__(self, order_id: str) -> bool:
+        return zlib.crc32(self._salt + order_id.encode("utf-8")) % self._SCALE < self._threshold
+
+
+class Workload:
+    """Потокобезопасный источник запросов оплаты
+    
+    Новый заказ создается и сохраняется в репозиторий в момент выдачи
+    запроса на него. Повторы неудачных оплат выдаются раньше новых
+    заказов. Генератор сам не увеличивает память при длительном прогоне:
+    для дублей хранятся только последние history оплаченных ID, в повторах -
+    только ожидающие заказы, а отклоняемые заказы (declined, для
+    fail_on_orders шлюза) определяются хешем ID, а не хранимым множеством.
+    """
+    
+    def __init__(self, params: WorkloadParams, repository: OrderRepository, history: int = 10000):
+        """
+        Args:
+            params: Параметры потока
+            repository: Репозиторий, в который сохраняются новые заказы
+            history: Сколько последних оплаченных ID помнить для дублей
+        """
+        self.params = params
+        self.repository = repository
+        self.declined = DeclinedOrders(params.decline_rate, params.seed)
+        self._random = random.Random(params.seed)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._paid: Deque[str] = deque(maxlen=history)
+        self._retries: Deque[str] = deque()
+        # order_id -> число выполненных повторов для заказов в _retries
+        self._attempts: Dict[str, int] = {}
+    
+    def next_request(self) -> Tuple[str, PayOrderRequest]:
+        """Следующий запрос и его вид: new, retry или duplicate"""
+        with self._lock:
+            if self._retries:
+                return "retry", PayOrderRequest(order_id=self._retries.popleft())
+            if self._paid and self._random.random() < self.params.duplicate_rate:
+                order_id = self._paid[self._random.randrange(len(self._paid))]
+                return "duplicate", PayOrderRequest(order_id=order_id)
+            order = self._make_order(f"soak_{self._created}")
+            self._created += 1
+        
+        self.repository.save(order)
+        return "new", PayOrderRequest(order_id=order.id)
+    
+    def record(self, request: PayOrderRequest, response: Optional[PayOrderResponse]):
+        """Учет результата: оплаченные - кандидаты в дубли, часть неудачных - в повторы"""
+        with self._lock:
+            order_id = request.order_id
+            attempts = self._attempts.pop(order_id, 0)
+            if response is not None and response.success:
+                self._paid.append(order_id)
+            elif classify(response) in ("payment_declined", "unexpected_error", "exception") \
+                    and attempts < self.params.max_retries \
+                    and self._random.random() < self.params.retry_rate:
+                self._attempts[order_id] = attempts + 1
+                self._retries.append(order_id)
+    
+    @property
+    def created(self) -> int:
+        return self._created
+    
+    def _make_order(self, order_id: str) -> Order:
+        params, rnd = self.params, self._random
+        if rnd.random() < params.hot_share:
+            customer = rnd.randrange(params.hot_customers)
+        else:
+            customer = rnd.randrange(params.customers)
+        order = Order(id=order_id, customer_id=f"cust_{customer}")
+        
+        if rnd.random() >= params.empty_rate:
+            lines = min(params.max_lines, int(rnd.paretovariate(params.line_alpha)))
+            currency = rnd.choice(params.currencies)
+            for j in range(lines):
+                price = Money(Decimal(rnd.randrange(1, 100000)) / 100, currency)
+                order.add_line(f"prod_{j}", f"Product {j}", rnd.randint(1, 5), price)
+        order.clear_events()
+        return order
+
+
+def classify(response: Optional[PayOrderResponse]) -> str:
+    """Исход запроса для смеси ошибок (None - исключение из execute)"""
+    if response is None:
+        return "exception"
+    if response.success:
+        return "success"
+    message = response.error_message or ""
+    for text, outcome in _OUTCOMES:
+        if message == text:
+            return outcome
+    if message.startswith("Unexpected error"):
+        return "unexpected_error"
+    if message.endswith("not found"):
+        return "order_not_found"
+    return "other_error"
+
+
+class LatencyHistogram:
+    """Гистограмма задержек с логарифмическими корзинами (точность ~2%)
+    
+    Занимает память по числу различных корзин, а не запросов, поэтому
+    годится для перцентилей за весь длительный прогон.
+    """
+    
+    _BASE = math.log(1.02)
+    
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.max = 0.0
+    
+    def observe(self, seconds: float):
+        index = math.ceil(math.log(seconds) / self._BASE) if seconds > 0 else -10 ** 6
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+    
+    def percentile(self, fraction: float) -> float:
+        """Верхняя граница корзины, в которую попадает перцентиль"""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(math.exp(index * self._BASE), self.max)
+        return self.max
+
+
+@dataclass
+class WindowStats:
+    """Показатели одного интервала прогона"""
+    # Начало окна от старта прогона
+    offset_s: float
+    requests: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    memory_kb: float
+    outcomes: Dict[str, int]
+
+
+def memory_kb(traced: bool = False) -> float:
+    """Текущая память процесса: RSS или (traced) память Python по tracemalloc"""
+    if traced:
+        return tracemalloc.get_traced_memory()[0] / 1024
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # Вне Linux - пиковый RSS (на macOS в байтах)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 if sys.platform == "darwin" else peak
+
+
+class SoakRecorder:
+    """Сбор задержек и исходов по окнам"""
+    
+    def __init__(self, clock: Callable[[], float] = time.perf_counter, trace_memory: bool = False):
+        self._clock = clock
+        self._trace_memory = trace_memory
+        self._lock = threading.Lock()
+        self.started = clock()
+        self._window_started = self.started
+        self._latencies: List[float] = []
+        self._outcomes: Dict[str, int] = {}
+        self.windows: List[WindowStats] = []
+        self.histogram = LatencyHistogram()
+        self.outcomes: Dict[str, int] = {}
+        self.kinds: Dict[str, int] = {}
+    
+    def record(self, kind: str, outcome: str, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            self.kinds[kind] = self.kinds.get(kind, 0) + 1
+            self.histogram.observe(latency)
+    
+    def pending(self) -> int:
+        """Число запросов в незакрытом окне"""
+        with self._lock:
+            return len(self._latencies)
+    
+    def roll(self) -> WindowStats:
+        """Закрытие текущего окна"""
+        with self._lock:
+            now = self._clock()
+            latencies, self._latencies = self._latencies, []
+            outcomes, self._outcomes = self._outcomes, {}
+            started, self._window_started = self._window_started, now
+        
+        for outcome, count in outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + count
+        latencies.sort()
+        elapsed = now - started
+        window = WindowStats(
+            offset_s=started - self.started,
+            requests=len(latencies),
+            throughput=len(latencies) / elapsed if elapsed > 0 else 0.0,
+            p50_ms=percentile(latencies, 0.50) * 1e3,
+            p95_ms=percentile(latencies, 0.95) * 1e3,
+            p99_ms=percentile(latencies, 0.99) * 1e3,
+            max_ms=latencies[-1] * 1e3 if latencies else 0.0,
+            memory_kb=memory_kb(self._trace_memory),
+            outcomes=outcomes,
+        )
+        self.windows.append(window)
+        return window
+
+
+def memory_growth_per_minute(windows: Sequence[WindowStats], warmup: int = 1) -> float:
+    """Наклон памяти (КиБ в минуту) по методу наименьших квадратов без первых warmup окон"""
+    points = [(window.offset_s, window.memory_kb) for window in windows[warmup:]]
+    if len(points) < 2:
+        return 0.0
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_m = sum(m for _, m in points) / len(points)
+    variance = sum((t - mean_t) ** 2 for t, _ in points)
+    if not variance:
+        return 0.0
+    slope = sum((t - mean_t) * (m - mean_m) for t, m in points) / variance
+    return slope * 60
+
+
+def run_soak(use_case: PayOrderUseCase, workload: Workload, duration: float,
+             rate: Optional[float] = None, concurrency: int = 1, interval: float = 1.0,
+             max_requests: Optional[int] = None, warmup: int = 1, trace_memory: bool = False,
+             on_window: Optional[Callable[[WindowStats], None]] = None) -> dict:
+    """Прогон use_case потоком запросов workload; возвращает отчет для JSON
+    
+    Args:
+        use_case: Use Case оплаты (PayOrderUseCaseImpl, PaymentScheduler и т.п.)
+        workload: Источник запросов
+        duration: Длительность в секундах
+        rate: Запросов в секунду (None - замкнутый цикл без пауз)
+        concurrency: Число потоков, выполняющих запросы
+        interval: Длина окна статистики в секундах
+        max_requests: Остановиться после стольких запросов (None - по времени)
+        warmup: Сколько первых окон не учитывать в приросте памяти
+        trace_memory: Мерить память Python через tracemalloc (точнее, но медленнее)
+        on_window: Вызывается после каждого окна (для вывода по ходу прогона)
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be positive")
+    if rate is not None and rate <= 0:
+        raise ValueError("rate must be positive")
+    if interval <= 0:
+        raise ValueError("interval must be positive")
+    
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        recorder = SoakRecorder(trace_memory=trace_memory)
+        started = recorder.started
+        deadline = started + duration
+        issued = [0]
+        issue_lock = threading.Lock()
+        stop = threading.Event()
+        finished = threading.Event()
+        active = [concurrency]
+        perf_counter = time.perf_counter
+        
+        def next_slot() -> Optional[float]:
+            """Запланированный момент следующего запроса; None - прогон окончен"""
+            with issue_lock:
+                sequence = issued[0]
+                if max_requests is not None and sequence >= max_requests:
+                    return None
+                issued[0] += 1
+            scheduled = started + sequence / rate if rate is not None else perf_counter()
+            return scheduled if scheduled < deadline and not stop.is_set() else None
+        
+        def worker():
+            try:
+                while True:
+                    scheduled = next_slot()
+                    if scheduled is None:
+                        return
+                    # Заказ создается до паузы: сохранение не входит в задержку оплаты
+                    kind, request = workload.next_request()
+                    delay = scheduled - perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    # Открытый цикл: задержка от запланированного момента
+                    request_started = scheduled if rate is not None else perf_counter()
+                    try:
+                        response = use_case.execute(request)
+                    except Exception:
+                        response = None
+                    recorder.record(kind, classify(response), perf_counter() - request_started)
+                    workload.record(request, response)
+            finally:
+                with issue_lock:
+                    active[0] -= 1
+                    if not active[0]:
+                        finished.set()
+        
+        threads = [
+            threading.Thread(target=worker, name=f"soak-{index}", daemon=True)
+            for index in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            memory_start = memory_kb(trace_memory)
+            while not finished.is_set():
+                window_end = recorder.started + (len(recorder.windows) + 1) * interval
+                finished.wait(max(0.0, window_end - perf_counter()))
+                if perf_counter() >= window_end:
+                    window = recorder.roll()
+                    if on_window is not None:
+                        on_window(window)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        if recorder.pending():
+            window = recorder.roll()
+            if on_window is not None:
+                on_window(window)
+        elapsed = perf_counter() - started
+        memory_end = memory_kb(trace_memory)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    
+    histogram = recorder.histogram
+    requests = histogram.count
+    return {
+        "params": {
+            "mode": "open" if rate is not None else "closed",
+            "rate": rate,
+            "concurrency": concurrency,
+            "duration": duration,
+            "workload": asdict(workload.params),
+        },
+        # Формат results совпадает с benchmarks.suite для compare_with_baseline
+        "results": {
+            "soak": {
+                "ops_per_sec": requests / elapsed if elapsed else 0.0,
+                "p50_us": histogram.percentile(0.50) * 1e6,
+                "p99_us": histogram.percentile(0.99) * 1e6,
+                "p999_us": histogram.percentile(0.999) * 1e6,
+                "max_us": histogram.max * 1e6,
+            },
+        },
+        "requests": requests,
+        "orders_created": workload.created,
+        "elapsed_s": elapsed,
+        "outcomes": dict(recorder.outcomes),
+        "kinds": dict(recorder.kinds),
+        "memory": {
+            "source": "tracemalloc" if trace_memory else "rss",
+            "start_kb": memory_start,
+            "end_kb": memory_end,
+            "growth_kb_per_min": memory_growth_per_minute(recorder.windows, warmup),
+        },
+        "windows": [asdict(window) for window in recorder.windows],
+    }
+
+
+def make_repository(name: str, stack: ExitStack) -> OrderRepository:
+    if name in ("file", "sqlite"):
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        if name == "file":
+            return stack.enter_context(create_repository("file", directory, sync_every=1000))
+        return stack.enter_context(create_repository("sqlite", f"{directory}/orders.db"))
+    if name == "caching":
+        return create_repository("caching", create_repository("memory"))
+    return create_repository(name)
+
+
+def make_gateway(args, declined: DeclinedOrders, stack: ExitStack) -> FakePaymentGateway:
+    """Шлюз с журналом, выгружающим все записи, кроме последних, во временный файл"""
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    gateway = FakePaymentGateway(
+        fail_on_orders=declined, latency=args.gateway_latency, error_rate=args.gateway_error_rate,
+        seed=args.seed, log_capacity=10000, spill_path=os.path.join(directory, "charges.csv"),
+    )
+    stack.callback(gateway.charges_log.close)
+    return gateway
+
+
+def format_window(window: WindowStats) -> str:
+    errors = sum(count for outcome, count in window.outcomes.items() if outcome != "success")
+    return (f"{window.offset_s:>7.1f}s {window.throughput:>10,.0f}/s {window.p50_ms:>8.2f} "
+            f"{window.p95_ms:>8.2f} {window.p99_ms:>8.2f} {window.max_ms:>9.2f} "
+            f"{errors:>7} {window.memory_kb / 1024:>9.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="длительность в секундах")
+    parser.add_argument("--rate", type=float, help="запросов в секунду (без - замкнутый цикл)")
+    parser.add_argument("--concurrency", type=int, default=4, help="потоков-клиентов")
+    parser.add_argument("--interval", type=float, default=1.0, help="окно статистики в секундах")
+    parser.add_argument("--max-requests", type=int, help="остановиться после стольких запросов")
+    parser.add_argument("--repository", choices=REPOSITORIES, default="memory")
+    parser.add_argument("--resilient", action="store_true", help="обернуть шлюз в ResilientPaymentGateway")
+    parser.add_argument("--gateway-latency", type=float, default=0.0, help="задержка шлюза в секундах")
+    parser.add_argument("--gateway-error-rate", type=float, default=0.0, help="доля сбоев связи со шлюзом")
+    parser.add_argument("--decline-rate", type=float, default=0.01, help="доля заказов, отклоняемых шлюзом")
+    parser.add_argument("--empty-rate", type=float, default=0.01, help="доля пустых заказов")
+    parser.add_argument("--duplicate-rate", type=float, default=0.02, help="доля повторных оплат")
+    parser.add_argument("--retry-rate", type=float, default=0.5, help="доля повторяемых неудачных оплат")
+    parser.add_argument("--max-retries", type=int, default=3, help="повторов одного заказа")
+    parser.add_argument("--line-alpha", type=float, default=1.5, help="показатель Парето для числа линий")
+    parser.add_argument("--currencies", nargs="+", default=["USD"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--trace-memory", action="store_true", help="мерить память через tracemalloc")
+    parser.add_argument("--warmup", type=int, default=1, help="окон прогрева без учета памяти")
+    parser.add_argument("--output", help="файл для сохранения отчета в JSON")
+    parser.add_argument("--baseline", help="базовый отчет для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="допустимое ухудшение (доля)")
+    parser.add_argument("--max-memory-growth", type=float, help="допустимый прирост памяти, КиБ в минуту")
+    args = parser.parse_args(argv)
+    
+    params = WorkloadParams(
+        line_alpha=args.line_alpha,
+        empty_rate=args.empty_rate,
+        duplicate_rate=args.duplicate_rate,
+        retry_rate=args.retry_rate,
+        max_retries=args.max_retries,
+        decline_rate=args.decline_rate,
+        currencies=args.currencies,
+        seed=args.seed,
+    )
+    with ExitStack() as stack:
+        repository = make_repository(args.repository, stack)
+        workload = Workload(params, repository)
+        gateway = make_gateway(args, workload.declined, stack)
+        payment_gateway = create_payment_gateway("resilient", gateway) if args.resilient else gateway
+        use_case = PayOrderUseCaseImpl(repository, payment_gateway)
+        
+        print(f"{'offset':>8} {'throughput':>12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'max ms':>9} {'errors':>7} {'mem MiB':>9}")
+        report = run_soak(
+            use_case, workload, args.duration, rate=args.rate, concurrency=args.concurrency,
+            interval=args.interval, max_requests=args.max_requests, warmup=args.warmup,
+            trace_memory=args.trace_memory, on_window=lambda window: print(format_window(window)),
+        )
+    
+    result = report["results"]["soak"]
+    print(f"\n{report['requests']:,} requests, {result['ops_per_sec']:,.0f}/s, "
+          f"p50 {result['p50_us'] / 1e3:.2f} ms, p99 {result['p99_us'] / 1e3:.2f} ms, "
+          f"p99.9 {result['p999_us'] / 1e3:.2f} ms")
+    print("outcomes: " + ", ".join(f"{name}={count}" for name, count in sorted(report["outcomes"].items())))
+    print(f"memory growth: {report['memory']['growth_kb_per_min']:,.0f} KiB/min ({report['memory']['source']})")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    
+    problems = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("params") != report["params"]:
+            print("warning: baseline was recorded with different parameters", file=sys.stderr)
+        problems.extend(compare_with_baseline(report, baseline, args.tolerance))
+    growth = report["memory"]["growth_kb_per_min"]
+    if args.max_memory_growth is not None and growth > args.max_memory_growth:
+        problems.append(f"memory growth {growth:,.0f} KiB/min > {args.max_memory_growth:,.0f} KiB/min")
+    for problem in problems:
+        print(f"REGRESSION {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""Набор бенчмарков горячего пути оплаты
+
+Запуск из корня проекта:
+    python -m benchmarks.suite --lines 10 --orders 2000 --currencies USD EUR \\
+        --failure-rate 0.05 --output results.json --baseline benchmarks/baseline.json
+
+Для каждого сценария выводятся операции в секунду, задержки p50/p99 и
+пиковая память (tracemalloc). С --baseline результаты сравниваются с
+сохраненными, и при регрессии больше --tolerance код возврата равен 1.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence
+from src.domain.entities import Order
+from src.domain.interfaces import OrderRepository
+from src.domain.value_objects import Money
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.file_order_repository import FileOrderRepository
+from src.infrastructure.repositories.sqlite_order_repository import SQLiteOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+BACKENDS = ("memory", "file", "sqlite")
+
+
+@dataclass
+class BenchmarkParams:
+    """Параметры запуска"""
+    lines: int = 10
+    orders: int = 2000
+    currencies: List[str] = field(default_factory=lambda: ["USD"])
+    failure_rate: float = 0.0
+    backend: str = "memory"
+    seed: int = 42
+
+
+@dataclass
+class BenchmarkResult:
+    """Результат одного сценария"""
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+    peak_memory_kb: float
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Перцентиль по отсортированной выборке (метод ближайшего ранга)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_timed(operations: List[Callable[[], object]], trace_memory: bool = False) -> BenchmarkResult:
+    """Выполнение операций с замером задержки каждой
+    
+    tracemalloc заметно замедляет выполнение, поэтому пиковая память
+    измеряется отдельным прогоном (trace_memory=True).
+    """
+    latencies = []
+    perf_counter = time.perf_counter
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        started = perf_counter()
+        for operation in operations:
+            operation_started = perf_counter()
+            operation()
+            latencies.append(perf_counter() - operation_started)
+        elapsed = perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    
+    latencies.sort()
+    return BenchmarkResult(
+        ops_per_sec=len(operations) / elapsed if elapsed else 0.0,
+        p50_us=percentile(latencies, 0.50) * 1e6,
+        p99_us=percentile(latencies, 0.99) * 1e6,
+        peak_memory_kb=peak / 1024,
+    )
+
+
+def make_order(order_id: str, lines: int, currency: str, rnd: random.Random) -> Order:
+    order = Order(id=order_id, customer_id=f"cust_{rnd.randrange(1000)}")
+    for j in range(lines):
+        price = Money(Decimal(rnd.randrange(1, 100000)) / 100, currency)
+        order.add_line(f"prod_{j}", f"Product {j}", rnd.randint(1, 10), price)
+    return order
+
+
+def make_repository(backend: str, stack: ExitStack) -> OrderRepository:
+    if backend == "memory":
+        return InMemoryOrderRepository()
+    directory = stack.enter_context(tempfile.TemporaryDirectory())
+    if backend == "file":
+        return stack.enter_context(FileOrderRepository(directory, sync_every=1000))
+    if backend == "sqlite":
+        return stack.enter_context(SQLiteOrderRepository(f"{directory}/orders.db"))
+    raise ValueError(f"Unknown backend {backend}")
+
+
+def bench_money_arithmetic(params: BenchmarkParams, trace_memory: bool = False) -> BenchmarkResult:
+    rnd = random.Random(params.seed)
+    pairs = [
+        (Money(Decimal(rnd.randrange(100000)) / 100, currency),
+         Money(Decimal(rnd.randrange(100000)) / 100, currency))
+        for currency in (rnd.choice(params.currencies) for _ in range(params.orders))
+    ]
+    return run_timed([lambda a=a, b=b: a + b * 3 for a, b in pairs], trace_memory)
+
+
+def bench_order_build(params: BenchmarkParams, trace_memory: bool = False) -> BenchmarkResult:
+    rnd = random.Random(params.seed)
+    currencies = [rnd.choice(params.currencies) for _ in range(params.orders)]
+    return run_timed([
+        lambda i=i, currency=currency: make_order(f"order_{i}", params.lines, currency, rnd).total_amount
+        for i, currency in enumerate(currencies)
+    ], trace_memory)
+
+
+def bench_total_amount(params: BenchmarkParams, trace_memory: bool = False) -> BenchmarkResult:
+    rnd = random.Random(params.seed)
+    orders = [
+        make_order(f"order_{i}", max(params.lines, 1), rnd.choice(params.currencies), rnd)
+        for i in range(params.orders)
+    ]
+    
+    def edit_and_total(order: Order) -> Money:
+        # Изменение линии сбрасывает кеш суммы
+        order.update_quantity("prod_0", rnd.randint(1, 10))
+        return order.total_amount
+    
+    return run_timed([lambda order=order: edit_and_total(order) for order in orders], trace_memory)
+
+
+def bench_pay_order(params: BenchmarkParams, trace_memory: bool = False) -> BenchmarkResult:
+    rnd = random.Random(params.seed)
+    with ExitStack() as stack:
+        repository = make_repository(params.backend, stack)
+        order_ids = [f"order_{i}" for i in range(params.orders)]
+        repository.save_many(
+            make_order(order_id, params.lines, rnd.choice(params.currencies), rnd)
+            for order_id in order_ids
+        )
+        gateway = FakePaymentGateway(fail_on_orders={
+            order_id for order_id in order_ids if rnd.random() < params.failure_rate
+        })
+        use_case = PayOrderUseCaseImpl(repository, gateway)
+        return run_timed([
+            lambda order_id=order_id: use_case.execute(PayOrderRequest(order_id=order_id))
+            for order_id in order_ids
+        ], trace_memory)
+
+
+SCENARIOS: Dict[str, Callable[[BenchmarkParams, bool], BenchmarkResult]] = {
+    "money_arithmetic": bench_money_arithmetic,
+    "order_build": bench_order_build,
+    "total_amount": bench_total_amount,
+    "pay_order": bench_pay_order,
+}
+
+
+def run_suite(params: BenchmarkParams, scenarios: Optional[Sequence[str]] = None,
+              repeat: int = 3) -> dict:
+    """Запуск сценариев; возвращает отчет, пригодный для сохранения в JSON
+    
+    Каждый сценарий выполняется repeat раз, в отчет попадает самый быстрый
+    прогон - он меньше всего искажен фоновой нагрузкой.
+    """
+    results = {}
+    for name in scenarios or SCENARIOS:
+        result = max(
+            (SCENARIOS[name](params, False) for _ in range(max(repeat, 1))),
+            key=lambda run: run.ops_per_sec,
+        )
+        result.peak_memory_kb = SCENARIOS[name](params, True).peak_memory_kb
+        results[name] = asdict(result)
+    return {
+        "params": asdict(params),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare_with_baseline(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Описания регрессий относительно базового отчета
+    
+    Регрессией считается падение ops/sec или рост p99 больше чем на tolerance.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: ops/sec {result['ops_per_sec']:,.0f} < baseline {base['ops_per_sec']:,.0f}"
+            )
+        if result["p99_us"] > base["p99_us"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p99 {result['p99_us']:.1f}us > baseline {base['p99_us']:.1f}us"
+            )
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    rows = [f"{'scenario':<18} {'ops/sec':>12} {'p50 us':>10} {'p99 us':>10} {'peak KiB':>10}"]
+    for name, result in report["results"].items():
+        rows.append(
+            f"{name:<18} {result['ops_per_sec']:>12,.0f} {result['p50_us']:>10.1f} "
+            f"{result['p99_us']:>10.1f} {result['peak_memory_kb']:>10.0f}"
+        )
+    return "\n".join(rows)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=10, help="линий в заказе")
+    parser.add_argument("--orders", type=int, default=2000, help="число заказов (операций)")
+    parser.add_argument("--currencies", nargs="+", default=["USD"], help="валюты заказов")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="доля отказов шлюза")
+    parser.add_argument("--backend", choices=BACKENDS, default="memory", help="репозиторий для pay_order")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="запускать только указанные сценарии")
+    parser.add_argument("--repeat", type=int, default=3, help="прогонов каждого сценария")
+    parser.add_argument("--output", help="файл для сохранения отчета в JSON")
+    parser.add_argument("--baseline", help="базовый отчет для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="допустимое ухудшение (доля)")
+    args = parser.parse_args(argv)
+    
+    params = BenchmarkParams(
+        lines=args.lines,
+        orders=args.orders,
+        currencies=args.currencies,
+        failure_rate=args.failure_rate,
+        backend=args.backend,
+        seed=args.seed,
+    )
+    report = run_suite(params, args.scenario, args.repeat)
+    print(format_report(report))
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("params") != report["params"]:
+            print("warning: baseline was recorded with different parameters", file=sys.stderr)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
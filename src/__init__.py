@@ -0,0 +1,44 @@
+"""Система оплаты заказов
+
+Публичный API собран здесь; модули загружаются при первом обращении к
+имени, поэтому `import src` почти ничего не стоит, а адаптеры
+инфраструктуры создаются через create_repository/create_payment_gateway.
+"""
+import importlib
+
+
+# Имя -> модуль (относительно пакета src), в котором оно определено.
+# typing здесь не импортируется: его загрузка дороже всего пакета
+_EXPORTS = {
+    "Order": ".domain.entities",
+    "OrderLine": ".domain.entities",
+    "OrderStatus": ".domain.entities",
+    "Money": ".domain.value_objects",
+    "MoneyBag": ".domain.value_objects",
+    "DomainException": ".domain.exceptions",
+    "OrderRepository": ".domain.interfaces",
+    "PaymentGateway": ".domain.interfaces",
+    "PayOrderRequest": ".application.dto",
+    "PayOrderResponse": ".application.dto",
+    "PayOrderUseCaseImpl": ".application.use_cases",
+    "PayOrdersBatchUseCaseImpl": ".application.use_cases",
+    "IdempotencyCache": ".application.idempotency",
+    "create_repository": ".infrastructure.registry",
+    "create_payment_gateway": ".infrastructure.registry",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Следующие обращения не проходят через __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
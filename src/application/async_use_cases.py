@@ -0,0 +1,102 @@
+import asyncio
+from typing import Iterable, List, Optional
+from .dto import PayOrderRequest, PayOrderResponse
+from .interfaces import AsyncPayOrderUseCase
+from ..domain.entities import Order
+from ..domain.interfaces import AsyncOrderRepository, AsyncPaymentGateway
+from ..domain.exceptions import DomainException
+
+
+class AsyncPayOrderUseCaseImpl(AsyncPayOrderUseCase):
+    """Асинхронная реализация Use Case оплаты заказа"""
+    
+    def __init__(self, order_repository: AsyncOrderRepository, payment_gateway: AsyncPaymentGateway):
+        self.order_repository = order_repository
+        self.payment_gateway = payment_gateway
+    
+    async def execute(self, request: PayOrderRequest) -> PayOrderResponse:
+        """Выполнение оплаты заказа"""
+        try:
+            order: Optional[Order] = await self.order_repository.get_by_id(request.order_id)
+            
+            if not order:
+                return PayOrderResponse(
+                    success=False,
+                    order_id=request.order_id,
+                    error_message=f"Order {request.order_id} not found"
+                )
+            
+            original_status = order.status
+            
+            try:
+                # Статус меняется до ожидания шлюза, поэтому параллельная
+                # оплата того же экземпляра заказа получит OrderAlreadyPaidException
+                order.pay()
+                amount = order.total_amount
+                
+                payment_success = await self.payment_gateway.charge(order.id, amount)
+                
+                if not payment_success:
+                    order.revert_payment(original_status)
+                    return PayOrderResponse(
+                        success=False,
+                        order_id=order.id,
+                        error_message="Payment failed"
+                    )
+                
+                await self.order_repository.save(order)
+                
+                return PayOrderResponse(
+                    success=True,
+                    order_id=order.id,
+                    amount_paid=str(amount)
+                )
+            
+            except BaseException:
+                # Включая asyncio.CancelledError
+                order.revert_payment(original_status)
+                raise
+        
+        except DomainException as e:
+            return PayOrderResponse(
+                success=False,
+                order_id=request.order_id,
+                error_message=str(e)
+            )
+        except Exception as e:
+            return PayOrderResponse(
+                success=False,
+                order_id=request.order_id,
+                error_message=f"Unexpected error: {str(e)}"
+            )
+
+
+class AsyncPaymentRunner:
+    """Параллельное выполнение оплат с ограничением числа одновременных запросов
+    
+    Запускает concurrency обработчиков, которые разбирают общий поток запросов,
+    поэтому в памяти одновременно находится не больше concurrency незавершенных оплат.
+    """
+    
+    def __init__(self, use_case: AsyncPayOrderUseCase, concurrency: int = 10):
+        if concurrency < 1:
+            raise ValueError("concurrency must be positive")
+        
+        self.use_case = use_case
+        self.concurrency = concurrency
+    
+    async def run(self, requests: Iterable[PayOrderRequest]) -> List[PayOrderResponse]:
+        """Оплата всех запросов; ответы возвращаются в порядке запросов"""
+        responses: List[Optional[PayOrderResponse]] = []
+        pending = enumerate(requests)
+        
+        async def worker():
+            # Итератор общий для всех обработчиков: next() выполняется
+            # без переключения корутин, поэтому каждый запрос берется один раз
+            for index, request in pending:
+                responses.append(None)
+                response = await self.use_case.execute(request)
+                responses[index] = response
+        
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return responses
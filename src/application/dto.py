@@ -6,6 +6,8 @@ from typing import Optional
 class PayOrderRequest:
     """DTO для запроса на оплату заказа"""
     order_id: str
+    # Ключ идемпотентности: повторы с тем же ключом получают сохраненный ответ
+    idempotency_key: Optional[str] = None
 
 
 @dataclass
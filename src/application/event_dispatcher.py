@@ -0,0 +1,66 @@
+import threading
+from typing import List, Optional
+from ..domain.interfaces import EventOutbox, EventSubscriber
+
+
+class OutboxDispatcher:
+    """Пакетная доставка событий из outbox подписчикам
+    
+    Пакет отмечается доставленным только после того, как его обработали
+    все подписчики. Если подписчик упал, пакет остается в outbox и будет
+    доставлен повторно (в том числе уже обработавшим его подписчикам) -
+    семантика не менее одного раза. Опрашивается только outbox, а не
+    хранилище заказов.
+    """
+    
+    def __init__(self, outbox: EventOutbox, subscribers: Optional[List[EventSubscriber]] = None,
+                 batch_size: int = 100):
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        
+        self.outbox = outbox
+        self.subscribers: List[EventSubscriber] = list(subscribers or [])
+        self.batch_size = batch_size
+        self.delivered = 0
+        self.failures = 0
+    
+    def subscribe(self, subscriber: EventSubscriber):
+        """Добавление подписчика"""
+        self.subscribers.append(subscriber)
+    
+    def dispatch_once(self) -> int:
+        """Доставка одного пакета; возвращает число доставленных сообщений"""
+        messages = self.outbox.fetch_pending(self.batch_size)
+        if not messages:
+            return 0
+        
+        for subscriber in self.subscribers:
+            subscriber.handle(messages)
+        
+        self.outbox.mark_delivered(message.id for message in messages)
+        self.delivered += len(messages)
+        return len(messages)
+    
+    def dispatch_pending(self) -> int:
+        """Доставка всех накопленных сообщений"""
+        total = 0
+        while True:
+            delivered = self.dispatch_once()
+            if not delivered:
+                return total
+            total += delivered
+    
+    def run(self, stop: threading.Event, poll_interval: float = 0.5, retry_interval: float = 1.0):
+        """Цикл доставки до установки stop
+        
+        При пустом outbox ждет poll_interval, после сбоя подписчика - retry_interval.
+        """
+        while not stop.is_set():
+            try:
+                delivered = self.dispatch_pending()
+            except Exception:
+                self.failures += 1
+                stop.wait(retry_interval)
+                continue
+            if not delivered:
+                stop.wait(poll_interval)
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from .dto import PayOrderResponse
+
+
+class IdempotencyCache:
+    """Ограниченный LRU-кеш ответов по ключу идемпотентности с TTL
+    
+    claim(key) сериализует обработку одного ключа: повторный запрос,
+    пришедший во время выполнения первого, ждет его завершения и получает
+    сохраненный ответ вместо второго обращения к репозиторию и шлюзу.
+    """
+    
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_size: Максимальное число хранимых ответов
+            ttl: Время жизни ответа в секундах (None - без ограничения)
+            clock: Источник времени (для тестов)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._responses: "OrderedDict[str, Tuple[float, PayOrderResponse]]" = OrderedDict()
+        # key -> [блокировка ключа, число потоков, работающих с ключом]
+        self._claims: Dict[str, List] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[PayOrderResponse]:
+        """Сохраненный ответ по ключу или None"""
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is not None and self.ttl is not None and self._clock() - entry[0] > self.ttl:
+                del self._responses[key]
+                entry = None
+            
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key: str, response: PayOrderResponse):
+        """Сохранение ответа по ключу"""
+        with self._lock:
+            self._responses[key] = (self._clock(), response)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+    
+    @contextmanager
+    def claim(self, key: str) -> Iterator[Optional[PayOrderResponse]]:
+        """Монопольная обработка ключа; возвращает сохраненный ответ или None"""
+        with self._lock:
+            entry = self._claims.get(key)
+            if entry is None:
+                entry = self._claims[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        
+        try:
+            with entry[0]:
+                yield self.get(key)
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._claims[key]
+    
+    @property
+    def hit_ratio(self) -> float:
+        """Доля попаданий в кеш"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def stats(self) -> Dict[str, float]:
+        """Счетчики кеша для метрик"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+            "size": len(self),
+        }
+    
+    def __len__(self) -> int:
+        return len(self._responses)
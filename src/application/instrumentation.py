@@ -0,0 +1,185 @@
+from time import perf_counter
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .metrics import MetricsRegistry, Histogram
+from ..domain.entities import Order, OrderStatus
+from ..domain.interfaces import OrderRepository, PaymentGateway
+from ..domain.value_objects import Money
+
+
+class _NullStage:
+    """Пустой этап: используется, когда инструментирование выключено"""
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _StageTimer:
+    """Замер длительности этапа в гистограмму"""
+    __slots__ = ('_histogram', '_name', '_clock', '_started')
+    
+    def __init__(self, histogram: Histogram, name: str, clock: Callable[[], float]):
+        self._histogram = histogram
+        self._name = name
+        self._clock = clock
+    
+    def __enter__(self):
+        self._started = self._clock()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._histogram.observe(self._clock() - self._started, self._name)
+        return False
+
+
+class PaymentInstrumentation:
+    """Хуки инструментирования Use Case оплаты
+    
+    Базовая реализация ничего не делает и используется по умолчанию:
+    timed возвращает исходную функцию, поэтому выключенное
+    инструментирование не добавляет вызовов на этапах оплаты.
+    """
+    
+    enabled = False
+    
+    def stage(self, name: str) -> ContextManager:
+        """Контекст замера этапа: load, pay, charge, save, total"""
+        return _NULL_STAGE
+    
+    def timed(self, name: str, function: Callable) -> Callable:
+        """Обертка функции с замером этапа; без инструментирования - сама функция"""
+        return function
+    
+    def record_outcome(self, outcome: str):
+        """Учет результата оплаты: success или причина отказа"""
+        pass
+
+
+NULL_INSTRUMENTATION = PaymentInstrumentation()
+
+
+class MetricsInstrumentation(PaymentInstrumentation):
+    """Инструментирование оплаты в реестр метрик
+    
+    - payment_stage_seconds{stage} - гистограмма длительности этапов
+      (этап total - полная задержка оплаты);
+    - payments_total{outcome} - число оплат по результату; для доменных
+      ошибок результат равен имени класса исключения.
+    """
+    
+    enabled = True
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None,
+                 clock: Callable[[], float] = perf_counter):
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self._clock = clock
+        self.stage_seconds = self.registry.histogram(
+            "payment_stage_seconds", "Duration of payment stages in seconds", ("stage",)
+        )
+        self.payments = self.registry.counter(
+            "payments_total", "Payments by outcome", ("outcome",)
+        )
+    
+    def stage(self, name: str) -> ContextManager:
+        return _StageTimer(self.stage_seconds, name, self._clock)
+    
+    def timed(self, name: str, function: Callable) -> Callable:
+        observe = self.stage_seconds.observe
+        clock = self._clock
+        
+        def timed_function(*args):
+            started = clock()
+            try:
+                return function(*args)
+            finally:
+                observe(clock() - started, name)
+        
+        return timed_function
+    
+    def record_outcome(self, outcome: str):
+        self.payments.inc(outcome)
+
+
+class _CallMetrics:
+    """Метрики вызовов методов декорируемого объекта"""
+    
+    def __init__(self, registry: MetricsRegistry, prefix: str, clock: Callable[[], float]):
+        self._clock = clock
+        self.seconds = registry.histogram(
+            f"{prefix}_call_seconds", f"Duration of {prefix} calls in seconds", ("method",)
+        )
+        self.errors = registry.counter(
+            f"{prefix}_errors_total", f"Failed {prefix} calls by exception", ("method", "exception")
+        )
+    
+    def call(self, method: str, function, *args):
+        started = self._clock()
+        try:
+            return function(*args)
+        except Exception as e:
+            self.errors.inc(method, type(e).__name__)
+            raise
+        finally:
+            self.seconds.observe(self._clock() - started, method)
+
+
+class InstrumentedOrderRepository(OrderRepository):
+    """Декоратор репозитория заказов с метриками вызовов"""
+    
+    def __init__(self, repository: OrderRepository, registry: MetricsRegistry,
+                 clock: Callable[[], float] = perf_counter):
+        self.repository = repository
+        self._metrics = _CallMetrics(registry, "repository", clock)
+    
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        return self._metrics.call("get_by_id", self.repository.get_by_id, order_id)
+    
+    def save(self, order: Order):
+        return self._metrics.call("save", self.repository.save, order)
+    
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        return self._metrics.call("get_many", self.repository.get_many, order_ids)
+    
+    def save_many(self, orders: Iterable[Order]):
+        return self._metrics.call("save_many", self.repository.save_many, orders)
+    
+    def lock(self, order_id: str) -> ContextManager:
+        return self.repository.lock(order_id)
+    
+    def find_by_customer(self, customer_id: str, limit: Optional[int] = None) -> Iterator[Order]:
+        return self._metrics.call("find_by_customer", self.repository.find_by_customer, customer_id, limit)
+    
+    def find_by_status(self, status: OrderStatus, limit: Optional[int] = None) -> Iterator[Order]:
+        return self._metrics.call("find_by_status", self.repository.find_by_status, status, limit)
+
+
+class InstrumentedPaymentGateway(PaymentGateway):
+    """Декоратор платежного шлюза с метриками вызовов и результатов"""
+    
+    def __init__(self, gateway: PaymentGateway, registry: MetricsRegistry,
+                 clock: Callable[[], float] = perf_counter):
+        self.gateway = gateway
+        self._metrics = _CallMetrics(registry, "gateway", clock)
+        self.charges = registry.counter(
+            "gateway_charges_total", "Gateway charges by result", ("result",)
+        )
+    
+    def charge(self, order_id: str, amount: Money) -> bool:
+        success = self._metrics.call("charge", self.gateway.charge, order_id, amount)
+        self.charges.inc("success" if success else "declined")
+        return success
+    
+    def charge_many(self, charges: Sequence[Tuple[str, Money]]) -> List[bool]:
+        results = self._metrics.call("charge_many", self.gateway.charge_many, charges)
+        succeeded = sum(1 for success in results if success)
+        if succeeded:
+            self.charges.inc("success", amount=succeeded)
+        if len(results) - succeeded:
+            self.charges.inc("declined", amount=len(results) - succeeded)
+        return results
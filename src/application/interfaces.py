@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, List
 from .dto import PayOrderRequest, PayOrderResponse
 
 
@@ -9,3 +10,21 @@ class PayOrderUseCase(ABC):
     def execute(self, request: PayOrderRequest) -> PayOrderResponse:
         """Выполнение оплаты заказа"""
         pass
+
+
+class PayOrdersBatchUseCase(ABC):
+    """Интерфейс Use Case пакетной оплаты заказов"""
+    
+    @abstractmethod
+    def execute(self, requests: Iterable[PayOrderRequest]) -> List[PayOrderResponse]:
+        """Выполнение оплаты пакета заказов"""
+        pass
+
+
+class AsyncPayOrderUseCase(ABC):
+    """Интерфейс асинхронного Use Case оплаты заказа"""
+    
+    @abstractmethod
+    async def execute(self, request: PayOrderRequest) -> PayOrderResponse:
+        """Выполнение оплаты заказа"""
+        pass
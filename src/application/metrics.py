@@ -0,0 +1,180 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple, Union
+
+
+# Границы корзин гистограмм задержек в секундах
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+
+
+class Counter:
+    """Счетчик с метками"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, *label_values: str, amount: float = 1):
+        """Увеличение счетчика для набора значений меток"""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+    
+    def samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами и метками"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # метки -> [счетчики по корзинам (последняя - +Inf), сумма, количество]
+        self._values: Dict[Tuple[str, ...], list] = {}
+    
+    def observe(self, value: float, *label_values: str):
+        """Учет наблюдения"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+    
+    def count(self, *label_values: str) -> int:
+        entry = self._values.get(label_values)
+        return entry[2] if entry else 0
+    
+    def samples(self) -> List[Tuple[Tuple[str, ...], List[int], float, int]]:
+        """(метки, накопленные счетчики корзин, сумма, количество)"""
+        result = []
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                cumulative, running = [], 0
+                for bucket_count in counts:
+                    running += bucket_count
+                    cumulative.append(running)
+                result.append((labels, cumulative, total, count))
+        return result
+
+
+Metric = Union[Counter, Histogram]
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+    
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        """Получение или создание счетчика"""
+        return self._register(Counter(name, help, label_names))
+    
+    def histogram(self, name: str, help: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        """Получение или создание гистограммы"""
+        return self._register(Histogram(name, help, label_names, buckets))
+    
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if existing.kind != metric.kind or existing.label_names != metric.label_names:
+            raise ValueError(f"Metric {metric.name} is already registered with another type or labels")
+        return existing
+    
+    def metrics(self) -> List[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+def to_prometheus_text(registry: MetricsRegistry) -> str:
+    """Выгрузка метрик в текстовом формате Prometheus"""
+    lines = []
+    for metric in registry.metrics():
+        lines.append(f"# HELP {metric.name} {_escape_help(metric.help)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        
+        if isinstance(metric, Counter):
+            for labels, value in metric.samples():
+                lines.append(f"{metric.name}{_format_labels(metric.label_names, labels)} {_format_value(value)}")
+            continue
+        
+        for labels, cumulative, total, count in metric.samples():
+            bounds = [_format_value(bound) for bound in metric.buckets] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, cumulative):
+                label_text = _format_labels(metric.label_names + ("le",), labels + (bound,))
+                lines.append(f"{metric.name}_bucket{label_text} {bucket_count}")
+            label_text = _format_labels(metric.label_names, labels)
+            lines.append(f"{metric.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{metric.name}_count{label_text} {count}")
+    
+    return "\n".join(lines) + "\n"
+
+
+def to_json(registry: MetricsRegistry) -> str:
+    """Выгрузка метрик в JSON"""
+    # json нужен только при выгрузке - не замедляем им запуск обработчиков
+    import json
+    
+    data = {}
+    for metric in registry.metrics():
+        if isinstance(metric, Counter):
+            samples = [
+                {"labels": dict(zip(metric.label_names, labels)), "value": value}
+                for labels, value in metric.samples()
+            ]
+        else:
+            samples = [
+                {
+                    "labels": dict(zip(metric.label_names, labels)),
+                    "buckets": dict(zip([str(bound) for bound in metric.buckets] + ["+Inf"], cumulative)),
+                    "sum": total,
+                    "count": count,
+                }
+                for labels, cumulative, total, count in metric.samples()
+            ]
+        data[metric.name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+    return json.dumps(data, indent=2, sort_keys=True)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
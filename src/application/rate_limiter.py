@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов (token bucket)
+    
+    Маркеры пополняются со скоростью rate в секунду до capacity. За любой
+    интервал T выдается не больше capacity + rate * T маркеров, поэтому для
+    квоты провайдера Q запросов в секунду подходят rate=Q и capacity=1
+    (равномерный поток без всплеска на стыке секунд). Один экземпляр - на
+    один платежный шлюз: планировщики, работающие с тем же шлюзом, должны
+    делить его.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Маркеров в секунду
+            capacity: Максимальный запас маркеров (размер всплеска)
+            clock: Источник времени (для тестов)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self.acquired = 0
+        self.throttled = 0
+    
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Попытка взять маркеры
+        
+        Возвращает 0, если маркеры выданы, иначе - сколько секунд ждать
+        до их появления (маркеры при этом не резервируются).
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                self.acquired += 1
+                return 0.0
+            self.throttled += 1
+            return (tokens - self._tokens) / self.rate
+    
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None,
+                sleep: Callable[[float], None] = time.sleep) -> bool:
+        """Ожидание маркеров; False, если они не появятся за timeout секунд"""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            delay = self.try_acquire(tokens)
+            if not delay:
+                return True
+            if deadline is not None and self._clock() + delay > deadline:
+                return False
+            sleep(delay)
+    
+    def refund(self, tokens: float = 1):
+        """Возврат неиспользованных маркеров"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+            self.acquired -= 1
+    
+    def available(self) -> float:
+        """Текущий запас маркеров"""
+        with self._lock:
+            self._refill()
+            return self._tokens
+    
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
@@ -0,0 +1,262 @@
+import csv
+import os
+import shutil
+import tempfile
+import zlib
+from dataclasses import dataclass, field
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from ..domain.entities import Order, OrderStatus
+from ..domain.interfaces import OrderRepository
+from ..domain.value_objects import Money, MoneyBag
+
+
+class TruncatedChargeLogError(RuntimeError):
+    """Журнал платежей отбросил записи, сверка по нему недостоверна"""
+    pass
+
+
+def ensure_complete(charges) -> None:
+    """Проверка, что журнал (с атрибутом dropped, как ChargeLog) не терял записей"""
+    dropped = getattr(charges, "dropped", 0)
+    if dropped:
+        raise TruncatedChargeLogError(f"Charge log dropped {dropped} records")
+
+
+class MismatchKind(Enum):
+    """Виды расхождений между заказами и журналом платежей"""
+    # Оплаченный заказ без успешного списания
+    MISSING_CHARGE = "missing_charge"
+    # Больше одного успешного списания по заказу
+    DOUBLE_CHARGE = "double_charge"
+    # Сумма списания не равна сумме заказа
+    AMOUNT_MISMATCH = "amount_mismatch"
+    # Успешное списание по отсутствующему или неоплаченному заказу
+    ORPHANED_CHARGE = "orphaned_charge"
+
+
+@dataclass
+class Mismatch:
+    """Расхождение по одному заказу"""
+    kind: MismatchKind
+    order_id: str
+    # Статус заказа в репозитории (None - заказа нет)
+    status: Optional[OrderStatus]
+    # Сумма заказа по валютам (None - заказа нет)
+    expected: Optional[MoneyBag]
+    # Успешные списания по заказу
+    charged: Tuple[Money, ...]
+
+
+@dataclass
+class ReconciliationReport:
+    """Итог сверки"""
+    orders_checked: int = 0
+    paid_orders: int = 0
+    charges_checked: int = 0
+    failed_charges: int = 0
+    matched: int = 0
+    mismatches: Dict[MismatchKind, int] = field(default_factory=lambda: {kind: 0 for kind in MismatchKind})
+    # Первые max_samples расхождений; остальные только считаются
+    samples: List[Mismatch] = field(default_factory=list)
+    # Записей, выгруженных на диск при разбиении
+    spilled_records: int = 0
+    
+    @property
+    def ok(self) -> bool:
+        return not any(self.mismatches.values())
+
+
+# Заказ в разбиении: (ID, статус, суммы по валютам)
+_OrderRow = Tuple[str, str, Dict[str, Decimal]]
+# Списание в разбиении: (ID заказа, сумма)
+_ChargeRow = Tuple[str, Money]
+
+
+class _Partition:
+    """Одна хеш-секция обеих сторон: буферы в памяти и файлы выгрузки"""
+    
+    __slots__ = ('orders', 'charges', 'orders_path', 'charges_path')
+    
+    def __init__(self, directory: str, index: int):
+        self.orders: List[_OrderRow] = []
+        self.charges: List[_ChargeRow] = []
+        self.orders_path = os.path.join(directory, f"orders_{index}.csv")
+        self.charges_path = os.path.join(directory, f"charges_{index}.csv")
+    
+    def spill(self) -> int:
+        """Дописывание буферов в файлы секции; возвращает число записей"""
+        spilled = len(self.orders) + len(self.charges)
+        if self.orders:
+            with open(self.orders_path, "a", newline="", encoding="utf-8") as output:
+                writer = csv.writer(output)
+                for order_id, status, totals in self.orders:
+                    row = [order_id, status]
+                    for currency, amount in totals.items():
+                        row.extend((currency, str(amount)))
+                    writer.writerow(row)
+            self.orders = []
+        if self.charges:
+            with open(self.charges_path, "a", newline="", encoding="utf-8") as output:
+                csv.writer(output).writerows(
+                    (order_id, str(amount.amount), amount.currency) for order_id, amount in self.charges
+                )
+            self.charges = []
+        return spilled
+    
+    def iter_orders(self) -> Iterator[_OrderRow]:
+        if os.path.exists(self.orders_path):
+            with open(self.orders_path, newline="", encoding="utf-8") as source:
+                for row in csv.reader(source):
+                    pairs = iter(row[2:])
+                    yield row[0], row[1], {currency: Decimal(amount) for currency, amount in zip(pairs, pairs)}
+        yield from self.orders
+    
+    def iter_charges(self) -> Iterator[_ChargeRow]:
+        if os.path.exists(self.charges_path):
+            with open(self.charges_path, newline="", encoding="utf-8") as source:
+                for order_id, amount, currency in csv.reader(source):
+                    yield order_id, Money(Decimal(amount), currency)
+        yield from self.charges
+
+
+class Reconciler:
+    """Сверка заказов репозитория с журналом платежей шлюза
+    
+    Обе стороны читаются потоком и раскладываются по partitions секциям по
+    crc32(order_id); затем секции сверяются по одной, в памяти держится
+    только одна секция. Пока число записей в буферах не превышает
+    max_in_memory, все остается в памяти; при превышении буферы
+    дописываются в CSV-файлы секций во временном каталоге (spill_dir), так
+    что объем данных ограничен диском, а не памятью. Для десятков миллионов
+    записей partitions выбирают так, чтобы секция (записей / partitions)
+    помещалась в память.
+    
+    Проверяется, что у каждого оплаченного заказа ровно одно успешное
+    списание на сумму заказа и что нет успешных списаний без оплаченного
+    заказа. Неуспешные списания только считаются.
+    """
+    
+    def __init__(self, partitions: int = 64, max_in_memory: int = 1_000_000,
+                 spill_dir: Optional[str] = None, max_samples: int = 100,
+                 on_mismatch: Optional[Callable[[Mismatch], None]] = None):
+        """
+        Args:
+            partitions: Число хеш-секций
+            max_in_memory: Записей в буферах до выгрузки на диск
+            spill_dir: Каталог для временных файлов (по умолчанию - системный)
+            max_samples: Сколько расхождений сохранять в отчете
+            on_mismatch: Вызывается для каждого расхождения (для выгрузки всех)
+        """
+        if partitions < 1:
+            raise ValueError("partitions must be positive")
+        if max_in_memory < 1:
+            raise ValueError("max_in_memory must be positive")
+        
+        self.partitions = partitions
+        self.max_in_memory = max_in_memory
+        self.spill_dir = spill_dir
+        self.max_samples = max_samples
+        self.on_mismatch = on_mismatch
+    
+    def reconcile(self, orders: Iterable[Order],
+                  charges: Iterable[Tuple[str, Money, bool]]) -> ReconciliationReport:
+        """Сверка заказов (Order или OrderSnapshot) с записями журнала
+        
+        orders может содержать только оплаченные заказы: списание по
+        заказу, которого нет среди orders, считается лишним. Журнал,
+        отбросивший записи, отклоняется (TruncatedChargeLogError): иначе
+        потерянные списания выглядели бы как MISSING_CHARGE.
+        """
+        ensure_complete(charges)
+        report = ReconciliationReport()
+        directory = tempfile.mkdtemp(prefix="reconciliation-", dir=self.spill_dir)
+        try:
+            partitions = [_Partition(directory, index) for index in range(self.partitions)]
+            self._partition(orders, charges, partitions, report)
+            for partition in partitions:
+                self._join(partition, report)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        return report
+    
+    def reconcile_repository(self, repository: OrderRepository,
+                             charges: Iterable[Tuple[str, Money, bool]]) -> ReconciliationReport:
+        """Сверка оплаченных заказов репозитория (find_by_status) с журналом"""
+        return self.reconcile(repository.find_by_status(OrderStatus.PAID), charges)
+    
+    def _partition(self, orders: Iterable[Order], charges: Iterable[Tuple[str, Money, bool]],
+                   partitions: List[_Partition], report: ReconciliationReport):
+        count = self.partitions
+        crc32 = zlib.crc32
+        buffered = 0
+        
+        for order in orders:
+            partition = partitions[crc32(order.id.encode("utf-8")) % count]
+            partition.orders.append((order.id, order.status.value, order.subtotals.totals()))
+            report.orders_checked += 1
+            buffered += 1
+            if buffered >= self.max_in_memory:
+                report.spilled_records += sum(partition.spill() for partition in partitions)
+                buffered = 0
+        
+        for order_id, amount, success in charges:
+            report.charges_checked += 1
+            if not success:
+                report.failed_charges += 1
+                continue
+            partitions[crc32(order_id.encode("utf-8")) % count].charges.append((order_id, amount))
+            buffered += 1
+            if buffered >= self.max_in_memory:
+                report.spilled_records += sum(partition.spill() for partition in partitions)
+                buffered = 0
+    
+    def _join(self, partition: _Partition, report: ReconciliationReport):
+        """Сверка одной секции: заказы в словарь, списания группируются по заказу"""
+        charged: Dict[str, List[Money]] = {}
+        for order_id, amount in partition.iter_charges():
+            amounts = charged.get(order_id)
+            if amounts is None:
+                charged[order_id] = [amount]
+            else:
+                amounts.append(amount)
+        
+        paid = OrderStatus.PAID.value
+        for order_id, status, totals in partition.iter_orders():
+            amounts = charged.pop(order_id, ())
+            if status != paid:
+                if amounts:
+                    self._report(report, MismatchKind.ORPHANED_CHARGE, order_id, status, totals, amounts)
+                continue
+            
+            report.paid_orders += 1
+            if not amounts:
+                self._report(report, MismatchKind.MISSING_CHARGE, order_id, status, totals, amounts)
+            elif len(amounts) > 1:
+                self._report(report, MismatchKind.DOUBLE_CHARGE, order_id, status, totals, amounts)
+            elif MoneyBag(amounts).totals() != totals:
+                self._report(report, MismatchKind.AMOUNT_MISMATCH, order_id, status, totals, amounts)
+            else:
+                report.matched += 1
+        
+        for order_id, amounts in charged.items():
+            self._report(report, MismatchKind.ORPHANED_CHARGE, order_id, None, None, amounts)
+    
+    def _report(self, report: ReconciliationReport, kind: MismatchKind, order_id: str,
+                status: Optional[str], totals: Optional[Dict[str, Decimal]], amounts):
+        report.mismatches[kind] += 1
+        if len(report.samples) >= self.max_samples and self.on_mismatch is None:
+            return
+        
+        mismatch = Mismatch(
+            kind=kind,
+            order_id=order_id,
+            status=OrderStatus(status) if status is not None else None,
+            expected=MoneyBag.from_totals(totals) if totals is not None else None,
+            charged=tuple(amounts),
+        )
+        if len(report.samples) < self.max_samples:
+            report.samples.append(mismatch)
+        if self.on_mismatch is not None:
+            self.on_mismatch(mismatch)
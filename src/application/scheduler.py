@@ -0,0 +1,278 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Tuple
+from .dto import PayOrderRequest, PayOrderResponse
+from .interfaces import PayOrderUseCase
+from .metrics import MetricsRegistry
+from .rate_limiter import TokenBucket
+
+
+class Priority(IntEnum):
+    """Приоритет запроса оплаты (меньше - раньше)"""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+class SchedulerQueueFullError(RuntimeError):
+    """Очередь планировщика заполнена"""
+    pass
+
+
+class _Entry:
+    """Запрос в очереди планировщика"""
+    
+    __slots__ = ('key', 'request', 'priority', 'deadline', 'submitted_at', 'future')
+    
+    def __init__(self, key: Tuple[int, int], request: PayOrderRequest, priority: Priority,
+                 deadline: Optional[float], submitted_at: float):
+        self.key = key
+        self.request = request
+        self.priority = priority
+        self.deadline = deadline
+        self.submitted_at = submitted_at
+        self.future: "Future[PayOrderResponse]" = Future()
+    
+    def __lt__(self, other: '_Entry') -> bool:
+        return self.key < other.key
+
+
+class PaymentScheduler(PayOrderUseCase):
+    """Планировщик оплат перед PayOrderUseCaseImpl
+    
+    Запросы ставятся в очередь с приоритетом (внутри приоритета - по
+    порядку поступления) и выполняются пулом из workers потоков. Перед
+    запуском запроса берется маркер ограничителя частоты, поэтому поток
+    запросов к шлюзу не превышает квоту провайдера, а первым при
+    появлении маркера уходит самый приоритетный запрос. Маркер тратят и
+    запросы, не дошедшие до шлюза (заказ не найден, уже оплачен), так что
+    квота не превышается ни при каком исходе.
+    
+    Запрос с истекшим сроком (deadline или timeout при постановке) не
+    выполняется: он получает ответ с ошибкой, если срок истек в очереди или
+    наступит раньше, чем появится маркер.
+    
+    Планировщик сам реализует PayOrderUseCase: execute ставит запрос с
+    приоритетом по умолчанию и ждет ответа.
+    """
+    
+    def __init__(self, use_case: PayOrderUseCase, limiter: Optional[TokenBucket] = None,
+                 workers: int = 4, max_queue_size: Optional[int] = None,
+                 default_priority: Priority = Priority.NORMAL,
+                 registry: Optional[MetricsRegistry] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            use_case: Use Case оплаты заказа
+            limiter: Ограничитель частоты шлюза (None - без ограничения)
+            workers: Число потоков, выполняющих запросы
+            max_queue_size: Максимальное число запросов в очереди (None - без ограничения)
+            default_priority: Приоритет для execute и submit без priority
+            registry: Реестр метрик (по умолчанию - собственный)
+            clock: Источник времени для сроков и ожидания (как у limiter)
+        """
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        if max_queue_size is not None and max_queue_size < 1:
+            raise ValueError("max_queue_size must be positive")
+        
+        self.use_case = use_case
+        self.limiter = limiter
+        self.max_queue_size = max_queue_size
+        self.default_priority = default_priority
+        self.registry = registry or MetricsRegistry()
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._queue: List[_Entry] = []
+        self._sequence = itertools.count()
+        self._depth: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        self._in_flight = 0
+        self._closed = False
+        
+        self.requests = self.registry.counter(
+            "payment_scheduler_requests_total", "Payment requests by priority and outcome",
+            ("priority", "outcome"),
+        )
+        self.wait_seconds = self.registry.histogram(
+            "payment_scheduler_wait_seconds", "Time payment requests spent in the queue",
+            ("priority",),
+        )
+        
+        self._workers = [
+            threading.Thread(target=self._work, name=f"payment-scheduler-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    def submit(self, request: PayOrderRequest, priority: Optional[Priority] = None,
+               deadline: Optional[float] = None,
+               timeout: Optional[float] = None) -> "Future[PayOrderResponse]":
+        """Постановка запроса в очередь
+        
+        Args:
+            request: Запрос оплаты
+            priority: Приоритет (по умолчанию - default_priority)
+            deadline: Момент по часам планировщика, после которого запрос не выполняется
+            timeout: То же относительно текущего момента
+        """
+        priority = self.default_priority if priority is None else Priority(priority)
+        now = self._clock()
+        if timeout is not None:
+            deadline = now + timeout if deadline is None else min(deadline, now + timeout)
+        
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Payment scheduler is shut down")
+            if self.max_queue_size is not None and len(self._queue) >= self.max_queue_size:
+                self.requests.inc(priority.name.lower(), "rejected")
+                raise SchedulerQueueFullError(f"Payment queue is full ({self.max_queue_size} requests)")
+            
+            entry = _Entry((priority, next(self._sequence)), request, priority, deadline, now)
+            heapq.heappush(self._queue, entry)
+            self._depth[priority] += 1
+            self.requests.inc(priority.name.lower(), "submitted")
+            self._condition.notify()
+        return entry.future
+    
+    def execute(self, request: PayOrderRequest) -> PayOrderResponse:
+        """Оплата через очередь с приоритетом по умолчанию"""
+        return self.submit(request).result()
+    
+    def queue_depth(self, priority: Optional[Priority] = None) -> int:
+        """Число запросов в очереди (всего или с приоритетом priority)"""
+        with self._condition:
+            return len(self._queue) if priority is None else self._depth[Priority(priority)]
+    
+    def stats(self) -> Dict[str, object]:
+        """Глубина очереди, исходы и среднее ожидание по приоритетам"""
+        waits = {labels[0]: (total, count) for labels, _, total, count in self.wait_seconds.samples()}
+        with self._condition:
+            depth = dict(self._depth)
+            in_flight = self._in_flight
+        
+        by_priority = {}
+        for priority in Priority:
+            label = priority.name.lower()
+            total, count = waits.get(label, (0.0, 0))
+            by_priority[label] = {
+                "depth": depth[priority],
+                "submitted": self.requests.value(label, "submitted"),
+                "completed": self.requests.value(label, "completed"),
+                "expired": self.requests.value(label, "expired"),
+                "rejected": self.requests.value(label, "rejected"),
+                "cancelled": self.requests.value(label, "cancelled"),
+                "failed": self.requests.value(label, "failed"),
+                "wait_avg_seconds": total / count if count else 0.0,
+            }
+        return {
+            "depth": sum(depth.values()),
+            "in_flight": in_flight,
+            "tokens_available": self.limiter.available() if self.limiter is not None else None,
+            "by_priority": by_priority,
+        }
+    
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """Остановка приема запросов
+        
+        Уже поставленные запросы выполняются, если не задан cancel_pending.
+        """
+        with self._condition:
+            self._closed = True
+            cancelled = []
+            if cancel_pending:
+                cancelled, self._queue = self._queue, []
+                for priority in self._depth:
+                    self._depth[priority] = 0
+            self._condition.notify_all()
+        
+        for entry in cancelled:
+            if entry.future.cancel():
+                self.requests.inc(entry.priority.name.lower(), "cancelled")
+        if wait:
+            for worker in self._workers:
+                worker.join()
+    
+    def __enter__(self) -> 'PaymentScheduler':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+    
+    def _work(self):
+        while True:
+            entry = self._take()
+            if entry is None:
+                return
+            try:
+                self._run(entry)
+            finally:
+                with self._condition:
+                    self._in_flight -= 1
+    
+    def _take(self) -> Optional[_Entry]:
+        """Следующий запрос, для которого получен маркер; None - при остановке"""
+        while True:
+            with self._condition:
+                if not self._queue:
+                    if self._closed:
+                        return None
+                    self._condition.wait()
+                    continue
+                
+                entry = self._queue[0]
+                now = self._clock()
+                if not entry.future.cancelled() and (entry.deadline is None or now <= entry.deadline):
+                    delay = self.limiter.try_acquire() if self.limiter is not None else 0.0
+                    if not delay:
+                        self._pop()
+                        self._in_flight += 1
+                        return entry
+                    if entry.deadline is None or now + delay <= entry.deadline:
+                        self._condition.wait(delay)
+                        continue
+                    # Маркер появится позже срока - не держим запрос в очереди
+                self._pop()
+            
+            # Ответ выставляется вне блокировки: колбэки Future могут вызывать submit
+            self._expire(entry)
+    
+    def _pop(self) -> _Entry:
+        entry = heapq.heappop(self._queue)
+        self._depth[entry.priority] -= 1
+        return entry
+    
+    def _run(self, entry: _Entry):
+        label = entry.priority.name.lower()
+        if not entry.future.set_running_or_notify_cancel():
+            # Отменен вызывающим между проверкой и запуском
+            if self.limiter is not None:
+                self.limiter.refund()
+            self.requests.inc(label, "cancelled")
+            return
+        
+        self.wait_seconds.observe(self._clock() - entry.submitted_at, label)
+        try:
+            response = self.use_case.execute(entry.request)
+        except BaseException as e:
+            self.requests.inc(label, "failed")
+            entry.future.set_exception(e)
+            return
+        self.requests.inc(label, "completed")
+        entry.future.set_result(response)
+    
+    def _expire(self, entry: _Entry):
+        label = entry.priority.name.lower()
+        if not entry.future.set_running_or_notify_cancel():
+            self.requests.inc(label, "cancelled")
+            return
+        self.requests.inc(label, "expired")
+        entry.future.set_result(PayOrderResponse(
+            success=False,
+            order_id=entry.request.order_id,
+            error_message="Payment request deadline exceeded"
+        ))
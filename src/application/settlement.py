@@ -0,0 +1,150 @@
+import time
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+from .dto import PayOrderRequest, PayOrderResponse
+from .reconciliation import ensure_complete
+from .use_cases import PayOrderUseCaseImpl
+from ..domain.interfaces import OrderRepository, PaymentGateway
+
+
+def shard_for(order_id: str, shards: int) -> int:
+    """Номер шарда заказа
+    
+    Используется crc32, а не hash(): хеш строк случаен в каждом процессе.
+    """
+    return zlib.crc32(order_id.encode("utf-8")) % shards
+
+
+class SettlementContextFactory(ABC):
+    """Фабрика репозитория и шлюза для процесса-обработчика
+    
+    Экземпляр передается в дочерние процессы, поэтому должен сериализоваться
+    pickle (класс уровня модуля с простыми полями).
+    """
+    
+    @abstractmethod
+    def create(self, shard: int, shards: int) -> Tuple[OrderRepository, PaymentGateway]:
+        """Создание репозитория и шлюза для шарда"""
+        pass
+    
+    def collect_charges(self, gateway: PaymentGateway) -> list:
+        """Журнал списаний шлюза после обработки шарда
+        
+        Журнал, отбросивший записи, отклоняется (TruncatedChargeLogError).
+        """
+        charges_log = getattr(gateway, "charges_log", ())
+        ensure_complete(charges_log)
+        return list(charges_log)
+    
+    def release(self, repository: OrderRepository, gateway: PaymentGateway):
+        """Освобождение ресурсов после обработки шарда"""
+        pass
+
+
+@dataclass
+class ShardResult:
+    """Результат обработки одного шарда"""
+    shard: int
+    responses: List[PayOrderResponse]
+    charges: list
+    elapsed: float
+
+
+@dataclass
+class SettlementResult:
+    """Результат расчета: ответы в порядке запросов и общий журнал списаний"""
+    responses: List[PayOrderResponse]
+    charges: list = field(default_factory=list)
+    shards: List[ShardResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    
+    @property
+    def orders_per_sec(self) -> float:
+        return len(self.responses) / self.elapsed if self.elapsed else 0.0
+
+
+def _settle_shard(factory: SettlementContextFactory, shard: int, shards: int,
+                  requests: List[PayOrderRequest]) -> ShardResult:
+    """Оплата заказов шарда в процессе-обработчике"""
+    repository, gateway = factory.create(shard, shards)
+    try:
+        use_case = PayOrderUseCaseImpl(repository, gateway)
+        started = time.perf_counter()
+        responses = [use_case.execute(request) for request in requests]
+        elapsed = time.perf_counter() - started
+        return ShardResult(shard, responses, factory.collect_charges(gateway), elapsed)
+    finally:
+        factory.release(repository, gateway)
+
+
+class ProcessSettlementRunner:
+    """Оплата большого числа заказов в пуле процессов
+    
+    Заказы делятся на workers шардов по crc32 ID, каждый шард оплачивается
+    PayOrderUseCaseImpl в отдельном процессе со своими репозиторием и шлюзом.
+    Все запросы одного заказа попадают в один шард и выполняются там
+    последовательно, поэтому заказ не списывается дважды. Если процесс
+    обработчика аварийно завершился, его заказы не повторяются: они получают
+    ответ с ошибкой, так как неизвестно, дошло ли до них списание.
+    """
+    
+    def __init__(self, factory: SettlementContextFactory, workers: int = 4,
+                 mp_context=None):
+        """
+        Args:
+            factory: Фабрика репозитория и шлюза для каждого шарда
+            workers: Число процессов и шардов
+            mp_context: Контекст multiprocessing (по умолчанию - системный)
+        """
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        
+        self.factory = factory
+        self.workers = workers
+        self.mp_context = mp_context
+    
+    def run(self, requests: Iterable[PayOrderRequest]) -> SettlementResult:
+        """Оплата всех запросов; ответы возвращаются в порядке запросов"""
+        started = time.perf_counter()
+        shard_requests: List[List[PayOrderRequest]] = [[] for _ in range(self.workers)]
+        shard_positions: List[List[int]] = [[] for _ in range(self.workers)]
+        
+        count = 0
+        for index, request in enumerate(requests):
+            shard = shard_for(request.order_id, self.workers)
+            shard_requests[shard].append(request)
+            shard_positions[shard].append(index)
+            count = index + 1
+        
+        responses: List[Optional[PayOrderResponse]] = [None] * count
+        result = SettlementResult(responses=responses)
+        
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context) as pool:
+            futures = [
+                (shard, pool.submit(_settle_shard, self.factory, shard, self.workers, shard_requests[shard]))
+                for shard in range(self.workers)
+                if shard_requests[shard]
+            ]
+            for shard, future in futures:
+                try:
+                    shard_result = future.result()
+                except Exception as e:
+                    shard_result = ShardResult(shard, [
+                        PayOrderResponse(
+                            success=False,
+                            order_id=request.order_id,
+                            error_message=f"Unexpected error: {str(e)}"
+                        )
+                        for request in shard_requests[shard]
+                    ], [], 0.0)
+                
+                for index, response in zip(shard_positions[shard], shard_result.responses):
+                    responses[index] = response
+                result.charges.extend(shard_result.charges)
+                result.shards.append(shard_result)
+        
+        result.elapsed = time.perf_counter() - started
+        return result
@@ -1,26 +1,81 @@
-from typing import Optional
+from contextlib import ExitStack
+from typing import Iterable, List, Optional, Set
 from decimal import Decimal
 from .dto import PayOrderRequest, PayOrderResponse
-from .interfaces import PayOrderUseCase
+from .interfaces import PayOrderUseCase, PayOrdersBatchUseCase
+from .idempotency import IdempotencyCache
+from .instrumentation import NULL_INSTRUMENTATION, PaymentInstrumentation
 from ..domain.entities import Order, OrderStatus
 from ..domain.interfaces import OrderRepository, PaymentGateway
 from ..domain.exceptions import DomainException
+from ..domain.value_objects import Money
 
 
 class PayOrderUseCaseImpl(PayOrderUseCase):
     """Реализация Use Case оплаты заказа"""
     
-    def __init__(self, order_repository: OrderRepository, payment_gateway: PaymentGateway):
+    def __init__(self, order_repository: OrderRepository, payment_gateway: PaymentGateway,
+                 idempotency_cache: Optional[IdempotencyCache] = None,
+                 instrumentation: Optional[PaymentInstrumentation] = None):
         self.order_repository = order_repository
         self.payment_gateway = payment_gateway
+        self.idempotency_cache = idempotency_cache
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+        
+        # Этапы оплаты оборачиваются в замеры один раз при создании; репозиторий
+        # и шлюз читаются при каждом вызове, поэтому их можно заменить позже
+        timed = self.instrumentation.timed
+        self._load = timed("load", lambda order_id: self.order_repository.get_by_id(order_id))
+        self._pay = timed("pay", _pay_order)
+        self._charge = timed("charge", lambda order_id, amount: self.payment_gateway.charge(order_id, amount))
+        self._save = timed("save", lambda order: self.order_repository.save(order))
     
     def execute(self, request: PayOrderRequest) -> PayOrderResponse:
         """Выполнение оплаты заказа"""
+        if not self.instrumentation.enabled:
+            return self._execute_idempotent(request)
+        
+        with self.instrumentation.stage("total"):
+            return self._execute_idempotent(request)
+    
+    def _execute_idempotent(self, request: PayOrderRequest) -> PayOrderResponse:
+        """Оплата с учетом ключа идемпотентности"""
+        if request.idempotency_key is None or self.idempotency_cache is None:
+            return self._execute_locked(request)
+        
+        with self.idempotency_cache.claim(request.idempotency_key) as cached:
+            if cached is not None:
+                if cached.order_id != request.order_id:
+                    self.instrumentation.record_outcome("idempotency_conflict")
+                    return PayOrderResponse(
+                        success=False,
+                        order_id=request.order_id,
+                        error_message=f"Idempotency key {request.idempotency_key} "
+                                      f"was used for order {cached.order_id}"
+                    )
+                self.instrumentation.record_outcome("idempotent_replay")
+                return cached
+            
+            response = self._execute_locked(request)
+            # Сохраняются только успешные оплаты: неуспешную можно повторить
+            if response.success:
+                self.idempotency_cache.put(request.idempotency_key, response)
+            return response
+    
+    def _execute_locked(self, request: PayOrderRequest) -> PayOrderResponse:
+        """Оплата заказа под блокировкой репозитория"""
+        # Блокировка не дает параллельным оплатам одного заказа дважды списать деньги
+        with self.order_repository.lock(request.order_id):
+            return self._execute(request)
+    
+    def _execute(self, request: PayOrderRequest) -> PayOrderResponse:
+        """Загрузка, оплата и сохранение заказа"""
         try:
             # Загружаем заказ
-            order: Optional[Order] = self.order_repository.get_by_id(request.order_id)
+            order: Optional[Order] = self._load(request.order_id)
             
             if not order:
+                self.instrumentation.record_outcome("order_not_found")
                 return PayOrderResponse(
                     success=False,
                     order_id=request.order_id,
@@ -32,14 +87,15 @@ class PayOrderUseCaseImpl(PayOrderUseCase):
             
             try:
                 # Выполняем доменную операцию оплаты
-                order.pay()
+                amount = self._pay(order)
                 
                 # Вызываем платежный шлюз
-                payment_success = self.payment_gateway.charge(order.id, order.total_amount)
+                payment_success = self._charge(order.id, amount)
                 
                 if not payment_success:
                     # Откатываем статус заказа если платеж не прошел
-                    order.status = original_status
+                    order.revert_payment(original_status)
+                    self.instrumentation.record_outcome("payment_declined")
                     return PayOrderResponse(
                         success=False,
                         order_id=order.id,
@@ -47,28 +103,180 @@ class PayOrderUseCaseImpl(PayOrderUseCase):
                     )
                 
                 # Сохраняем заказ с новым статусом
-                self.order_repository.save(order)
+                self._save(order)
                 
+                self.instrumentation.record_outcome("success")
                 return PayOrderResponse(
                     success=True,
                     order_id=order.id,
-                    amount_paid=str(order.total_amount)
+                    amount_paid=str(amount)
                 )
-                
+            
             except Exception:
                 # Если что-то пошло не так, откатываем изменения
-                order.status = original_status
+                order.revert_payment(original_status)
                 raise
-                
+        
         except DomainException as e:
+            self.instrumentation.record_outcome(type(e).__name__)
             return PayOrderResponse(
                 success=False,
                 order_id=request.order_id,
                 error_message=str(e)
             )
         except Exception as e:
+            self.instrumentation.record_outcome("unexpected_error")
             return PayOrderResponse(
                 success=False,
                 order_id=request.order_id,
                 error_message=f"Unexpected error: {str(e)}"
             )
+
+
+def _pay_order(order: Order) -> Money:
+    """Доменная операция оплаты; возвращает сумму к списанию"""
+    order.pay()
+    return order.total_amount
+
+
+class PayOrdersBatchUseCaseImpl(PayOrdersBatchUseCase):
+    """Реализация Use Case пакетной оплаты заказов
+    
+    Запросы обрабатываются порциями по batch_size: заказы порции загружаются
+    одним get_many, списываются одним charge_many и сохраняются одним save_many.
+    Семантика ошибок для каждого заказа совпадает с PayOrderUseCaseImpl.
+    """
+    
+    def __init__(self, order_repository: OrderRepository, payment_gateway: PaymentGateway,
+                 batch_size: int = 1000):
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        
+        self.order_repository = order_repository
+        self.payment_gateway = payment_gateway
+        self.batch_size = batch_size
+    
+    def execute(self, requests: Iterable[PayOrderRequest]) -> List[PayOrderResponse]:
+        """Выполнение оплаты пакета заказов
+        
+        Ответы возвращаются в порядке запросов.
+        """
+        responses: List[PayOrderResponse] = []
+        chunk: List[PayOrderRequest] = []
+        chunk_ids: Set[str] = set()
+        
+        for request in requests:
+            # Повторный ID в порции обрабатываем в следующей порции,
+            # чтобы результат совпадал с последовательной оплатой
+            if len(chunk) >= self.batch_size or request.order_id in chunk_ids:
+                responses.extend(self._execute_chunk(chunk))
+                chunk = []
+                chunk_ids = set()
+            
+            chunk.append(request)
+            chunk_ids.add(request.order_id)
+        
+        if chunk:
+            responses.extend(self._execute_chunk(chunk))
+        
+        return responses
+    
+    def _execute_chunk(self, requests: List[PayOrderRequest]) -> List[PayOrderResponse]:
+        """Оплата одной порции запросов с уникальными ID заказов"""
+        with ExitStack() as locks:
+            # Единый порядок захвата исключает взаимные блокировки между порциями
+            for order_id in sorted(request.order_id for request in requests):
+                locks.enter_context(self.order_repository.lock(order_id))
+            return self._execute_locked_chunk(requests)
+    
+    def _execute_locked_chunk(self, requests: List[PayOrderRequest]) -> List[PayOrderResponse]:
+        """Оплата порции под блокировками репозитория"""
+        try:
+            orders = self.order_repository.get_many(request.order_id for request in requests)
+        except Exception as e:
+            return [self._unexpected_error(request.order_id, e) for request in requests]
+        
+        responses: List[Optional[PayOrderResponse]] = [None] * len(requests)
+        # (индекс ответа, заказ, исходный статус, сумма к списанию)
+        pending = []
+        
+        for index, request in enumerate(requests):
+            order = orders.get(request.order_id)
+            
+            if not order:
+                responses[index] = PayOrderResponse(
+                    success=False,
+                    order_id=request.order_id,
+                    error_message=f"Order {request.order_id} not found"
+                )
+                continue
+            
+            original_status = order.status
+            
+            try:
+                order.pay()
+                pending.append((index, order, original_status, order.total_amount))
+            except DomainException as e:
+                order.revert_payment(original_status)
+                responses[index] = PayOrderResponse(
+                    success=False,
+                    order_id=request.order_id,
+                    error_message=str(e)
+                )
+            except Exception as e:
+                order.revert_payment(original_status)
+                responses[index] = self._unexpected_error(request.order_id, e)
+        
+        if not pending:
+            return responses
+        
+        try:
+            results = self.payment_gateway.charge_many(
+                [(order.id, amount) for _, order, _, amount in pending]
+            )
+            if len(results) != len(pending):
+                raise ValueError(
+                    f"charge_many returned {len(results)} results for {len(pending)} charges"
+                )
+        except Exception as e:
+            # Результат пакета неизвестен - откатываем все заказы порции
+            for index, order, original_status, _ in pending:
+                order.revert_payment(original_status)
+                responses[index] = self._unexpected_error(order.id, e)
+            return responses
+        
+        paid = []
+        for (index, order, original_status, amount), payment_success in zip(pending, results):
+            if not payment_success:
+                order.revert_payment(original_status)
+                responses[index] = PayOrderResponse(
+                    success=False,
+                    order_id=order.id,
+                    error_message="Payment failed"
+                )
+                continue
+            
+            paid.append((index, order, original_status))
+            responses[index] = PayOrderResponse(
+                success=True,
+                order_id=order.id,
+                amount_paid=str(amount)
+            )
+        
+        if paid:
+            try:
+                self.order_repository.save_many(order for _, order, _ in paid)
+            except Exception as e:
+                for index, order, original_status in paid:
+                    order.revert_payment(original_status)
+                    responses[index] = self._unexpected_error(order.id, e)
+        
+        return responses
+    
+    @staticmethod
+    def _unexpected_error(order_id: str, error: Exception) -> PayOrderResponse:
+        return PayOrderResponse(
+            success=False,
+            order_id=order_id,
+            error_message=f"Unexpected error: {str(error)}"
+        )
@@ -0,0 +1,159 @@
+from array import array
+from collections.abc import MutableMapping
+from itertools import compress
+from operator import mul
+from typing import Dict, Iterator, List, Optional
+from .entities import OrderLine
+from .value_objects import Money, MinorUnits
+
+
+class ColumnarOrderLines(MutableMapping):
+    """Колоночное хранилище линий заказа
+    
+    Альтернативное хранилище для Order (параметр line_store): линии лежат в
+    параллельных массивах - ID товаров, количества и цены в минорных единицах.
+    Итоги считаются проходом по массивам без создания Money на каждую линию,
+    а объекты OrderLine создаются лениво при обращении к линиям.
+    
+    Изменять хранилище следует только через Order: агрегат проверяет
+    инварианты (запрет изменения оплаченного заказа) и ведет текущие суммы.
+    """
+    
+    # Удаленные позиции уплотняются, когда их больше половины
+    _COMPACT_MIN_REMOVED = 32
+    
+    def __init__(self):
+        self._product_ids: List[Optional[str]] = []
+        self._product_names: List[Optional[str]] = []
+        self._quantities = array('q')
+        self._unit_prices = array('q')
+        self._currencies = array('H')
+        self._currency_codes: List[str] = []
+        self._currency_indexes: Dict[str, int] = {}
+        self._positions: Dict[str, int] = {}
+        self._removed = 0
+    
+    def __getitem__(self, product_id: str) -> OrderLine:
+        return self._line_at(self._positions[product_id])
+    
+    def __setitem__(self, product_id: str, line: OrderLine):
+        if line.product_id != product_id:
+            raise ValueError(f"Line product {line.product_id} does not match key {product_id}")
+        
+        units = MinorUnits.from_money(line.unit_price).units
+        currency = self._currency_index(line.unit_price.currency)
+        position = self._positions.get(product_id)
+        
+        if position is None:
+            self._positions[product_id] = len(self._product_ids)
+            self._product_ids.append(product_id)
+            self._product_names.append(line.product_name)
+            self._quantities.append(line.quantity)
+            self._unit_prices.append(units)
+            self._currencies.append(currency)
+        else:
+            self._product_names[position] = line.product_name
+            self._quantities[position] = line.quantity
+            self._unit_prices[position] = units
+            self._currencies[position] = currency
+    
+    def __delitem__(self, product_id: str):
+        position = self._positions.pop(product_id)
+        # Удаленная позиция остается в массивах с нулевым вкладом в итоги
+        self._product_ids[position] = None
+        self._product_names[position] = None
+        self._quantities[position] = 0
+        self._unit_prices[position] = 0
+        self._removed += 1
+        
+        if self._removed >= self._COMPACT_MIN_REMOVED and self._removed * 2 > len(self._product_ids):
+            self._compact()
+    
+    def __iter__(self) -> Iterator[str]:
+        return (product_id for product_id in self._product_ids if product_id is not None)
+    
+    def __len__(self) -> int:
+        return len(self._positions)
+    
+    def clear(self):
+        self.__init__()
+    
+    def totals(self) -> Dict[str, Money]:
+        """Суммы линий по валютам"""
+        return {
+            code: MinorUnits(units, code).to_money()
+            for code, units in self._total_units().items()
+        }
+    
+    def product_totals(self) -> Dict[str, Money]:
+        """Суммы по товарам"""
+        codes = self._currency_codes
+        return {
+            product_id: MinorUnits(units, codes[currency]).to_money()
+            for product_id, units, currency in zip(
+                self._product_ids, map(mul, self._quantities, self._unit_prices), self._currencies
+            )
+            if product_id is not None
+        }
+    
+    def filter(self, min_quantity: int = 1, min_line_total: Optional[Money] = None) -> Iterator[OrderLine]:
+        """Линии с количеством не меньше min_quantity и суммой не меньше min_line_total"""
+        mask = map(min_quantity.__le__, self._quantities)
+        
+        if min_line_total is not None:
+            threshold = MinorUnits.from_money(min_line_total).units
+            currency = self._currency_indexes.get(min_line_total.currency)
+            if currency is None:
+                return iter(())
+            totals_mask = map(threshold.__le__, map(mul, self._quantities, self._unit_prices))
+            currency_mask = map(currency.__eq__, self._currencies)
+            mask = map(all, zip(mask, totals_mask, currency_mask))
+        
+        positions = compress(range(len(self._product_ids)), mask)
+        return (
+            self._line_at(position) for position in positions
+            if self._product_ids[position] is not None
+        )
+    
+    def _total_units(self) -> Dict[str, int]:
+        codes = self._currency_codes
+        if not self._positions:
+            return {}
+        if len(codes) == 1:
+            return {codes[0]: sum(map(mul, self._quantities, self._unit_prices))}
+        
+        totals: Dict[str, int] = {}
+        for product_id, currency, units in zip(
+            self._product_ids, self._currencies, map(mul, self._quantities, self._unit_prices)
+        ):
+            if product_id is not None:
+                code = codes[currency]
+                totals[code] = totals.get(code, 0) + units
+        return totals
+    
+    def _line_at(self, position: int) -> OrderLine:
+        return OrderLine(
+            product_id=self._product_ids[position],
+            product_name=self._product_names[position],
+            quantity=self._quantities[position],
+            unit_price=MinorUnits(
+                self._unit_prices[position], self._currency_codes[self._currencies[position]]
+            ).to_money()
+        )
+    
+    def _currency_index(self, currency: str) -> int:
+        index = self._currency_indexes.get(currency)
+        if index is None:
+            index = self._currency_indexes[currency] = len(self._currency_codes)
+            self._currency_codes.append(currency)
+        return index
+    
+    def _compact(self):
+        alive = [product_id is not None for product_id in self._product_ids]
+        self._product_ids = list(compress(self._product_ids, alive))
+        self._product_names = list(compress(self._product_names, alive))
+        self._quantities = array('q', compress(self._quantities, alive))
+        self._unit_prices = array('q', compress(self._unit_prices, alive))
+        self._currencies = array('H', compress(self._currencies, alive))
+        self._positions = {product_id: position for position, product_id in enumerate(self._product_ids)}
+        self._removed = 0
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from decimal import Context, Decimal, ROUND_HALF_EVEN
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+from .interfaces import ExchangeRateProvider
+from .value_objects import Money, MoneyBag, currency_exponent
+
+
+# Один контекст на все пересчеты: без localcontext() на каждую сумму
+_CONTEXT = Context(prec=28, rounding=ROUND_HALF_EVEN)
+
+
+class CurrencyConverter:
+    """Перевод денег между валютами с кешем курсов
+    
+    Курсы запрашиваются у ExchangeRateProvider и хранятся ttl секунд
+    (LRU, не больше max_size пар валют). Результат округляется до минорных
+    единиц целевой валюты по банковскому правилу. Суммы в нескольких
+    валютах (MoneyBag, итоги заказа) сначала складываются точно в исходных
+    валютах, а переводится только итог по каждой валюте - по одному
+    курсу и одному округлению на валюту независимо от числа строк.
+    """
+    
+    def __init__(self, provider: ExchangeRateProvider, ttl: Optional[float] = 300.0,
+                 max_size: int = 1024, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            provider: Источник курсов
+            ttl: Время жизни курса в кеше в секундах (None - без ограничения)
+            max_size: Максимальное число пар валют в кеше
+            clock: Источник времени (для тестов)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        
+        self.provider = provider
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rates: "OrderedDict[Tuple[str, str], Tuple[float, Decimal]]" = OrderedDict()
+        self._quanta: Dict[str, Decimal] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def rate(self, source: str, target: str) -> Decimal:
+        """Курс перевода source в target"""
+        if source == target:
+            return Decimal(1)
+        
+        key = (source, target)
+        with self._lock:
+            entry = self._rates.get(key)
+            if entry is not None and (self.ttl is None or self._clock() - entry[0] <= self.ttl):
+                self._rates.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        # Провайдер вызывается без блокировки: медленный источник
+        # не должен задерживать пересчеты по уже известным курсам
+        rate = Decimal(self.provider.get_rate(source, target))
+        with self._lock:
+            self._rates[key] = (self._clock(), rate)
+            self._rates.move_to_end(key)
+            while len(self._rates) > self.max_size:
+                self._rates.popitem(last=False)
+        return rate
+    
+    def convert(self, money: Money, target: str) -> Money:
+        """Перевод суммы в валюту target"""
+        if money.currency == target:
+            return money
+        return self._convert(money.amount, self.rate(money.currency, target), target)
+    
+    def convert_many(self, amounts: Iterable[Money], target: str) -> List[Money]:
+        """Перевод каждой суммы в валюту target (курс берется один раз на валюту)"""
+        rates: Dict[str, Decimal] = {}
+        result = []
+        for money in amounts:
+            if money.currency == target:
+                result.append(money)
+                continue
+            rate = rates.get(money.currency)
+            if rate is None:
+                rate = rates[money.currency] = self.rate(money.currency, target)
+            result.append(self._convert(money.amount, rate, target))
+        return result
+    
+    def total(self, amounts: Union[MoneyBag, Iterable[Money]], target: str) -> Money:
+        """Сумма в валюте target
+        
+        Каждая валюта переводится и округляется один раз, затем итоги складываются.
+        """
+        bag = amounts if isinstance(amounts, MoneyBag) else MoneyBag(amounts)
+        return self.convert_totals(bag.totals(), target)
+    
+    def convert_totals(self, totals: Dict[str, Decimal], target: str) -> Money:
+        """Сумма словаря валюта -> сумма в валюте target"""
+        total = Decimal(0)
+        for currency, amount in totals.items():
+            if currency == target:
+                total = _CONTEXT.add(total, amount)
+            else:
+                total = _CONTEXT.add(total, self._convert(amount, self.rate(currency, target), target).amount)
+        return Money._unchecked(total, target)
+    
+    def clear(self):
+        """Сброс кеша курсов"""
+        with self._lock:
+            self._rates.clear()
+    
+    def _convert(self, amount: Decimal, rate: Decimal, target: str) -> Money:
+        quantum = self._quanta.get(target)
+        if quantum is None:
+            quantum = self._quanta[target] = Decimal(1).scaleb(-currency_exponent(target))
+        return Money(_CONTEXT.multiply(amount, rate).quantize(quantum, context=_CONTEXT), target)
@@ -1,14 +1,29 @@
-from dataclasses import dataclass, field
-from typing import List, Optional
+import time
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Dict, Iterable, List, MutableMapping, Optional, Tuple
 from decimal import Decimal
 from enum import Enum
-from .value_objects import Money
+from .value_objects import Money, MoneyBag
+from .events import (
+    DomainEvent,
+    EventRecord,
+    LineAdded,
+    LineQuantityChanged,
+    LineRemoved,
+    OrderPaid,
+    materialize_event,
+)
 from .exceptions import (
     EmptyOrderException, 
     OrderAlreadyPaidException, 
-    OrderModificationException
+    OrderModificationException,
+    OrderLineNotFoundException,
+    InvalidQuantityException
 )
 
+if TYPE_CHECKING:
+    from .currency_conversion import CurrencyConverter
+
 
 class OrderStatus(Enum):
     """Статусы заказа"""
@@ -17,66 +32,310 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(frozen=True)
 class OrderLine:
-    """Линия заказа - часть агрегата Order"""
+    """Линия заказа - часть агрегата Order
+    
+    Неизменяемая: агрегат заменяет линию (replace), поэтому копии заказа
+    и кэши репозиториев могут разделять одни и те же линии.
+    """
+    __slots__ = ('product_id', 'product_name', 'quantity', 'unit_price')
+    
     product_id: str
     product_name: str
     quantity: int
     unit_price: Money
     
+    def __reduce__(self):
+        return (self.__class__, (self.product_id, self.product_name, self.quantity, self.unit_price))
+    
     @property
     def total_price(self) -> Money:
         return self.unit_price * self.quantity
 
 
-@dataclass
+@dataclass(init=False)
 class Order:
-    """Агрегат Order - корневая сущность"""
+    """Агрегат Order - корневая сущность
+    
+    Линии хранятся в словаре по product_id (в порядке добавления), поэтому
+    поиск, удаление и изменение количества по товару выполняются за O(1).
+    Вместо словаря можно передать другое хранилище линий (line_store),
+    например ColumnarOrderLines для очень больших заказов.
+    
+    Изменения линий и оплата записываются как доменные события, если запись
+    включена (record_events или enable_events - это делает репозиторий с
+    outbox при сохранении и загрузке; для нового заказа enable_events
+    записывает и уже добавленные линии); репозиторий забирает их при
+    сохранении (pull_events). Без outbox события не записываются вовсе.
+    Загрузка заказа и присваивание lines событий не создают.
+    """
     id: str
     customer_id: str
-    lines: List[OrderLine] = field(default_factory=list)
+    _lines: MutableMapping[str, OrderLine]
     status: OrderStatus = OrderStatus.CREATED
+    # Версия сохраненного состояния для оптимистичной блокировки (0 - не сохранялся)
+    version: int = field(default=0, compare=False)
+    # Текущие суммы и число строк по валютам, обновляются при изменении линий
+    _totals: Dict[str, Decimal] = field(repr=False, compare=False)
+    _line_counts: Dict[str, int] = field(repr=False, compare=False)
+    _total_cache: Optional[Money] = field(repr=False, compare=False)
+    # Несохраненные события (EventRecord) - объекты создаются при чтении;
+    # None - события не записываются
+    _events: Optional[List[tuple]] = field(repr=False, compare=False)
+    
+    def __init__(self, id: str, customer_id: str, lines: Optional[List[OrderLine]] = None,
+                 status: OrderStatus = OrderStatus.CREATED,
+                 line_store: Optional[MutableMapping[str, OrderLine]] = None,
+                 version: int = 0, record_events: bool = False):
+        self.id = id
+        self.customer_id = customer_id
+        self.status = status
+        self.version = version
+        self._lines = {} if line_store is None else line_store
+        self._events = [] if record_events else None
+        self._set_lines(lines or [])
+    
+    @classmethod
+    def restore(cls, id: str, customer_id: str, lines: Iterable[OrderLine], status: OrderStatus,
+                version: int, totals: Dict[str, Decimal], line_counts: Dict[str, int],
+                line_store: Optional[MutableMapping[str, OrderLine]] = None) -> 'Order':
+        """Восстановление сохраненного заказа с уже известными суммами
+        
+        Суммы и число строк по валютам не пересчитываются по линиям: их
+        согласованность с линиями обеспечивает источник (снимок заказа).
+        """
+        order = cls(id, customer_id, status=status, line_store=line_store, version=version)
+        order._lines.update((line.product_id, line) for line in lines)
+        order._totals = dict(totals)
+        order._line_counts = dict(line_counts)
+        return order
+    
+    def copy(self) -> 'Order':
+        """Независимая копия агрегата с тем же типом хранилища линий
+        
+        Несохраненные события не копируются, режим их записи сохраняется.
+        """
+        clone = Order(self.id, self.customer_id, status=self.status,
+                      line_store=type(self._lines)(), version=self.version,
+                      record_events=self._events is not None)
+        # Линии неизменяемы (frozen), их можно разделять
+        clone._lines.update(self._lines)
+        clone._totals = dict(self._totals)
+        clone._line_counts = dict(self._line_counts)
+        clone._total_cache = self._total_cache
+        return clone
+    
+    @property
+    def lines(self) -> Tuple[OrderLine, ...]:
+        """Линии заказа в порядке добавления (только для чтения: изменения - через методы агрегата)"""
+        return tuple(self._lines.values())
+    
+    @lines.setter
+    def lines(self, lines: List[OrderLine]):
+        if self.status == OrderStatus.PAID:
+            raise OrderModificationException("Cannot modify paid order")
+        
+        self._set_lines(lines)
+    
+    def _set_lines(self, lines: List[OrderLine]):
+        self._lines.clear()
+        self._totals = {}
+        self._line_counts = {}
+        self._total_cache = None
+        for line in lines:
+            self._merge_line(line)
+    
+    def get_line(self, product_id: str) -> Optional[OrderLine]:
+        """Получение линии заказа по ID товара"""
+        return self._lines.get(product_id)
     
     def add_line(self, product_id: str, product_name: str, quantity: int, unit_price: Money):
-        """Добавление линии в заказ"""
+        """Добавление линии в заказ
+        
+        Если товар уже есть в заказе, его количество увеличивается.
+        """
         if self.status == OrderStatus.PAID:
             raise OrderModificationException("Cannot modify paid order")
         
-        self.lines.append(OrderLine(
+        self._merge_line(OrderLine(
             product_id=product_id,
             product_name=product_name,
             quantity=quantity,
             unit_price=unit_price
         ))
+        if self._events is not None:
+            self._events.append((LineAdded, (product_id, product_name, quantity, unit_price), time.time()))
     
     def remove_line(self, product_id: str):
         """Удаление линии из заказа"""
         if self.status == OrderStatus.PAID:
             raise OrderModificationException("Cannot modify paid order")
         
-        self.lines = [line for line in self.lines if line.product_id != product_id]
+        line = self._lines.pop(product_id, None)
+        if line is not None:
+            self._account_line(line, -1)
+            if self._events is not None:
+                self._events.append((LineRemoved, (product_id,), time.time()))
+    
+    def update_quantity(self, product_id: str, quantity: int):
+        """Изменение количества товара в заказе (0 - удаление линии)"""
+        if self.status == OrderStatus.PAID:
+            raise OrderModificationException("Cannot modify paid order")
+        
+        if quantity < 0:
+            raise InvalidQuantityException("Quantity cannot be negative")
+        
+        line = self._lines.get(product_id)
+        if line is None:
+            raise OrderLineNotFoundException(f"Product {product_id} is not in order")
+        
+        if quantity == 0:
+            self.remove_line(product_id)
+            return
+        
+        self._replace_line(line, replace(line, quantity=quantity))
+        if self._events is not None:
+            self._events.append((LineQuantityChanged, (product_id, quantity), time.time()))
+    
+    def _merge_line(self, line: OrderLine):
+        """Добавление линии с объединением по product_id"""
+        existing = self._lines.get(line.product_id)
+        
+        if existing is None:
+            self._lines[line.product_id] = line
+            self._account_line(line, 1)
+            return
+        
+        if existing.unit_price != line.unit_price:
+            raise OrderModificationException(
+                f"Product {line.product_id} is already in order with a different price"
+            )
+        
+        self._replace_line(existing, replace(existing, quantity=existing.quantity + line.quantity))
+    
+    def _replace_line(self, old: OrderLine, new: OrderLine):
+        # Присваивание существующему ключу сохраняет позицию линии
+        self._lines[new.product_id] = new
+        self._account_line(old, -1)
+        self._account_line(new, 1)
+    
+    def _account_line(self, line: OrderLine, sign: int):
+        """Учет строки в текущих суммах заказа (sign=1 - добавление, -1 - удаление)"""
+        currency = line.unit_price.currency
+        count = self._line_counts.get(currency, 0) + sign
+        
+        if count:
+            self._line_counts[currency] = count
+            self._totals[currency] = (
+                self._totals.get(currency, Decimal('0'))
+                + sign * line.unit_price.amount * line.quantity
+            )
+        else:
+            del self._line_counts[currency]
+            del self._totals[currency]
+        
+        self._total_cache = None
     
     @property
     def total_amount(self) -> Money:
-        """Расчет общей суммы заказа"""
-        if not self.lines:
-            return Money(Decimal('0'))
+        """Общая сумма заказа
+        
+        Берется из текущих сумм по валютам, поэтому не зависит от числа строк.
+        """
+        if self._total_cache is None:
+            if not self._totals:
+                self._total_cache = Money(Decimal('0'))
+            elif len(self._totals) > 1:
+                raise ValueError("Cannot add money with different currencies")
+            else:
+                (currency, amount), = self._totals.items()
+                self._total_cache = Money(amount, currency)
+        return self._total_cache
+    
+    @property
+    def subtotals(self) -> MoneyBag:
+        """Суммы заказа по валютам"""
+        return MoneyBag.from_totals(self._totals)
+    
+    def total_in(self, currency: str, converter: 'CurrencyConverter') -> Money:
+        """Общая сумма заказа в валюте расчетов
         
-        total = Money(Decimal('0'))
-        for line in self.lines:
-            total = total + line.total_price
-        return total
+        Переводятся текущие суммы по валютам, а не отдельные строки.
+        """
+        return converter.convert_totals(self._totals, currency)
     
     def pay(self):
         """Оплата заказа"""
-        if not self.lines:
+        if not self._lines:
             raise EmptyOrderException("Cannot pay empty order")
         
         if self.status == OrderStatus.PAID:
             raise OrderAlreadyPaidException("Order is already paid")
         
         self.status = OrderStatus.PAID
+        if self._events is not None:
+            self._events.append((OrderPaid, (self.customer_id, self.subtotals), time.time()))
+    
+    def revert_payment(self, status: OrderStatus = OrderStatus.CREATED):
+        """Откат оплаты, не прошедшей в шлюзе: статус status и удаление события OrderPaid"""
+        if self.status != OrderStatus.PAID or status == OrderStatus.PAID:
+            return
+        
+        self.status = status
+        events = self._events
+        if events and events[-1][0] is OrderPaid:
+            events.pop()
+    
+    @property
+    def records_events(self) -> bool:
+        """Включена ли запись доменных событий"""
+        return self._events is not None
+    
+    def enable_events(self):
+        """Включение записи доменных событий (вызывает репозиторий с outbox)
+        
+        У еще не сохранявшегося заказа (version 0) текущее состояние
+        записывается событиями LineAdded (и OrderPaid для оплаченного),
+        чтобы подписчики увидели линии, добавленные до первого сохранения.
+        """
+        if self._events is not None:
+            return
+        self._events = []
+        if self.version:
+            return
+        now = time.time()
+        for line in self._lines.values():
+            self._events.append((LineAdded, (line.product_id, line.product_name,
+                                             line.quantity, line.unit_price), now))
+        if self.status == OrderStatus.PAID:
+            self._events.append((OrderPaid, (self.customer_id, self.subtotals), now))
+    
+    @property
+    def domain_events(self) -> Tuple[DomainEvent, ...]:
+        """Несохраненные доменные события в порядке возникновения"""
+        return tuple(materialize_event(self.id, record) for record in self._events or ())
+    
+    def pull_events(self) -> Tuple[DomainEvent, ...]:
+        """Несохраненные события с очисткой списка"""
+        return tuple(materialize_event(self.id, record) for record in self.pull_event_records())
+    
+    def pull_event_records(self) -> List[EventRecord]:
+        """Несохраненные события в компактном виде с очисткой списка
+        
+        Для outbox, которые создают объекты событий при чтении, а не в
+        горячем пути сохранения (см. materialize_event).
+        """
+        events = self._events
+        if not events:
+            return []
+        self._events = []
+        return events
+    
+    def clear_events(self):
+        """Очистка списка несохраненных событий"""
+        if self._events:
+            self._events.clear()
     
     def is_paid(self) -> bool:
         """Проверка, оплачен ли заказ"""
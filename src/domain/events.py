@@ -0,0 +1,94 @@
+import time
+from dataclasses import dataclass, field, fields
+from decimal import Decimal
+from typing import Any, Dict, Tuple, Type
+from .value_objects import Money, MoneyBag
+
+
+@dataclass(frozen=True)
+class DomainEvent:
+    """Базовый класс доменных событий заказа"""
+    order_id: str
+
+
+@dataclass(frozen=True)
+class LineAdded(DomainEvent):
+    """В заказ добавлен товар (или увеличено его количество)"""
+    product_id: str
+    product_name: str
+    quantity: int
+    unit_price: Money
+    occurred_at: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class LineQuantityChanged(DomainEvent):
+    """Изменено количество товара в заказе"""
+    product_id: str
+    quantity: int
+    occurred_at: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class LineRemoved(DomainEvent):
+    """Товар удален из заказа"""
+    product_id: str
+    occurred_at: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class OrderPaid(DomainEvent):
+    """Заказ оплачен"""
+    customer_id: str
+    # Суммы по валютам (для заказа в одной валюте - amounts.to_money())
+    amounts: MoneyBag
+    occurred_at: float = field(default_factory=time.time)
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    """Событие, сохраненное в outbox; id растет в порядке сохранения"""
+    id: int
+    event: DomainEvent
+
+
+EVENT_TYPES: Dict[str, Type[DomainEvent]] = {
+    event_type.__name__: event_type
+    for event_type in (LineAdded, LineQuantityChanged, LineRemoved, OrderPaid)
+}
+
+
+# Компактная запись события в агрегате: (тип, аргументы без order_id, время)
+EventRecord = Tuple[Type[DomainEvent], tuple, float]
+
+
+def materialize_event(order_id: str, record: EventRecord) -> DomainEvent:
+    """Создание объекта события из компактной записи"""
+    event_type, args, occurred_at = record
+    return event_type(order_id, *args, occurred_at)
+
+
+def event_to_dict(event: DomainEvent) -> Dict[str, Any]:
+    """Представление события для JSON"""
+    data: Dict[str, Any] = {"type": type(event).__name__}
+    for event_field in fields(event):
+        value = getattr(event, event_field.name)
+        if isinstance(value, Money):
+            value = {"amount": str(value.amount), "currency": value.currency}
+        elif isinstance(value, MoneyBag):
+            value = {currency: str(amount) for currency, amount in value.totals().items()}
+        data[event_field.name] = value
+    return data
+
+
+def event_from_dict(data: Dict[str, Any]) -> DomainEvent:
+    """Восстановление события из представления event_to_dict"""
+    data = dict(data)
+    event_type = EVENT_TYPES[data.pop("type")]
+    if "unit_price" in data:
+        data["unit_price"] = Money(Decimal(data["unit_price"]["amount"]), data["unit_price"]["currency"])
+    if "amounts" in data:
+        data["amounts"] = MoneyBag.from_totals(
+            {currency: Decimal(amount) for currency, amount in data["amounts"].items()}
+        )
+    return event_type(**data)
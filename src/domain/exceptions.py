@@ -21,3 +21,23 @@ class OrderModificationException(DomainException):
 class InvalidMoneyValueException(DomainException):
     """Исключение для невалидной суммы денег"""
     pass
+
+
+class OrderLineNotFoundException(DomainException):
+    """Исключение для отсутствующей в заказе линии"""
+    pass
+
+
+class InvalidQuantityException(DomainException):
+    """Исключение для невалидного количества товара"""
+    pass
+
+
+class ConcurrentModificationException(DomainException):
+    """Исключение при сохранении заказа, измененного другим участником"""
+    pass
+
+
+class ExchangeRateNotFoundException(DomainException):
+    """Исключение для отсутствующего курса обмена валют"""
+    pass
@@ -1,11 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Optional
-from .entities import Order
+from contextlib import nullcontext
+from decimal import Decimal
+from typing import ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .entities import Order, OrderStatus
+from .events import OutboxMessage
 from .value_objects import Money
 
 
 class OrderRepository(ABC):
-    """Интерфейс репозитория заказов"""
+    """Интерфейс репозитория заказов
+    
+    find_by_customer и find_by_status - абстрактные: общей реализации без
+    доступа к хранилищу нет, поэтому собственные репозитории, написанные
+    до их появления, должны их определить (иначе экземпляр не создается).
+    """
     
     @abstractmethod
     def get_by_id(self, order_id: str) -> Optional[Order]:
@@ -16,6 +24,46 @@ class OrderRepository(ABC):
     def save(self, order: Order):
         """Сохранение заказа"""
         pass
+    
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        """Пакетное получение заказов по ID (отсутствующие ID не попадают в результат)"""
+        orders = {}
+        for order_id in order_ids:
+            order = self.get_by_id(order_id)
+            if order is not None:
+                orders[order_id] = order
+        return orders
+    
+    def save_many(self, orders: Iterable[Order]):
+        """Пакетное сохранение заказов"""
+        for order in orders:
+            self.save(order)
+    
+    def lock(self, order_id: str) -> ContextManager:
+        """Блокировка заказа на время чтения-изменения-записи
+        
+        По умолчанию блокировки нет; потокобезопасные репозитории
+        возвращают блокировку, общую для всех обращений к order_id.
+        """
+        return nullcontext()
+    
+    @abstractmethod
+    def find_by_customer(self, customer_id: str, limit: Optional[int] = None) -> Iterator[Order]:
+        """Заказы клиента (не больше limit)
+        
+        Репозитории с вторичными индексами выполняют выборку за O(размер
+        результата).
+        """
+        pass
+    
+    @abstractmethod
+    def find_by_status(self, status: OrderStatus, limit: Optional[int] = None) -> Iterator[Order]:
+        """Заказы в статусе status (не больше limit)
+        
+        Набор ID фиксируется при вызове, поэтому заказы можно сохранять
+        (например, оплачивать) во время обхода результата.
+        """
+        pass
 
 
 class PaymentGateway(ABC):
@@ -25,3 +73,79 @@ class PaymentGateway(ABC):
     def charge(self, order_id: str, amount: Money) -> bool:
         """Выполнение платежа"""
         pass
+    
+    def charge_many(self, charges: Sequence[Tuple[str, Money]]) -> List[bool]:
+        """Пакетное выполнение платежей.
+        
+        Возвращает результаты в том же порядке, что и charges.
+        По умолчанию выполняет charge для каждого платежа по очереди,
+        шлюзы с нативным пакетным API переопределяют этот метод.
+        """
+        return [self.charge(order_id, amount) for order_id, amount in charges]
+
+
+class EventOutbox(ABC):
+    """Интерфейс outbox: доменные события, сохраненные вместе с заказами
+    
+    Репозиторий с outbox записывает события заказа в той же операции
+    (транзакции), что и сам заказ. Сообщение остается в outbox, пока
+    не отмечено доставленным.
+    """
+    
+    @abstractmethod
+    def fetch_pending(self, limit: int = 100) -> List[OutboxMessage]:
+        """Первые limit недоставленных сообщений в порядке сохранения"""
+        pass
+    
+    @abstractmethod
+    def mark_delivered(self, message_ids: Iterable[int]):
+        """Удаление доставленных сообщений"""
+        pass
+
+
+class EventSubscriber(ABC):
+    """Интерфейс подписчика на доменные события"""
+    
+    @abstractmethod
+    def handle(self, messages: Sequence[OutboxMessage]):
+        """Обработка пакета сообщений
+        
+        Доставка - не менее одного раза: при сбое пакет может прийти
+        повторно, подписчик отбрасывает дубликаты по OutboxMessage.id.
+        """
+        pass
+
+
+class ExchangeRateProvider(ABC):
+    """Интерфейс источника курсов обмена валют"""
+    
+    @abstractmethod
+    def get_rate(self, source: str, target: str) -> Decimal:
+        """Курс перевода единицы source в target
+        
+        Если курса нет, выбрасывает ExchangeRateNotFoundException.
+        """
+        pass
+
+
+class AsyncOrderRepository(ABC):
+    """Асинхронный интерфейс репозитория заказов"""
+    
+    @abstractmethod
+    async def get_by_id(self, order_id: str) -> Optional[Order]:
+        """Получение заказа по ID"""
+        pass
+    
+    @abstractmethod
+    async def save(self, order: Order):
+        """Сохранение заказа"""
+        pass
+
+
+class AsyncPaymentGateway(ABC):
+    """Асинхронный интерфейс платежного шлюза"""
+    
+    @abstractmethod
+    async def charge(self, order_id: str, amount: Money) -> bool:
+        """Выполнение платежа"""
+        pass
@@ -1,23 +1,73 @@
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError
 from decimal import Decimal
-from typing import Union
+from typing import Dict, Iterable, Iterator, Tuple, Union
 from .exceptions import InvalidMoneyValueException
 
 
-@dataclass(frozen=True)
+# Число знаков дробной части (минорных единиц) для валют; остальные - 2
+CURRENCY_EXPONENTS: Dict[str, int] = {
+    "JPY": 0,
+    "KRW": 0,
+    "BHD": 3,
+    "KWD": 3,
+}
+DEFAULT_CURRENCY_EXPONENT = 2
+
+
+def currency_exponent(currency: str) -> int:
+    """Число знаков дробной части для валюты"""
+    return CURRENCY_EXPONENTS.get(currency, DEFAULT_CURRENCY_EXPONENT)
+
+
 class Money:
-    """Value Object для представления денег"""
+    """Value Object для представления денег
+    
+    Неизменяемый объект со __slots__: без __dict__ на каждый экземпляр.
+    """
+    __slots__ = ('amount', 'currency')
+    
     amount: Decimal
-    currency: str = "USD"
+    currency: str
     
-    def __post_init__(self):
-        if self.amount < 0:
+    def __init__(self, amount: Decimal, currency: str = "USD"):
+        if amount < 0:
             raise InvalidMoneyValueException("Amount cannot be negative")
+        object.__setattr__(self, 'amount', amount)
+        object.__setattr__(self, 'currency', currency)
+    
+    @classmethod
+    def _unchecked(cls, amount: Decimal, currency: str) -> 'Money':
+        """Создание без валидации - для заведомо неотрицательных результатов"""
+        money = object.__new__(cls)
+        object.__setattr__(money, 'amount', amount)
+        object.__setattr__(money, 'currency', currency)
+        return money
+    
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+    
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+    
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.amount == other.amount and self.currency == other.currency
+    
+    def __hash__(self) -> int:
+        return hash((self.amount, self.currency))
+    
+    def __repr__(self) -> str:
+        return f"Money(amount={self.amount!r}, currency={self.currency!r})"
+    
+    def __reduce__(self):
+        return (self.__class__, (self.amount, self.currency))
     
     def __add__(self, other: 'Money') -> 'Money':
         if self.currency != other.currency:
             raise ValueError("Cannot add money with different currencies")
-        return Money(self.amount + other.amount, self.currency)
+        # Сумма двух неотрицательных значений неотрицательна
+        return Money._unchecked(self.amount + other.amount, self.currency)
     
     def __mul__(self, multiplier: Union[int, Decimal]) -> 'Money':
         return Money(self.amount * Decimal(multiplier), self.currency)
@@ -29,3 +79,159 @@ class Money:
     def from_float(cls, amount: float, currency: str = "USD") -> 'Money':
         """Создание Money из float"""
         return cls(Decimal(str(amount)), currency)
+    
+    def to_minor_units(self) -> 'MinorUnits':
+        """Перевод в целое число минорных единиц (центов)"""
+        return MinorUnits.from_money(self)
+
+
+class MinorUnits:
+    """Денежная сумма в целых минорных единицах валюты (например, центах)
+    
+    Представление с фиксированной точкой для горячих циклов: сложение и
+    умножение выполняются над int без Decimal. Перевод в Money - через to_money.
+    """
+    __slots__ = ('units', 'currency')
+    
+    units: int
+    currency: str
+    
+    def __init__(self, units: int, currency: str = "USD"):
+        if units < 0:
+            raise InvalidMoneyValueException("Amount cannot be negative")
+        object.__setattr__(self, 'units', units)
+        object.__setattr__(self, 'currency', currency)
+    
+    @classmethod
+    def from_money(cls, money: Money) -> 'MinorUnits':
+        """Точный перевод Money в минорные единицы"""
+        scaled = money.amount.scaleb(currency_exponent(money.currency))
+        units = int(scaled)
+        if units != scaled:
+            raise InvalidMoneyValueException(
+                f"Amount {money.amount} has more decimal places than {money.currency} allows"
+            )
+        return cls(units, money.currency)
+    
+    def to_money(self) -> Money:
+        """Перевод в Money"""
+        exponent = currency_exponent(self.currency)
+        return Money._unchecked(Decimal(self.units).scaleb(-exponent), self.currency)
+    
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+    
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+    
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.units == other.units and self.currency == other.currency
+    
+    def __hash__(self) -> int:
+        return hash((self.units, self.currency))
+    
+    def __repr__(self) -> str:
+        return f"MinorUnits(units={self.units!r}, currency={self.currency!r})"
+    
+    def __reduce__(self):
+        return (self.__class__, (self.units, self.currency))
+    
+    def __add__(self, other: 'MinorUnits') -> 'MinorUnits':
+        if self.currency != other.currency:
+            raise ValueError("Cannot add money with different currencies")
+        return MinorUnits(self.units + other.units, self.currency)
+    
+    def __mul__(self, multiplier: int) -> 'MinorUnits':
+        return MinorUnits(self.units * multiplier, self.currency)
+    
+    def __str__(self) -> str:
+        return str(self.to_money())
+
+
+class MoneyBag:
+    """Сумма денег в нескольких валютах
+    
+    Неизменяемый набор сумм по валютам: сложение с Money другой валюты не
+    вызывает ошибку, а добавляет валюту. Перевод в одну валюту выполняет
+    CurrencyConverter.
+    """
+    __slots__ = ('_amounts',)
+    
+    _amounts: Dict[str, Decimal]
+    
+    def __init__(self, amounts: Iterable[Money] = ()):
+        totals: Dict[str, Decimal] = {}
+        for money in amounts:
+            totals[money.currency] = totals.get(money.currency, _ZERO) + money.amount
+        object.__setattr__(self, '_amounts', totals)
+    
+    @classmethod
+    def from_totals(cls, totals: Dict[str, Decimal]) -> 'MoneyBag':
+        """Создание из словаря валюта -> сумма (словарь копируется)"""
+        bag = object.__new__(cls)
+        object.__setattr__(bag, '_amounts', dict(totals))
+        return bag
+    
+    @property
+    def currencies(self) -> Tuple[str, ...]:
+        return tuple(self._amounts)
+    
+    def amount(self, currency: str) -> Money:
+        """Сумма в валюте (ноль, если валюты нет в наборе)"""
+        return Money._unchecked(self._amounts.get(currency, _ZERO), currency)
+    
+    def totals(self) -> Dict[str, Decimal]:
+        """Копия сумм по валютам"""
+        return dict(self._amounts)
+    
+    def to_money(self) -> Money:
+        """Сумма в единственной валюте набора"""
+        if not self._amounts:
+            return Money(_ZERO)
+        if len(self._amounts) > 1:
+            raise ValueError("Cannot add money with different currencies")
+        (currency, amount), = self._amounts.items()
+        return Money._unchecked(amount, currency)
+    
+    def __iter__(self) -> Iterator[Money]:
+        for currency, amount in self._amounts.items():
+            yield Money._unchecked(amount, currency)
+    
+    def __len__(self) -> int:
+        return len(self._amounts)
+    
+    def __add__(self, other: Union[Money, 'MoneyBag']) -> 'MoneyBag':
+        totals = dict(self._amounts)
+        for money in ((other,) if isinstance(other, Money) else other):
+            totals[money.currency] = totals.get(money.currency, _ZERO) + money.amount
+        bag = object.__new__(MoneyBag)
+        object.__setattr__(bag, '_amounts', totals)
+        return bag
+    
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+    
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+    
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._amounts == other._amounts
+    
+    def __hash__(self) -> int:
+        return hash(frozenset(self._amounts.items()))
+    
+    def __repr__(self) -> str:
+        return f"MoneyBag({list(self)!r})"
+    
+    def __reduce__(self):
+        return (self.__class__.from_totals, (self._amounts,))
+    
+    def __str__(self) -> str:
+        return " + ".join(str(money) for money in self) or str(Money(_ZERO))
+
+
+_ZERO = Decimal('0')
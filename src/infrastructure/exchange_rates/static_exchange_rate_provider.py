@@ -0,0 +1,36 @@
+from decimal import Decimal
+from typing import Dict, Tuple
+from ...domain.exceptions import ExchangeRateNotFoundException
+from ...domain.interfaces import ExchangeRateProvider
+
+
+class StaticExchangeRateProvider(ExchangeRateProvider):
+    """Источник курсов из фиксированной таблицы
+    
+    Если задан только курс A -> B, обратный курс вычисляется как 1 / курс.
+    """
+    
+    def __init__(self, rates: Dict[Tuple[str, str], Decimal] = None):
+        """
+        Args:
+            rates: Курсы по парам (исходная валюта, целевая валюта)
+        """
+        self.rates = {pair: Decimal(rate) for pair, rate in (rates or {}).items()}
+        self.lookups = 0
+    
+    def set_rate(self, source: str, target: str, rate: Decimal):
+        """Установка курса"""
+        self.rates[(source, target)] = Decimal(rate)
+    
+    def get_rate(self, source: str, target: str) -> Decimal:
+        """Курс перевода единицы source в target"""
+        self.lookups += 1
+        rate = self.rates.get((source, target))
+        if rate is not None:
+            return rate
+        
+        inverse = self.rates.get((target, source))
+        if inverse:
+            return Decimal(1) / inverse
+        
+        raise ExchangeRateNotFoundException(f"No exchange rate from {source} to {target}")
@@ -0,0 +1,307 @@
+import csv
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Set, Tuple
+from ...domain.entities import Order, OrderStatus
+from ...domain.exceptions import ConcurrentModificationException, DomainException
+from ...domain.interfaces import OrderRepository
+from ...domain.value_objects import MinorUnits, Money
+
+
+class RowValidationError(ValueError):
+    """Ошибка разбора строки импорта"""
+    pass
+
+
+@dataclass
+class RejectedRow:
+    """Отклоненная строка файла"""
+    line_number: int
+    order_id: Optional[str]
+    reason: str
+
+
+@dataclass
+class ImportReport:
+    """Итог (или промежуточный прогресс) импорта"""
+    rows_read: int = 0
+    orders_imported: int = 0
+    lines_imported: int = 0
+    rows_rejected: int = 0
+    orders_rejected: int = 0
+    # Первые max_rejected_samples отклоненных строк (для отклоненного при
+    # сохранении заказа - его первая строка); остальные только считаются
+    rejected: List[RejectedRow] = field(default_factory=list)
+
+
+Row = Tuple[int, dict]
+
+
+def read_csv_rows(path: str, delimiter: str = ",", encoding: str = "utf-8") -> Iterator[Row]:
+    """Построчное чтение CSV с заголовком; выдает (номер строки, поля)
+    
+    Строка - линия заказа: order_id, customer_id, product_id, product_name,
+    quantity, unit_price и необязательные currency (USD) и status (created).
+    """
+    with open(path, newline="", encoding=encoding) as source:
+        reader = csv.DictReader(source, delimiter=delimiter)
+        for record in reader:
+            yield reader.line_num, record
+
+
+def read_jsonl_rows(path: str, encoding: str = "utf-8") -> Iterator[Row]:
+    """Построчное чтение JSON lines; выдает (номер строки, объект)
+    
+    Строка - либо линия заказа с полями как в CSV, либо заказ целиком
+    с полями id, customer_id, status и списком lines.
+    """
+    with open(path, encoding=encoding) as source:
+        for line_number, text in enumerate(source, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError as e:
+                record = RowValidationError(f"Invalid JSON: {e}")
+            yield line_number, record
+
+
+class OrderImporter:
+    """Потоковый импорт заказов в репозиторий
+    
+    Строки читаются генератором и собираются в агрегаты Order; готовые
+    заказы пишутся через save_many порциями по batch_size, так что в памяти
+    находится не больше одной порции. Линии одного заказа должны идти в файле
+    подряд. Заказ с хотя бы одной невалидной строкой не сохраняется целиком.
+    Разрыв группы обнаруживается по окну из recent_orders последних
+    завершенных ID, так что память не растет с размером файла; заказ,
+    вернувшийся позже окна, сохраняется повторно. Репозиторий без проверки
+    версий заменяет прежний заказ, а с проверкой (ConcurrentInMemoryOrderRepository)
+    отклоняет его - как и заказы, уже сохраненные при повторном импорте
+    файла. Такие заказы попадают в orders_rejected, импорт продолжается.
+    """
+    
+    def __init__(self, repository: OrderRepository, batch_size: int = 1000,
+                 progress: Optional[Callable[[ImportReport], None]] = None,
+                 max_rejected_samples: int = 100, recent_orders: int = 1000):
+        """
+        Args:
+            repository: Репозиторий для сохранения заказов
+            batch_size: Число заказов в одном save_many
+            progress: Вызывается с текущим отчетом после каждой записанной порции
+            max_rejected_samples: Сколько отклоненных строк сохранять в отчете
+            recent_orders: Сколько последних ID помнить для поиска разорванных
+                групп (0 - не проверять, если вход заведомо сгруппирован)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        if recent_orders < 0:
+            raise ValueError("recent_orders must not be negative")
+        
+        self.repository = repository
+        self.batch_size = batch_size
+        self.progress = progress
+        self.max_rejected_samples = max_rejected_samples
+        self.recent_orders = recent_orders
+    
+    def import_csv(self, path: str, delimiter: str = ",", encoding: str = "utf-8") -> ImportReport:
+        """Импорт заказов из CSV"""
+        return self.import_rows(read_csv_rows(path, delimiter, encoding))
+    
+    def import_jsonl(self, path: str, encoding: str = "utf-8") -> ImportReport:
+        """Импорт заказов из JSON lines"""
+        return self.import_rows(read_jsonl_rows(path, encoding))
+    
+    def import_rows(self, rows: Iterable[Row]) -> ImportReport:
+        """Импорт из последовательности (номер строки, запись)"""
+        report = ImportReport()
+        # Готовые заказы порции с номером первой строки
+        batch: List[Tuple[int, Order]] = []
+        # Последние завершенные ID - для обнаружения разорванных групп линий
+        finished = _RecentIds(self.recent_orders)
+        group = _OrderGroup(None, 0)
+        
+        for line_number, record in rows:
+            report.rows_read += 1
+            order_id = _order_id(record)
+            
+            if order_id is None:
+                # Строка без ID заказа не относится ни к одной группе
+                reason = str(record) if isinstance(record, Exception) else "Missing order id"
+                self._reject(report, line_number, None, reason)
+                continue
+            
+            if order_id != group.order_id:
+                self._finish(group, batch, finished, report)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, report)
+                group = _OrderGroup(order_id, line_number)
+            
+            try:
+                if order_id in finished:
+                    raise RowValidationError(f"Lines of order {order_id} are not contiguous")
+                group.add(record)
+            except (RowValidationError, DomainException) as e:
+                group.valid = False
+                self._reject(report, line_number, order_id, str(e))
+        
+        self._finish(group, batch, finished, report)
+        self._flush(batch, report)
+        return report
+    
+    def _finish(self, group: '_OrderGroup', batch: List[Tuple[int, Order]], finished: '_RecentIds',
+                report: ImportReport):
+        if group.order_id is None or group.order_id in finished:
+            return
+        finished.add(group.order_id)
+        if group.valid and group.order is not None:
+            batch.append((group.line_number, group.build()))
+        else:
+            report.orders_rejected += 1
+    
+    def _flush(self, batch: List[Tuple[int, Order]], report: ImportReport):
+        if not batch:
+            return
+        saved = [order for _, order in batch]
+        try:
+            self.repository.save_many(saved)
+        except ConcurrentModificationException:
+            # Порция могла записаться частично: заказы сохраняются по одному
+            # (уже записанные - повторно, с новой версией), конфликтующие отклоняются
+            saved = []
+            for line_number, order in batch:
+                try:
+                    self.repository.save(order)
+                except ConcurrentModificationException as e:
+                    report.orders_rejected += 1
+                    self._sample(report, line_number, order.id, str(e))
+                else:
+                    saved.append(order)
+        report.orders_imported += len(saved)
+        report.lines_imported += sum(len(order.lines) for order in saved)
+        batch.clear()
+        if self.progress is not None:
+            self.progress(report)
+    
+    def _reject(self, report: ImportReport, line_number: int, order_id: Optional[str], reason: str):
+        report.rows_rejected += 1
+        self._sample(report, line_number, order_id, reason)
+    
+    def _sample(self, report: ImportReport, line_number: int, order_id: Optional[str], reason: str):
+        if len(report.rejected) < self.max_rejected_samples:
+            report.rejected.append(RejectedRow(line_number, order_id, reason))
+
+
+class _RecentIds:
+    """Ограниченное окно последних ID: при переполнении забывается самый старый"""
+    
+    __slots__ = ('_order', '_ids')
+    
+    def __init__(self, capacity: int):
+        self._order: Deque[str] = deque(maxlen=capacity)
+        self._ids: Set[str] = set()
+    
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._ids
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def add(self, order_id: str):
+        if self._order.maxlen == 0 or order_id in self._ids:
+            return
+        if len(self._order) == self._order.maxlen:
+            self._ids.discard(self._order[0])
+        self._order.append(order_id)
+        self._ids.add(order_id)
+
+
+class _OrderGroup:
+    """Заказ, собираемый из идущих подряд строк"""
+    
+    def __init__(self, order_id: Optional[str], line_number: int):
+        self.order_id = order_id
+        self.line_number = line_number
+        self.order: Optional[Order] = None
+        self.status = OrderStatus.CREATED
+        self.valid = True
+    
+    def add(self, record: dict):
+        if self.order is None:
+            self.order = Order(id=self.order_id, customer_id=_required(record, "customer_id"))
+            self.status = _parse_status(record)
+        elif record.get("customer_id", self.order.customer_id) != self.order.customer_id:
+            raise RowValidationError(f"Customer of order {self.order_id} differs between rows")
+        
+        lines = record["lines"] if "lines" in record else [record]
+        if not isinstance(lines, list):
+            raise RowValidationError("Field 'lines' must be a list")
+        
+        for line in lines:
+            if not isinstance(line, dict):
+                raise RowValidationError("Order line must be an object")
+            self.order.add_line(
+                _required(line, "product_id"),
+                _required(line, "product_name"),
+                _parse_quantity(line),
+                _parse_money(line, record.get("currency")),
+            )
+    
+    def build(self) -> Order:
+        # Статус выставляется после линий: в оплаченный заказ add_line запрещен
+        self.order.status = self.status
+        self.order.clear_events()
+        return self.order
+
+
+def _order_id(record) -> Optional[str]:
+    if not isinstance(record, dict):
+        return None
+    value = record.get("id") if "lines" in record else record.get("order_id")
+    if value is None or str(value).strip() == "":
+        return None
+    return str(value)
+
+
+def _parse_status(record: dict) -> OrderStatus:
+    status = record.get("status") or OrderStatus.CREATED.value
+    try:
+        return OrderStatus(status)
+    except ValueError:
+        raise RowValidationError(f"Unknown status {status!r}")
+
+
+def _required(record: dict, name: str) -> str:
+    value = record.get(name)
+    if value is None or str(value).strip() == "":
+        raise RowValidationError(f"Missing field '{name}'")
+    return str(value)
+
+
+def _parse_quantity(record: dict) -> int:
+    value = _required(record, "quantity")
+    try:
+        quantity = int(value)
+    except ValueError:
+        raise RowValidationError(f"Invalid quantity {value!r}")
+    if quantity <= 0:
+        raise RowValidationError(f"Quantity must be positive, got {quantity}")
+    return quantity
+
+
+def _parse_money(record: dict, default_currency: Optional[str]) -> Money:
+    value = _required(record, "unit_price")
+    currency = record.get("currency") or default_currency or "USD"
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise RowValidationError(f"Invalid unit_price {value!r}")
+    if not amount.is_finite():
+        raise RowValidationError(f"Invalid unit_price {value!r}")
+    
+    money = Money(amount, currency)
+    # Цена должна точно выражаться в минорных единицах валюты
+    MinorUnits.from_money(money)
+    return money
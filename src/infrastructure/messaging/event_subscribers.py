@@ -0,0 +1,58 @@
+import json
+import os
+import queue
+from typing import Callable, Optional, Sequence
+from ...domain.events import OutboxMessage, event_to_dict
+from ...domain.interfaces import EventSubscriber
+
+
+class CallbackEventSubscriber(EventSubscriber):
+    """Подписчик внутри процесса: вызывает функцию для каждого пакета"""
+    
+    def __init__(self, callback: Callable[[Sequence[OutboxMessage]], None]):
+        self.callback = callback
+    
+    def handle(self, messages: Sequence[OutboxMessage]):
+        """Обработка пакета сообщений"""
+        self.callback(messages)
+
+
+class QueueEventSubscriber(EventSubscriber):
+    """Подписчик, перекладывающий сообщения в локальную очередь
+    
+    Замена брокера сообщений: потребитель читает очередь в своем потоке.
+    """
+    
+    def __init__(self, target: Optional[queue.Queue] = None):
+        self.queue = target if target is not None else queue.Queue()
+    
+    def handle(self, messages: Sequence[OutboxMessage]):
+        """Обработка пакета сообщений"""
+        for message in messages:
+            self.queue.put(message)
+
+
+class JsonLinesEventSubscriber(EventSubscriber):
+    """Подписчик, дописывающий сообщения в файл JSON lines
+    
+    Замена брокера для внешних потребителей: каждая строка - объект
+    с id сообщения и полями события. Пакет записывается одним write
+    и (при fsync=True) сбрасывается на диск до подтверждения доставки.
+    """
+    
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+    
+    def handle(self, messages: Sequence[OutboxMessage]):
+        """Обработка пакета сообщений"""
+        data = "".join(
+            json.dumps({"id": message.id, **event_to_dict(message.event)},
+                       ensure_ascii=False, separators=(',', ':')) + "\n"
+            for message in messages
+        )
+        with open(self.path, "a", encoding="utf-8") as output:
+            output.write(data)
+            output.flush()
+            if self.fsync:
+                os.fsync(output.fileno())
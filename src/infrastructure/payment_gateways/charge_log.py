@@ -0,0 +1,159 @@
+import csv
+import threading
+from collections import deque
+from itertools import islice
+from decimal import Decimal
+from typing import Deque, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+from ...domain.value_objects import Money
+
+
+class ChargeRecord(NamedTuple):
+    """Запись журнала платежей"""
+    order_id: str
+    amount: Money
+    success: bool
+    
+    def __getitem__(self, key):
+        # Совместимость с прежним форматом журнала: record['amount']
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+
+class ChargeLog:
+    """Журнал платежей
+    
+    По умолчанию журнал не ограничен: все записи хранятся в памяти и
+    память растет с каждым платежом. Для длительных прогонов ограничение
+    нужно включить явно: при заданном capacity в кольцевом буфере
+    остаются последние capacity записей, а вытесняемые дописываются в
+    файл spill_path (CSV). Без spill_path вытесненные записи отбрасываются
+    и учитываются в dropped - такой журнал неполон (truncated), и сверка
+    по нему отказывается работать.
+    
+    Счетчики и суммы успешных платежей по валютам обновляются при каждой
+    записи, поэтому count и total - O(1) независимо от размера журнала.
+    Итерация возвращает сначала записи из файла, затем из буфера - в
+    порядке добавления.
+    """
+    
+    def __init__(self, capacity: Optional[int] = None, spill_path: Optional[str] = None):
+        """
+        Args:
+            capacity: Число записей в памяти (None - без ограничения)
+            spill_path: Файл для вытесненных записей (None - не сохранять)
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be positive")
+        
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self._lock = threading.Lock()
+        self._records: Deque[ChargeRecord] = deque()
+        self._spill_file = None
+        self._spill_writer = None
+        self.count = 0
+        self.succeeded = 0
+        self.spilled = 0
+        self.dropped = 0
+        self._totals: Dict[str, Decimal] = {}
+        
+        if spill_path is not None:
+            # Журнал начинается заново, как и список в памяти
+            open(spill_path, "w").close()
+    
+    def append(self, order_id: str, amount: Money, success: bool):
+        """Добавление записи о платеже"""
+        with self._lock:
+            self._append(ChargeRecord(order_id, amount, success))
+    
+    def extend(self, records: Iterable[Tuple[str, Money, bool]]):
+        """Добавление нескольких записей"""
+        with self._lock:
+            for order_id, amount, success in records:
+                self._append(ChargeRecord(order_id, amount, success))
+    
+    def _append(self, record: ChargeRecord):
+        if self.capacity is not None and len(self._records) >= self.capacity:
+            self._evict(self._records.popleft())
+        self._records.append(record)
+        
+        self.count += 1
+        if record.success:
+            self.succeeded += 1
+            currency = record.amount.currency
+            self._totals[currency] = self._totals.get(currency, Decimal(0)) + record.amount.amount
+    
+    def _evict(self, record: ChargeRecord):
+        if self.spill_path is None:
+            self.dropped += 1
+            return
+        if self._spill_writer is None:
+            self._spill_file = open(self.spill_path, "a", newline="", encoding="utf-8")
+            self._spill_writer = csv.writer(self._spill_file)
+        self._spill_writer.writerow((
+            record.order_id, str(record.amount.amount), record.amount.currency, int(record.success)
+        ))
+        self.spilled += 1
+    
+    @property
+    def truncated(self) -> bool:
+        """Были ли записи отброшены без сохранения"""
+        return self.dropped > 0
+    
+    @property
+    def failed(self) -> int:
+        return self.count - self.succeeded
+    
+    def total(self, currency: str = "USD") -> Money:
+        """Сумма успешных платежей в валюте"""
+        return Money(self._totals.get(currency, Decimal(0)), currency)
+    
+    def totals(self) -> Dict[str, Money]:
+        """Суммы успешных платежей по валютам"""
+        with self._lock:
+            return {currency: Money(amount, currency) for currency, amount in self._totals.items()}
+    
+    def __iter__(self) -> Iterator[ChargeRecord]:
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_file.flush()
+            spilled = self.spilled
+            records = list(self._records)
+        
+        if spilled:
+            with open(self.spill_path, newline="", encoding="utf-8") as spill:
+                # Строки, дописанные после начала итерации, не читаем
+                for order_id, amount, currency, success in islice(csv.reader(spill), spilled):
+                    yield ChargeRecord(order_id, Money(Decimal(amount), currency), success == "1")
+        yield from records
+    
+    def __len__(self) -> int:
+        """Число записей, доступных при итерации (в памяти и в файле)"""
+        return len(self._records) + self.spilled
+    
+    def __getitem__(self, index: int) -> ChargeRecord:
+        """Запись из буфера в памяти"""
+        with self._lock:
+            return self._records[index]
+    
+    def clear(self):
+        """Очистка журнала и счетчиков"""
+        with self._lock:
+            self._records.clear()
+            self._close_spill()
+            if self.spill_path is not None:
+                open(self.spill_path, "w").close()
+            self.count = self.succeeded = self.spilled = self.dropped = 0
+            self._totals.clear()
+    
+    def close(self):
+        """Закрытие файла вытесненных записей"""
+        with self._lock:
+            self._close_spill()
+    
+    def _close_spill(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = self._spill_writer = None
+
@@ -1,33 +1,84 @@
+import random
+import time
 from decimal import Decimal
-from typing import Set
-from domain.value_objects import Money
-from domain.interfaces import PaymentGateway
+from typing import List, Optional, Sequence, Set, Tuple, Type
+from ...domain.value_objects import Money
+from ...domain.interfaces import PaymentGateway
+from .charge_log import ChargeLog
 
 
 class FakePaymentGateway(PaymentGateway):
-    """Fake реализация платежного шлюза"""
+    """Fake реализация платежного шлюза
     
-    def __init__(self, fail_on_orders: Set[str] = None):
+    Журнал платежей (charges_log) по умолчанию не ограничен и растет с
+    каждым списанием. Для длительных прогонов задайте log_capacity вместе
+    со spill_path: в памяти останутся последние записи, остальные уйдут в
+    файл без потерь (см. ChargeLog).
+    """
+    
+    def __init__(self, fail_on_orders: Set[str] = None, latency: float = 0.0,
+                 error_rate: float = 0.0, error_type: Type[Exception] = ConnectionError,
+                 seed: Optional[int] = None, log_capacity: Optional[int] = None,
+                 spill_path: Optional[str] = None):
         """
         Args:
             fail_on_orders: Множество ID заказов, для которых платеж должен завершиться неудачей
+            latency: Имитируемая задержка каждого вызова в секундах
+            error_rate: Доля вызовов, завершающихся исключением error_type (сбой
+                связи до списания - в журнал платежей не попадает)
+            error_type: Тип имитируемого исключения
+            seed: Начальное значение генератора сбоев
+            log_capacity: Число записей журнала платежей в памяти (None - без
+                ограничения); задается только вместе со spill_path, чтобы
+                записи не терялись
+            spill_path: Файл для записей, вытесненных из журнала
         """
+        if latency < 0:
+            raise ValueError("latency cannot be negative")
+        if log_capacity is not None and spill_path is None:
+            raise ValueError("log_capacity requires spill_path")
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        
         self.fail_on_orders = fail_on_orders or set()
-        self.charges_log = []
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_type = error_type
+        self._random = random.Random(seed)
+        self.charges_log = ChargeLog(log_capacity, spill_path)
     
     def charge(self, order_id: str, amount: Money) -> bool:
         """Выполнение платежа"""
-        self.charges_log.append({
-            'order_id': order_id,
-            'amount': amount,
-            'success': order_id not in self.fail_on_orders
-        })
+        self._simulate_network()
+        success = order_id not in self.fail_on_orders
+        self.charges_log.append(order_id, amount, success)
         
-        return order_id not in self.fail_on_orders
+        return success
+    
+    def charge_many(self, charges: Sequence[Tuple[str, Money]]) -> List[bool]:
+        """Пакетное выполнение платежей"""
+        self._simulate_network()
+        fail_on_orders = self.fail_on_orders
+        results = [order_id not in fail_on_orders for order_id, _ in charges]
+        self.charges_log.extend(
+            (order_id, amount, success) for (order_id, amount), success in zip(charges, results)
+        )
+        return results
+    
+    def _simulate_network(self):
+        """Имитация задержки и сбоев провайдера"""
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise self.error_type("Simulated payment gateway failure")
     
     def get_charges_count(self) -> int:
         """Получение количества выполненных платежей"""
-        return len(self.charges_log)
+        return self.charges_log.count
+    
+    def get_total_charged(self, currency: str = "USD") -> Money:
+        """Сумма успешных платежей в валюте"""
+        return self.charges_log.total(currency)
     
     def clear_log(self):
         """Очистка лога платежей"""
@@ -0,0 +1,228 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from enum import Enum
+from typing import Callable, Deque, Optional, Tuple, Type
+from ...domain.value_objects import Money
+from ...domain.interfaces import PaymentGateway
+
+
+class GatewayTimeoutError(TimeoutError):
+    """Платежный шлюз не ответил за отведенное время"""
+    pass
+
+
+class CircuitOpenError(ConnectionError):
+    """Вызов отклонен: предохранитель разомкнут"""
+    pass
+
+
+class BreakerState(Enum):
+    """Состояние предохранителя"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Предохранитель по доле ошибок в скользящем окне вызовов
+    
+    Когда среди последних window_size вызовов (не меньше min_calls) доля
+    ошибок достигает failure_threshold, предохранитель размыкается и
+    вызовы сразу отклоняются. Через reset_timeout пропускается один пробный
+    вызов: успех замыкает предохранитель, ошибка снова размыкает.
+    """
+    
+    def __init__(self, failure_threshold: float = 0.5, window_size: int = 20,
+                 min_calls: int = 10, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if not 0 < failure_threshold <= 1:
+            raise ValueError("failure_threshold must be in (0, 1]")
+        if window_size < 1 or not 1 <= min_calls <= window_size:
+            raise ValueError("min_calls must be between 1 and window_size")
+        
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = BreakerState.CLOSED
+        self._window: Deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._rejected = 0
+        self._opened = 0
+    
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+    
+    def allow(self) -> bool:
+        """Можно ли выполнить вызов; в полуоткрытом состоянии - один пробный"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state is BreakerState.CLOSED:
+                return True
+            if self._state is BreakerState.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            if self._state is BreakerState.HALF_OPEN:
+                self._state = BreakerState.CLOSED
+                self._window.clear()
+                self._trial_in_flight = False
+            self._window.append(True)
+    
+    def record_failure(self):
+        with self._lock:
+            if self._state is BreakerState.HALF_OPEN:
+                self._open()
+                return
+            self._window.append(False)
+            failures = self._window.count(False)
+            if (len(self._window) >= self.min_calls
+                    and failures / len(self._window) >= self.failure_threshold):
+                self._open()
+    
+    def stats(self) -> dict:
+        """Состояние и счетчики для метрик"""
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._window)
+            return {
+                "state": self._state.value,
+                "window_calls": calls,
+                "failure_rate": self._window.count(False) / calls if calls else 0.0,
+                "opened_total": self._opened,
+                "rejected_total": self._rejected,
+            }
+    
+    def _open(self):
+        self._state = BreakerState.OPEN
+        self._opened_at = self._clock()
+        self._trial_in_flight = False
+        self._window.clear()
+        self._opened += 1
+    
+    def _maybe_half_open(self):
+        if self._state is BreakerState.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = BreakerState.HALF_OPEN
+
+
+class ResilientPaymentGateway(PaymentGateway):
+    """Декоратор платежного шлюза с таймаутом, повторами и предохранителем
+    
+    - Вызов charge ограничивается timeout: он выполняется в пуле потоков,
+      зависший вызов продолжает занимать поток, но вызывающий освобождается.
+    - Исключения типов retryable повторяются до max_retries раз с
+      экспоненциальной задержкой и полным случайным разбросом (full jitter).
+      Отказ шлюза (False) - бизнес-результат, он не повторяется.
+    - Ошибки и таймауты учитываются предохранителем; при разомкнутом
+      предохранителе вызов сразу завершается CircuitOpenError.
+    
+    Таймаут по умолчанию не повторяется: списание могло пройти, и повтор
+    безопасен, только если провайдер дедуплицирует платежи по ID заказа.
+    """
+    
+    def __init__(self, gateway: PaymentGateway, timeout: Optional[float] = None,
+                 max_retries: int = 2, backoff_base: float = 0.05, backoff_max: float = 1.0,
+                 retryable: Tuple[Type[BaseException], ...] = (ConnectionError,),
+                 breaker: Optional[CircuitBreaker] = None, max_workers: int = 16,
+                 sleep: Callable[[float], None] = time.sleep,
+                 rng: Optional[random.Random] = None):
+        """
+        Args:
+            gateway: Декорируемый платежный шлюз
+            timeout: Таймаут одного вызова в секундах (None - без таймаута)
+            max_retries: Число повторов после первой попытки
+            backoff_base: Базовая задержка перед первым повтором в секундах
+            backoff_max: Верхняя граница задержки
+            retryable: Типы исключений, считающиеся временными
+            breaker: Предохранитель (по умолчанию - CircuitBreaker())
+            max_workers: Размер пула потоков для вызовов с таймаутом
+        """
+        if max_retries < 0:
+            raise ValueError("max_retries cannot be negative")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive")
+        
+        self.gateway = gateway
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retryable = retryable
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._random = rng or random.Random()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="payment-gateway-timeout")
+            if timeout is not None else None
+        )
+    
+    def charge(self, order_id: str, amount: Money) -> bool:
+        """Выполнение платежа с повторами временных ошибок"""
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(order_id, amount)
+            except CircuitOpenError:
+                # Отклоненный предохранителем вызов не повторяем
+                raise
+            except self.retryable:
+                if attempt >= self.max_retries:
+                    raise
+            self._sleep(self._backoff(attempt))
+            attempt += 1
+    
+    def _attempt(self, order_id: str, amount: Money) -> bool:
+        if not self.breaker.allow():
+            raise CircuitOpenError("Payment gateway circuit breaker is open")
+        
+        try:
+            result = self._call(order_id, amount)
+        except BaseException:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+    
+    def _call(self, order_id: str, amount: Money) -> bool:
+        if self._executor is None:
+            return self.gateway.charge(order_id, amount)
+        
+        future = self._executor.submit(self.gateway.charge, order_id, amount)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # С Python 3.11 это встроенный TimeoutError: если его бросил сам
+            # шлюз, future уже завершен - исключение шлюза пробрасывается как есть
+            if future.done():
+                raise
+            future.cancel()
+            raise GatewayTimeoutError(
+                f"Payment gateway did not respond in {self.timeout:g}s for order {order_id}"
+            )
+    
+    def _backoff(self, attempt: int) -> float:
+        """Задержка перед повтором: full jitter в [0, min(max, base * 2^attempt)]"""
+        return self._random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+    
+    def shutdown(self, wait: bool = True):
+        """Остановка пула потоков"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+    
+    def __enter__(self) -> 'ResilientPaymentGateway':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from ...domain.value_objects import Money
+from ...domain.interfaces import AsyncPaymentGateway, PaymentGateway
+
+
+class ThreadPoolPaymentGateway(AsyncPaymentGateway):
+    """Асинхронный адаптер синхронного платежного шлюза
+    
+    Вызовы charge выполняются в пуле потоков, чтобы блокирующий шлюз
+    не останавливал цикл событий.
+    """
+    
+    def __init__(self, gateway: PaymentGateway, max_workers: Optional[int] = None,
+                 latency: float = 0.0):
+        """
+        Args:
+            gateway: Синхронный платежный шлюз
+            max_workers: Размер пула потоков (по умолчанию - как у ThreadPoolExecutor)
+            latency: Имитируемая задержка каждого платежа в секундах
+        """
+        if latency < 0:
+            raise ValueError("latency cannot be negative")
+        
+        self.gateway = gateway
+        self.latency = latency
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="payment-gateway")
+    
+    async def charge(self, order_id: str, amount: Money) -> bool:
+        """Выполнение платежа в пуле потоков"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._charge, order_id, amount)
+    
+    def _charge(self, order_id: str, amount: Money) -> bool:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.gateway.charge(order_id, amount)
+    
+    def shutdown(self, wait: bool = True):
+        """Остановка пула потоков"""
+        self._executor.shutdown(wait=wait)
+    
+    def __enter__(self) -> 'ThreadPoolPaymentGateway':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -0,0 +1,86 @@
+import importlib
+import threading
+from typing import Any, Callable, Dict, List, Union
+from ..domain.interfaces import OrderRepository, PaymentGateway
+
+
+# Фабрика адаптера: вызываемый объект или строка "модуль:атрибут"
+# (модуль относительно пакета src.infrastructure), импортируемая при первом create
+AdapterTarget = Union[str, Callable[..., Any]]
+
+
+class AdapterRegistry:
+    """Реестр адаптеров инфраструктуры с отложенным импортом
+    
+    Модуль адаптера загружается только при первом создании адаптера этого
+    вида, поэтому процессу, которому нужен один репозиторий, не приходится
+    импортировать sqlite3, пулы потоков и остальные реализации.
+    """
+    
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._targets: Dict[str, AdapterTarget] = {}
+    
+    def register(self, name: str, target: AdapterTarget, replace: bool = False):
+        """Регистрация фабрики адаптера под именем name"""
+        with self._lock:
+            if name in self._targets and not replace:
+                raise ValueError(f"{self.kind} adapter {name} is already registered")
+            self._targets[name] = target
+    
+    def resolve(self, name: str) -> Callable[..., Any]:
+        """Фабрика адаптера; модуль импортируется при первом обращении"""
+        try:
+            target = self._targets[name]
+        except KeyError:
+            raise ValueError(
+                f"Unknown {self.kind} adapter {name}; available: {', '.join(self.names())}"
+            ) from None
+        if not isinstance(target, str):
+            return target
+        
+        module_name, _, attribute = target.partition(":")
+        module = importlib.import_module(module_name, __package__)
+        factory = getattr(module, attribute)
+        with self._lock:
+            # Повторные обращения обходятся без importlib
+            if self._targets.get(name) == target:
+                self._targets[name] = factory
+        return factory
+    
+    def create(self, name: str, *args, **options) -> Any:
+        """Создание адаптера вида name"""
+        return self.resolve(name)(*args, **options)
+    
+    def names(self) -> List[str]:
+        return sorted(self._targets)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._targets
+
+
+repositories = AdapterRegistry("repository")
+repositories.register("memory", ".repositories.in_memory_order_repository:InMemoryOrderRepository")
+repositories.register(
+    "concurrent", ".repositories.concurrent_in_memory_order_repository:ConcurrentInMemoryOrderRepository"
+)
+repositories.register("file", ".repositories.file_order_repository:FileOrderRepository")
+repositories.register("sqlite", ".repositories.sqlite_order_repository:SQLiteOrderRepository")
+repositories.register("caching", ".repositories.caching_order_repository:CachingOrderRepository")
+
+payment_gateways = AdapterRegistry("payment gateway")
+payment_gateways.register("fake", ".payment_gateways.fake_payment_gateway:FakePaymentGateway")
+payment_gateways.register(
+    "resilient", ".payment_gateways.resilient_payment_gateway:ResilientPaymentGateway"
+)
+
+
+def create_repository(name: str, *args, **options) -> OrderRepository:
+    """Создание репозитория заказов по имени (memory, concurrent, file, sqlite, caching)"""
+    return repositories.create(name, *args, **options)
+
+
+def create_payment_gateway(name: str, *args, **options) -> PaymentGateway:
+    """Создание платежного шлюза по имени (fake, resilient)"""
+    return payment_gateways.create(name, *args, **options)
@@ -0,0 +1,22 @@
+from typing import Optional
+from ...domain.entities import Order
+from ...domain.interfaces import AsyncOrderRepository, OrderRepository
+
+
+class AsyncOrderRepositoryAdapter(AsyncOrderRepository):
+    """Асинхронный адаптер синхронного репозитория заказов
+    
+    Предназначен для неблокирующих хранилищ (например, InMemoryOrderRepository):
+    методы вызываются напрямую в цикле событий.
+    """
+    
+    def __init__(self, repository: OrderRepository):
+        self.repository = repository
+    
+    async def get_by_id(self, order_id: str) -> Optional[Order]:
+        """Получение заказа по ID"""
+        return self.repository.get_by_id(order_id)
+    
+    async def save(self, order: Order):
+        """Сохранение заказа"""
+        self.repository.save(order)
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+from ...domain.entities import Order, OrderStatus
+from ...domain.interfaces import EventOutbox, OrderRepository
+
+
+# Запись кеша для ID, которого нет в хранилище
+_MISSING = None
+
+
+class CachingOrderRepository(OrderRepository):
+    """Декоратор репозитория с LRU-кешем заказов (read-through, write-through)
+    
+    - get_by_id/get_many отдают копии закешированных заказов, поэтому
+      изменения вызывающего не попадают в кеш до save;
+    - save/save_many сохраняют заказ в хранилище и кладут в кеш его копию;
+      при ошибке сохранения запись кеша удаляется;
+    - отсутствующие ID кешируются на negative_ttl секунд (ответ "Order not
+      found" без обращения к хранилищу), save такого ID запись снимает.
+    
+    Кеш предполагает, что хранилище меняется только через этот декоратор;
+    если пишут и другие процессы, задайте ttl для ограничения устаревания.
+    """
+    
+    def __init__(self, repository: OrderRepository, max_size: int = 10000,
+                 ttl: Optional[float] = None, negative_ttl: Optional[float] = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            repository: Декорируемый репозиторий
+            max_size: Максимальное число записей кеша
+            ttl: Время жизни закешированного заказа в секундах (None - без ограничения)
+            negative_ttl: Время жизни записи об отсутствии заказа (0 - не кешировать)
+            clock: Источник времени (для тестов)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        
+        self.repository = repository
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        # order_id -> (момент записи, копия заказа или _MISSING)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Order]]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+    
+    @property
+    def outbox(self) -> Optional[EventOutbox]:
+        """Outbox декорируемого репозитория
+        
+        None - события не записываются или у репозитория нет outbox
+        (FileOrderRepository).
+        """
+        return getattr(self.repository, "outbox", None)
+    
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        """Получение заказа по ID через кеш"""
+        found, order = self._lookup(order_id)
+        if found:
+            return order.copy() if order is not None else None
+        
+        order = self.repository.get_by_id(order_id)
+        self._store(order_id, order.copy() if order is not None else _MISSING, fill=True)
+        return order
+    
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        """Пакетное получение: из хранилища загружаются только промахи"""
+        orders: Dict[str, Order] = {}
+        missed: List[str] = []
+        for order_id in dict.fromkeys(order_ids):
+            found, order = self._lookup(order_id)
+            if not found:
+                missed.append(order_id)
+            elif order is not None:
+                orders[order_id] = order.copy()
+        
+        if missed:
+            loaded = self.repository.get_many(missed)
+            for order_id in missed:
+                order = loaded.get(order_id)
+                self._store(order_id, order.copy() if order is not None else _MISSING, fill=True)
+                if order is not None:
+                    orders[order_id] = order
+        return orders
+    
+    def save(self, order: Order):
+        """Сохранение в хранилище и в кеш"""
+        try:
+            self.repository.save(order)
+        except BaseException:
+            self.invalidate(order.id)
+            raise
+        self._store(order.id, order.copy())
+    
+    def save_many(self, orders: Iterable[Order]):
+        """Пакетное сохранение в хранилище и в кеш"""
+        orders = list(orders)
+        try:
+            self.repository.save_many(orders)
+        except BaseException:
+            for order in orders:
+                self.invalidate(order.id)
+            raise
+        for order in orders:
+            self._store(order.id, order.copy())
+    
+    def lock(self, order_id: str) -> ContextManager:
+        return self.repository.lock(order_id)
+    
+    def find_by_customer(self, customer_id: str, limit: Optional[int] = None) -> Iterator[Order]:
+        return self.repository.find_by_customer(customer_id, limit)
+    
+    def find_by_status(self, status: OrderStatus, limit: Optional[int] = None) -> Iterator[Order]:
+        return self.repository.find_by_status(status, limit)
+    
+    def invalidate(self, order_id: str):
+        """Удаление записи кеша"""
+        with self._lock:
+            self._entries.pop(order_id, None)
+    
+    def clear_cache(self):
+        """Очистка кеша"""
+        with self._lock:
+            self._entries.clear()
+    
+    @property
+    def hit_ratio(self) -> float:
+        """Доля обращений, обслуженных кешем (включая отрицательные записи)"""
+        total = self.hits + self.negative_hits + self.misses
+        return (self.hits + self.negative_hits) / total if total else 0.0
+    
+    def stats(self) -> Dict[str, float]:
+        """Счетчики кеша для метрик"""
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+            "size": len(self),
+        }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _lookup(self, order_id: str) -> Tuple[bool, Optional[Order]]:
+        """(найдена ли запись, копия заказа или None для отсутствующего ID)"""
+        with self._lock:
+            entry = self._entries.get(order_id)
+            if entry is not None:
+                stored_at, order = entry
+                ttl = self.ttl if order is not None else self.negative_ttl
+                if ttl is not None and self._clock() - stored_at > ttl:
+                    del self._entries[order_id]
+                else:
+                    self._entries.move_to_end(order_id)
+                    if order is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return True, order
+            self.misses += 1
+            return False, None
+    
+    def _store(self, order_id: str, order: Optional[Order], fill: bool = False):
+        """Запись в кеш; fill - заполнение после промаха, не затирающее запись
+        от save, сделанного параллельно с чтением из хранилища"""
+        if order is _MISSING and self.negative_ttl is not None and self.negative_ttl <= 0:
+            return
+        with self._lock:
+            if fill and order_id in self._entries:
+                return
+            self._entries[order_id] = (self._clock(), order)
+            self._entries.move_to_end(order_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
@@ -0,0 +1,135 @@
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+from ...domain.entities import Order, OrderStatus
+from ...domain.interfaces import OrderRepository
+from ...domain.exceptions import ConcurrentModificationException
+from .order_indexes import OrderIndexes
+from .in_memory_outbox import InMemoryOutbox
+
+
+class _Stripe:
+    """Сегмент хранилища: своя блокировка, свои заказы и блокировки заказов"""
+    __slots__ = ('lock', 'orders', 'order_locks')
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.orders: Dict[str, Order] = {}
+        # order_id -> [блокировка заказа, число ожидающих и владеющих потоков]
+        self.order_locks: Dict[str, list] = {}
+
+
+class ConcurrentInMemoryOrderRepository(OrderRepository):
+    """Потокобезопасная in-memory реализация репозитория заказов
+    
+    Заказы распределены по сегментам (lock striping) по хешу ID, поэтому
+    потоки, работающие с разными заказами, почти не конкурируют за блокировки.
+    
+    - get_by_id возвращает копию заказа: изменения не видны другим потокам до save;
+    - save выполняет compare-and-set по Order.version и при конфликте
+      выбрасывает ConcurrentModificationException;
+    - lock(order_id) дает блокировку заказа на время чтения-изменения-записи;
+    - вторичные индексы по клиенту и статусу общие, со своей блокировкой,
+      которая берется только под блокировкой сегмента (единый порядок);
+    - события заказа попадают в outbox (если он передан) под той же
+      блокировкой сегмента, что и новое состояние заказа.
+    """
+    
+    def __init__(self, stripes: int = 64, outbox: Optional[InMemoryOutbox] = None):
+        if stripes < 1:
+            raise ValueError("stripes must be positive")
+        
+        self._stripes: List[_Stripe] = [_Stripe() for _ in range(stripes)]
+        self._index_lock = threading.Lock()
+        self._indexes = OrderIndexes()
+        self.outbox = outbox
+    
+    def _stripe(self, order_id: str) -> _Stripe:
+        return self._stripes[hash(order_id) % len(self._stripes)]
+    
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        """Получение копии заказа по ID"""
+        stripe = self._stripe(order_id)
+        with stripe.lock:
+            order = stripe.orders.get(order_id)
+        return order.copy() if order is not None else None
+    
+    def save(self, order: Order):
+        """Сохранение заказа с проверкой версии"""
+        if self.outbox is not None:
+            # Копии, выдаваемые get_by_id, тоже будут записывать события
+            order.enable_events()
+        snapshot = order.copy()
+        stripe = self._stripe(order.id)
+        
+        with stripe.lock:
+            stored = stripe.orders.get(order.id)
+            stored_version = stored.version if stored is not None else 0
+            
+            if stored_version != order.version:
+                raise ConcurrentModificationException(
+                    f"Order {order.id} was modified concurrently "
+                    f"(expected version {order.version}, found {stored_version})"
+                )
+            
+            snapshot.version = stored_version + 1
+            stripe.orders[order.id] = snapshot
+            with self._index_lock:
+                self._indexes.update(order.id, order.customer_id, order.status)
+            if self.outbox is not None:
+                self.outbox.add_order_events(order)
+        
+        order.version = snapshot.version
+    
+    @contextmanager
+    def lock(self, order_id: str) -> Iterator[None]:
+        """Блокировка заказа на время чтения-изменения-записи"""
+        stripe = self._stripe(order_id)
+        
+        with stripe.lock:
+            entry = stripe.order_locks.get(order_id)
+            if entry is None:
+                entry = stripe.order_locks[order_id] = [threading.Lock(), 0]
+            entry[1] += 1
+        
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with stripe.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del stripe.order_locks[order_id]
+    
+    def find_by_customer(self, customer_id: str, limit: Optional[int] = None) -> Iterator[Order]:
+        """Копии заказов клиента в порядке первого сохранения"""
+        with self._index_lock:
+            order_ids = self._indexes.ids_by_customer(customer_id, limit)
+        return self._iter_orders(order_ids)
+    
+    def find_by_status(self, status: OrderStatus, limit: Optional[int] = None) -> Iterator[Order]:
+        """Копии заказов в статусе status в порядке перехода в него"""
+        with self._index_lock:
+            order_ids = self._indexes.ids_by_status(status)
+        # Заказ мог сменить статус после снятия набора ID; limit - после отбора
+        return islice((order for order in self._iter_orders(order_ids) if order.status == status), limit)
+    
+    def _iter_orders(self, order_ids: List[str]) -> Iterator[Order]:
+        for order_id in order_ids:
+            order = self.get_by_id(order_id)
+            if order is not None:
+                yield order
+    
+    def clear(self):
+        """Очистка хранилища (для тестов)"""
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.orders.clear()
+        with self._index_lock:
+            self._indexes.clear()
+        if self.outbox is not None:
+            self.outbox.clear()
+    
+    def __len__(self) -> int:
+        return sum(len(stripe.orders) for stripe in self._stripes)
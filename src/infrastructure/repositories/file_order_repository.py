@@ -0,0 +1,374 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+import uuid
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from ...domain.entities import Order, OrderLine, OrderStatus
+from ...domain.interfaces import OrderRepository
+from ...domain.value_objects import Money
+from .order_indexes import OrderIndexes
+
+
+class _IndexEntry(NamedTuple):
+    """Положение последней записи заказа в журнале"""
+    offset: int
+    length: int
+    # Запись с полным снимком заказа (для записи статуса - ее основа)
+    base_offset: int
+    base_length: int
+    # Хеш клиента и линий снимка (blake2b: совпадение означает те же линии)
+    content_digest: str
+    # Ключи вторичных индексов
+    customer_id: str
+    status: str
+
+
+class FileOrderRepository(OrderRepository):
+    """Файловая реализация репозитория заказов
+    
+    Заказы хранятся в журнале только для добавления (JSON lines): полные
+    снимки заказов и записи изменения статуса, если линии заказа не менялись.
+    Индекс ID -> смещение записи держится в памяти, а записи читаются
+    через отображение журнала в память (mmap), поэтому get_by_id - O(1).
+    
+    - Индекс строится лениво при первом обращении: из контрольной точки
+      (сохраняется в close и compact) и хвоста журнала после нее.
+    - fsync выполняется раз в sync_every записей; потоки, ожидающие
+      сохранения одновременно, обслуживаются одним fsync (group commit).
+    - compact переписывает журнал, оставляя по одному снимку на заказ.
+    - Вторичные индексы по клиенту и статусу строятся из записей индекса.
+    """
+    
+    LOG_FILE = "orders.log"
+    CHECKPOINT_FILE = "orders.idx"
+    
+    def __init__(self, directory: str, sync_every: int = 1):
+        """
+        Args:
+            directory: Каталог с журналом и контрольной точкой индекса
+            sync_every: Число записей между fsync (1 - каждое сохранение
+                долговечно к моменту возврата из save)
+        """
+        if sync_every < 1:
+            raise ValueError("sync_every must be positive")
+        
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sync_every = sync_every
+        self._log_path = os.path.join(directory, self.LOG_FILE)
+        self._checkpoint_path = os.path.join(directory, self.CHECKPOINT_FILE)
+        
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._index: Optional[Dict[str, _IndexEntry]] = None
+        self._indexes = OrderIndexes()
+        self._generation: Optional[str] = None
+        self._file = None
+        self._size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._written = 0
+        self._synced = 0
+    
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        """Получение заказа по ID"""
+        with self._lock:
+            self._ensure_open()
+            entry = self._index.get(order_id)
+            if entry is None:
+                return None
+            
+            record = self._read(entry.offset, entry.length)
+            if record["op"] == "status":
+                base = self._read(entry.base_offset, entry.base_length)
+                base["status"] = record["status"]
+                base["version"] = record["version"]
+                record = base
+        
+        return _order_from_record(record)
+    
+    def save(self, order: Order):
+        """Сохранение заказа"""
+        lines = [
+            [line.product_id, line.product_name, line.quantity,
+             str(line.unit_price.amount), line.unit_price.currency]
+            for line in order.lines
+        ]
+        content_digest = _content_digest(order.customer_id, lines)
+        
+        with self._lock:
+            self._ensure_open()
+            previous = self._index.get(order.id)
+            version = order.version + 1
+            
+            if previous is not None and previous.content_digest == content_digest:
+                # Линии не менялись - достаточно записи статуса
+                offset, length = self._append({
+                    "op": "status", "id": order.id, "status": order.status.value,
+                    "version": version, "base": previous.base_offset,
+                })
+                entry = _IndexEntry(offset, length, previous.base_offset,
+                                    previous.base_length, content_digest,
+                                    order.customer_id, order.status.value)
+            else:
+                offset, length = self._append({
+                    "op": "put", "id": order.id, "customer_id": order.customer_id,
+                    "status": order.status.value, "version": version, "lines": lines,
+                })
+                entry = _IndexEntry(offset, length, offset, length, content_digest,
+                                    order.customer_id, order.status.value)
+            
+            self._index[order.id] = entry
+            self._indexes.update(order.id, order.customer_id, order.status)
+            sequence = self._written
+        
+        order.version = version
+        if sequence - self._synced >= self.sync_every:
+            self._sync(sequence)
+    
+    def flush(self):
+        """Принудительный fsync всех записанных изменений"""
+        with self._lock:
+            if self._file is None:
+                return
+            sequence = self._written
+        self._sync(sequence)
+    
+    def compact(self):
+        """Перезапись журнала с одним полным снимком на заказ"""
+        with self._lock:
+            self._ensure_open()
+            generation = uuid.uuid4().hex
+            temp_path = self._log_path + ".compact"
+            index: Dict[str, _IndexEntry] = {}
+            
+            with open(temp_path, "wb") as output:
+                position = output.write(_encode({"op": "header", "generation": generation}))
+                for order_id, entry in self._index.items():
+                    record = self._read(entry.base_offset, entry.base_length)
+                    if entry.offset != entry.base_offset:
+                        status = self._read(entry.offset, entry.length)
+                        record["status"] = status["status"]
+                        record["version"] = status["version"]
+                    data = _encode(record)
+                    output.write(data)
+                    index[order_id] = entry._replace(offset=position, length=len(data),
+                                                     base_offset=position, base_length=len(data))
+                    position += len(data)
+                output.flush()
+                os.fsync(output.fileno())
+            
+            self._close_files()
+            os.replace(temp_path, self._log_path)
+            self._open_log()
+            self._index = index
+            self._generation = generation
+            self._write_checkpoint()
+    
+    def find_by_customer(self, customer_id: str, limit: Optional[int] = None) -> Iterator[Order]:
+        """Заказы клиента в порядке индексации"""
+        with self._lock:
+            self._ensure_open()
+            order_ids = self._indexes.ids_by_customer(customer_id, limit)
+        return self._iter_orders(order_ids)
+    
+    def find_by_status(self, status: OrderStatus, limit: Optional[int] = None) -> Iterator[Order]:
+        """Заказы в статусе status в порядке индексации"""
+        with self._lock:
+            self._ensure_open()
+            order_ids = self._indexes.ids_by_status(status)
+        # limit применяется после отбора, чтобы страница не укорачивалась
+        return islice((order for order in self._iter_orders(order_ids) if order.status == status), limit)
+    
+    def _iter_orders(self, order_ids: List[str]) -> Iterator[Order]:
+        for order_id in order_ids:
+            order = self.get_by_id(order_id)
+            if order is not None:
+                yield order
+    
+    def close(self):
+        """Сохранение контрольной точки индекса и закрытие журнала"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._synced = self._written
+            self._write_checkpoint()
+            self._close_files()
+            self._index = None
+    
+    def __enter__(self) -> 'FileOrderRepository':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_open()
+            return len(self._index)
+    
+    def _ensure_open(self):
+        if self._index is not None:
+            return
+        
+        if not os.path.exists(self._log_path) or not os.path.getsize(self._log_path):
+            with open(self._log_path, "wb") as log:
+                log.write(_encode({"op": "header", "generation": uuid.uuid4().hex}))
+                log.flush()
+                os.fsync(log.fileno())
+        
+        self._open_log()
+        self._generation = self._read(0, self._read_line_length(0))["generation"]
+        self._index, position = self._load_checkpoint()
+        self._replay(position)
+        self._indexes.clear()
+        for order_id, entry in self._index.items():
+            self._indexes.update(order_id, entry.customer_id, entry.status)
+    
+    def _open_log(self):
+        self._file = open(self._log_path, "ab")
+        self._size = self._file.tell()
+        self._map = None
+        self._written = self._synced = 0
+    
+    def _close_files(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _append(self, record: dict) -> Tuple[int, int]:
+        data = _encode(record)
+        offset = self._size
+        self._file.write(data)
+        self._size += len(data)
+        self._written += 1
+        return offset, len(data)
+    
+    def _sync(self, sequence: int):
+        # Один fsync покрывает все записи, сделанные до него, поэтому
+        # ожидающие потоки с меньшим номером просто выходят
+        with self._sync_lock:
+            if self._synced >= sequence:
+                return
+            with self._lock:
+                if self._file is None:
+                    return
+                self._file.flush()
+                written = self._written
+                fileno = self._file.fileno()
+            os.fsync(fileno)
+            self._synced = max(self._synced, written)
+    
+    def _view(self, end: int) -> mmap.mmap:
+        if self._map is None or len(self._map) < end:
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+            with open(self._log_path, "rb") as log:
+                self._map = mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+    
+    def _read(self, offset: int, length: int) -> dict:
+        return json.loads(self._view(offset + length)[offset:offset + length])
+    
+    def _read_line_length(self, offset: int) -> int:
+        view = self._view(offset + 1)
+        return view.find(b"\n", offset) + 1 - offset
+    
+    def _load_checkpoint(self) -> Tuple[Dict[str, _IndexEntry], int]:
+        """Индекс из контрольной точки и позиция журнала, до которой он актуален"""
+        header_length = self._read_line_length(0)
+        try:
+            with open(self._checkpoint_path, "r", encoding="utf-8") as checkpoint:
+                data = json.load(checkpoint)
+        except (OSError, ValueError):
+            return {}, header_length
+        
+        if data.get("generation") != self._generation or data.get("position", 0) > self._size:
+            return {}, header_length
+        
+        try:
+            index = {order_id: _IndexEntry(*entry) for order_id, entry in data["entries"].items()}
+        except TypeError:
+            # Контрольная точка старого формата - индекс строится из журнала
+            return {}, header_length
+        return index, data["position"]
+    
+    def _write_checkpoint(self):
+        temp_path = self._checkpoint_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as checkpoint:
+            json.dump({
+                "generation": self._generation,
+                "position": self._size,
+                "entries": self._index,
+            }, checkpoint, separators=(',', ':'))
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(temp_path, self._checkpoint_path)
+    
+    def _replay(self, position: int):
+        """Применение записей журнала после position к индексу"""
+        if position >= self._size:
+            return
+        
+        view = self._view(self._size)
+        while position < self._size:
+            end = view.find(b"\n", position, self._size)
+            try:
+                if end < 0:
+                    raise ValueError("Truncated record")
+                record = json.loads(view[position:end + 1])
+            except ValueError:
+                # Оборванная при сбое последняя запись отбрасывается
+                self._truncate(position)
+                return
+            
+            length = end + 1 - position
+            if record["op"] == "put":
+                self._index[record["id"]] = _IndexEntry(
+                    position, length, position, length, _content_digest(record["customer_id"], record["lines"]),
+                    record["customer_id"], record["status"]
+                )
+            elif record["op"] == "status":
+                previous = self._index[record["id"]]
+                self._index[record["id"]] = previous._replace(
+                    offset=position, length=length, status=record["status"]
+                )
+            position = end + 1
+    
+    def _truncate(self, position: int):
+        self._close_files()
+        with open(self._log_path, "r+b") as log:
+            log.truncate(position)
+        self._open_log()
+
+
+def _encode(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n").encode("utf-8")
+
+
+def _content_digest(customer_id: str, lines: list) -> str:
+    content = json.dumps([customer_id, lines], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _order_from_record(record: dict) -> Order:
+    lines: List[OrderLine] = [
+        OrderLine(product_id, product_name, quantity, Money(Decimal(amount), currency))
+        for product_id, product_name, quantity, amount, currency in record["lines"]
+    ]
+    return Order(
+        id=record["id"],
+        customer_id=record["customer_id"],
+        lines=lines,
+        status=OrderStatus(record["status"]),
+        version=record["version"],
+    )
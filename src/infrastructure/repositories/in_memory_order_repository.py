@@ -1,13 +1,23 @@
-from typing import Dict, Optional
-from domain.entities import Order
-from domain.interfaces import OrderRepository
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional
+from ...domain.entities import Order, OrderStatus
+from ...domain.interfaces import OrderRepository
+from .order_indexes import OrderIndexes
+from .in_memory_outbox import InMemoryOutbox
 
 
 class InMemoryOrderRepository(OrderRepository):
-    """In-memory реализация репозитория заказов"""
+    """In-memory реализация репозитория заказов
     
-    def __init__(self):
+    Вторичные индексы по клиенту и статусу обновляются в save/save_many,
+    туда же забираются доменные события заказа в outbox, если он передан
+    (без outbox события не записываются).
+    """
+    
+    def __init__(self, outbox: Optional[InMemoryOutbox] = None):
         self._orders: Dict[str, Order] = {}
+        self._indexes = OrderIndexes()
+        self.outbox = outbox
     
     def get_by_id(self, order_id: str) -> Optional[Order]:
         """Получение заказа по ID"""
@@ -16,7 +26,42 @@ class InMemoryOrderRepository(OrderRepository):
     def save(self, order: Order):
         """Сохранение заказа"""
         self._orders[order.id] = order
+        self._indexes.update(order.id, order.customer_id, order.status)
+        if self.outbox is not None:
+            self.outbox.add_order_events(order)
+    
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        """Пакетное получение заказов по ID"""
+        orders = self._orders
+        return {order_id: orders[order_id] for order_id in order_ids if order_id in orders}
+    
+    def save_many(self, orders: Iterable[Order]):
+        """Пакетное сохранение заказов"""
+        indexes = self._indexes
+        outbox = self.outbox
+        for order in orders:
+            self._orders[order.id] = order
+            indexes.update(order.id, order.customer_id, order.status)
+            if outbox is not None:
+                outbox.add_order_events(order)
+    
+    def find_by_customer(self, customer_id: str, limit: Optional[int] = None) -> Iterator[Order]:
+        """Заказы клиента в порядке первого сохранения"""
+        orders = self._orders
+        return iter([orders[order_id] for order_id in self._indexes.ids_by_customer(customer_id, limit)])
+    
+    def find_by_status(self, status: OrderStatus, limit: Optional[int] = None) -> Iterator[Order]:
+        """Заказы в статусе status в порядке перехода в него"""
+        orders = self._orders
+        # Хранятся сами экземпляры заказов: статус, измененный без save,
+        # уже виден в заказе, но еще не в индексе - такие заказы пропускаем
+        # до применения limit, чтобы страница не укорачивалась
+        matching = (orders[order_id] for order_id in self._indexes.ids_by_status(status))
+        return iter(list(islice((order for order in matching if order.status == status), limit)))
     
     def clear(self):
         """Очистка хранилища (для тестов)"""
         self._orders.clear()
+        self._indexes.clear()
+        if self.outbox is not None:
+            self.outbox.clear()
@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Tuple
+from ...domain.entities import Order
+from ...domain.events import EventRecord, OutboxMessage, materialize_event
+from ...domain.interfaces import EventOutbox
+
+
+class InMemoryOutbox(EventOutbox):
+    """Outbox в памяти для in-memory репозиториев
+    
+    Хранит компактные записи событий; объекты событий и сообщений
+    создаются в fetch_pending - на стороне доставки, а не в save.
+    Сообщения удаляются только в mark_delivered, поэтому outbox нужен
+    вместе с OutboxDispatcher (или другим потребителем), иначе он растет.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id сообщения -> (order_id, запись события)
+        self._records: "OrderedDict[int, Tuple[str, EventRecord]]" = OrderedDict()
+        self._next_id = 1
+    
+    def add_order_events(self, order: Order):
+        """Перенос несохраненных событий заказа (вызывается репозиторием в save)
+        
+        Включает запись событий в заказе: новый заказ публикует свои линии
+        (LineAdded), а следующие изменения сохраненного экземпляра тоже
+        попадут в outbox.
+        """
+        order.enable_events()
+        records = order.pull_event_records()
+        if not records:
+            return
+        with self._lock:
+            for record in records:
+                self._records[self._next_id] = (order.id, record)
+                self._next_id += 1
+    
+    def fetch_pending(self, limit: int = 100) -> List[OutboxMessage]:
+        """Первые limit недоставленных сообщений в порядке сохранения"""
+        with self._lock:
+            pending = []
+            for entry in self._records.items():
+                if len(pending) >= limit:
+                    break
+                pending.append(entry)
+        return [
+            OutboxMessage(message_id, materialize_event(order_id, record))
+            for message_id, (order_id, record) in pending
+        ]
+    
+    def mark_delivered(self, message_ids: Iterable[int]):
+        """Удаление доставленных сообщений"""
+        with self._lock:
+            for message_id in message_ids:
+                self._records.pop(message_id, None)
+    
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+    
+    def __len__(self) -> int:
+        return len(self._records)
@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class OrderIndexes:
+    """Вторичные индексы заказов: по клиенту и по статусу
+    
+    Для каждого ключа хранится упорядоченное множество ID (dict без значений):
+    добавление, удаление и перенос заказа между статусами - O(1), выборка -
+    O(размер результата). Статусы хранятся по значению (OrderStatus.value).
+    Синхронизацию обеспечивает репозиторий-владелец.
+    """
+    
+    def __init__(self):
+        self._by_customer: Dict[str, Dict[str, None]] = {}
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        # order_id -> (customer_id, статус), под которыми заказ проиндексирован
+        self._keys: Dict[str, Tuple[str, str]] = {}
+    
+    def update(self, order_id: str, customer_id: str, status):
+        """Индексация заказа с текущими клиентом и статусом"""
+        keys = (customer_id, _status_key(status))
+        previous = self._keys.get(order_id)
+        if previous == keys:
+            return
+        
+        self._keys[order_id] = keys
+        # Переносится только изменившийся ключ: при оплате - лишь статус
+        if previous is None or previous[0] != keys[0]:
+            if previous is not None:
+                _discard(self._by_customer, previous[0], order_id)
+            self._by_customer.setdefault(keys[0], {})[order_id] = None
+        if previous is None or previous[1] != keys[1]:
+            if previous is not None:
+                _discard(self._by_status, previous[1], order_id)
+            self._by_status.setdefault(keys[1], {})[order_id] = None
+    
+    def remove(self, order_id: str):
+        """Удаление заказа из индексов"""
+        previous = self._keys.pop(order_id, None)
+        if previous is not None:
+            _discard(self._by_customer, previous[0], order_id)
+            _discard(self._by_status, previous[1], order_id)
+    
+    def ids_by_customer(self, customer_id: str, limit: Optional[int] = None) -> List[str]:
+        """ID заказов клиента в порядке индексации"""
+        return _take(self._by_customer.get(customer_id), limit)
+    
+    def ids_by_status(self, status, limit: Optional[int] = None) -> List[str]:
+        """ID заказов в статусе в порядке перехода в него"""
+        return _take(self._by_status.get(_status_key(status)), limit)
+    
+    def clear(self):
+        self._by_customer.clear()
+        self._by_status.clear()
+        self._keys.clear()
+
+
+def _discard(index: Dict[str, Dict[str, None]], key: str, order_id: str):
+    bucket = index[key]
+    del bucket[order_id]
+    if not bucket:
+        del index[key]
+
+
+def _status_key(status) -> str:
+    return getattr(status, "value", status)
+
+
+def _take(bucket: Optional[Dict[str, None]], limit: Optional[int]) -> List[str]:
+    if not bucket:
+        return []
+    if limit is None or limit >= len(bucket):
+        return list(bucket)
+    ids = []
+    for order_id in bucket:
+        if len(ids) >= limit:
+            break
+        ids.append(order_id)
+    return ids
@@ -0,0 +1,306 @@
+import json
+import queue
+import sqlite3
+from contextlib import contextmanager
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from ...domain.entities import Order, OrderLine, OrderStatus
+from ...domain.events import OutboxMessage, event_from_dict, event_to_dict
+from ...domain.interfaces import EventOutbox, OrderRepository
+from ...domain.value_objects import Money
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    customer_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS order_lines (
+    order_id TEXT NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    product_id TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    unit_amount TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    PRIMARY KEY (order_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS orders_by_customer ON orders(customer_id);
+CREATE INDEX IF NOT EXISTS orders_by_status ON orders(status);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+
+_UPSERT_ORDER = (
+    "INSERT INTO orders (id, customer_id, status, version) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(id) DO UPDATE SET customer_id = excluded.customer_id, "
+    "status = excluded.status, version = excluded.version"
+)
+_DELETE_LINES = "DELETE FROM order_lines WHERE order_id = ?"
+_INSERT_LINE = (
+    "INSERT INTO order_lines "
+    "(order_id, position, product_id, product_name, quantity, unit_amount, currency) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_EVENT = "INSERT INTO outbox (order_id, payload) VALUES (?, ?)"
+_SELECT_EVENTS = "SELECT id, payload FROM outbox ORDER BY id LIMIT ?"
+_DELETE_EVENT = "DELETE FROM outbox WHERE id = ?"
+_SELECT_ORDER = "SELECT id, customer_id, status, version FROM orders WHERE id = ?"
+_SELECT_LINES = (
+    "SELECT order_id, product_id, product_name, quantity, unit_amount, currency "
+    "FROM order_lines WHERE order_id = ? ORDER BY position"
+)
+# Индексы хранят rowid, поэтому сортировка по нему не требует отдельной сортировки
+_SELECT_IDS_BY_CUSTOMER = "SELECT id FROM orders WHERE customer_id = ? ORDER BY rowid LIMIT ?"
+_SELECT_IDS_BY_STATUS = "SELECT id FROM orders WHERE status = ? ORDER BY rowid LIMIT ?"
+
+# Ограничение на число параметров запроса в старых версиях SQLite - 999
+_MAX_VARIABLES = 900
+
+
+class SQLiteOrderRepository(OrderRepository):
+    """Реализация репозитория заказов на SQLite
+    
+    Заказы и линии хранятся в нормализованных таблицах orders/order_lines.
+    База работает в режиме WAL, соединения берутся из небольшого пула,
+    поэтому репозиторий можно использовать из нескольких потоков.
+    Тексты запросов постоянны, и sqlite3 переиспользует подготовленные
+    выражения из кеша соединения. save_many/get_many работают через
+    executemany и выборки IN (...) в одной транзакции. Поиск по клиенту
+    и статусу идет по индексам orders_by_customer/orders_by_status.
+    С outbox=True доменные события заказов пишутся в таблицу outbox в
+    транзакции сохранения; читать их - через repository.outbox (без
+    outbox события не записываются и repository.outbox равен None).
+    """
+    
+    def __init__(self, path: str, pool_size: int = 4, timeout: float = 30.0,
+                 outbox: bool = False):
+        """
+        Args:
+            path: Путь к файлу базы данных
+            pool_size: Максимальное число соединений в пуле
+            timeout: Время ожидания блокировки базы в секундах
+            outbox: Записывать доменные события в таблицу outbox
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be positive")
+        
+        self.path = path
+        self.timeout = timeout
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        self._connections: List[sqlite3.Connection] = []
+        
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        
+        with self._connection() as connection:
+            connection.executescript(_SCHEMA)
+        
+        self.outbox = SQLiteOutbox(self) if outbox else None
+    
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=128,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        self._connections.append(connection)
+        return connection
+    
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+    
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+    
+    def get_by_id(self, order_id: str) -> Optional[Order]:
+        """Получение заказа по ID"""
+        with self._connection() as connection:
+            row = connection.execute(_SELECT_ORDER, (order_id,)).fetchone()
+            if row is None:
+                return None
+            lines = connection.execute(_SELECT_LINES, (order_id,)).fetchall()
+        return _order_from_rows(row, lines, self.outbox is not None)
+    
+    def save(self, order: Order):
+        """Сохранение заказа"""
+        self.save_many((order,))
+    
+    def get_many(self, order_ids: Iterable[str]) -> Dict[str, Order]:
+        """Пакетное получение заказов по ID"""
+        ids = list(dict.fromkeys(order_ids))
+        orders: Dict[str, Order] = {}
+        
+        with self._connection() as connection:
+            for start in range(0, len(ids), _MAX_VARIABLES):
+                chunk = ids[start:start + _MAX_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                rows = connection.execute(
+                    f"SELECT id, customer_id, status, version FROM orders WHERE id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                lines: Dict[str, list] = {row[0]: [] for row in rows}
+                for line in connection.execute(
+                    "SELECT order_id, product_id, product_name, quantity, unit_amount, currency "
+                    f"FROM order_lines WHERE order_id IN ({placeholders}) ORDER BY order_id, position",
+                    chunk,
+                ):
+                    lines[line[0]].append(line)
+                for row in rows:
+                    orders[row[0]] = _order_from_rows(row, lines[row[0]], self.outbox is not None)
+        
+        return orders
+    
+    def save_many(self, orders: Iterable[Order]):
+        """Пакетное сохранение заказов и их событий в одной транзакции"""
+        saved = list(orders)
+        if self.outbox is not None:
+            # Новый заказ без записи событий получает события своих линий
+            for order in saved:
+                order.enable_events()
+        event_rows = [
+            (order.id, json.dumps(event_to_dict(event), ensure_ascii=False, separators=(',', ':')))
+            for order in saved
+            for event in order.domain_events
+        ] if self.outbox is not None else []
+        # Для повторяющихся ID сохраняется последнее состояние
+        orders = list({order.id: order for order in saved}.values())
+        if not orders:
+            return
+        
+        order_rows = [
+            (order.id, order.customer_id, order.status.value, order.version + 1)
+            for order in orders
+        ]
+        line_rows = [
+            (order.id, position, line.product_id, line.product_name, line.quantity,
+             str(line.unit_price.amount), line.unit_price.currency)
+            for order in orders
+            for position, line in enumerate(order.lines)
+        ]
+        
+        with self._transaction() as connection:
+            connection.executemany(_UPSERT_ORDER, order_rows)
+            connection.executemany(_DELETE_LINES, [(order.id,) for order in orders])
+            connection.executemany(_INSERT_LINE, line_rows)
+            if event_rows:
+                connection.executemany(_INSERT_EVENT, event_rows)
+        
+        for order in orders:
+            order.version += 1
+        if self.outbox is not None:
+            for order in saved:
+                order.clear_events()
+                order.enable_events()
+    
+    def find_by_customer(self, customer_id: str, limit: Optional[int] = None) -> Iterator[Order]:
+        """Заказы клиента в порядке первого сохранения"""
+        return self._find(_SELECT_IDS_BY_CUSTOMER, (customer_id,), limit)
+    
+    def find_by_status(self, status: OrderStatus, limit: Optional[int] = None) -> Iterator[Order]:
+        """Заказы в статусе status в порядке первого сохранения"""
+        # limit применяется после отбора, чтобы страница не укорачивалась
+        orders = self._find(_SELECT_IDS_BY_STATUS, (status.value,), None)
+        return islice((order for order in orders if order.status == status), limit)
+    
+    def _find(self, query: str, params: Tuple, limit: Optional[int]) -> Iterator[Order]:
+        with self._connection() as connection:
+            # LIMIT -1 в SQLite означает отсутствие ограничения
+            rows = connection.execute(query, params + (-1 if limit is None else limit,))
+            order_ids = [row[0] for row in rows]
+        return self._iter_orders(order_ids)
+    
+    def _iter_orders(self, order_ids: List[str]) -> Iterator[Order]:
+        # Заказы загружаются порциями по мере обхода
+        for start in range(0, len(order_ids), _MAX_VARIABLES):
+            chunk = order_ids[start:start + _MAX_VARIABLES]
+            orders = self.get_many(chunk)
+            for order_id in chunk:
+                order = orders.get(order_id)
+                if order is not None:
+                    yield order
+    
+    def clear(self):
+        """Очистка хранилища (для тестов)"""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM order_lines")
+            connection.execute("DELETE FROM orders")
+            connection.execute("DELETE FROM outbox")
+    
+    def close(self):
+        """Закрытие всех соединений пула"""
+        for connection in self._connections:
+            connection.close()
+        self._connections.clear()
+    
+    def __enter__(self) -> 'SQLiteOrderRepository':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteOutbox(EventOutbox):
+    """Outbox в таблице outbox базы репозитория"""
+    
+    def __init__(self, repository: SQLiteOrderRepository):
+        self._repository = repository
+    
+    def fetch_pending(self, limit: int = 100) -> List[OutboxMessage]:
+        """Первые limit недоставленных сообщений в порядке сохранения"""
+        with self._repository._connection() as connection:
+            rows = connection.execute(_SELECT_EVENTS, (limit,)).fetchall()
+        return [
+            OutboxMessage(message_id, event_from_dict(json.loads(payload)))
+            for message_id, payload in rows
+        ]
+    
+    def mark_delivered(self, message_ids: Iterable[int]):
+        """Удаление доставленных сообщений"""
+        rows = [(message_id,) for message_id in message_ids]
+        if rows:
+            with self._repository._transaction() as connection:
+                connection.executemany(_DELETE_EVENT, rows)
+    
+    def __len__(self) -> int:
+        with self._repository._connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+
+def _order_from_rows(row: tuple, lines: list, record_events: bool = False) -> Order:
+    order_id, customer_id, status, version = row
+    return Order(
+        id=order_id,
+        customer_id=customer_id,
+        lines=[
+            OrderLine(product_id, product_name, quantity, Money(Decimal(amount), currency))
+            for _, product_id, product_name, quantity, amount, currency in lines
+        ],
+        status=OrderStatus(status),
+        version=version,
+        record_events=record_events,
+    )
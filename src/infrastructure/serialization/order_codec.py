@@ -0,0 +1,287 @@
+import json
+import struct
+from decimal import Decimal
+from typing import Dict, Iterator, List, MutableMapping, Optional, Tuple, Union
+from ...domain.entities import Order, OrderLine, OrderStatus
+from ...domain.value_objects import Money, MoneyBag, currency_exponent
+
+
+FORMAT_VERSION = 1
+MAGIC = b"OR"
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Коды статусов фиксированы форматом и не зависят от порядка в OrderStatus
+_STATUSES: Tuple[OrderStatus, ...] = (OrderStatus.CREATED, OrderStatus.PAID, OrderStatus.CANCELLED)
+_STATUS_CODES: Dict[OrderStatus, int] = {status: code for code, status in enumerate(_STATUSES)}
+
+# Заголовок: магия, версия формата, статус, версия заказа, число линий,
+# число валют, число строк в таблице строк, размер блока строк
+_HEADER = struct.Struct("<2sBBQIHII")
+# Итог по валюте: индекс строки с кодом валюты, число линий, масштаб и сумма
+# в единицах масштаба
+_TOTAL = struct.Struct("<IIBq")
+# Линия: индексы строк товара и названия, количество, номер валюты в итогах,
+# масштаб и цена в единицах масштаба
+_LINE = struct.Struct("<IIqHBq")
+_OFFSET = struct.Struct("<I")
+
+_MAX_UNITS = 2 ** 63 - 1
+_MAX_SCALE = 255
+
+
+class SnapshotFormatError(ValueError):
+    """Данные не являются снимком заказа поддерживаемой версии"""
+    pass
+
+
+def encode_order(order: Order) -> bytes:
+    """Снимок заказа в компактном двоичном формате
+    
+    Строки (ID заказа и клиента, коды валют, ID и названия товаров) лежат
+    в общей таблице один раз, линии - записи фиксированной длины, суммы -
+    целые числа в минорных единицах валюты (или мельче, если у цены больше
+    знаков). Итоги по валютам записываются в начало, поэтому OrderSnapshot
+    читает их без разбора линий. События в снимок не входят.
+    """
+    strings: List[str] = []
+    indexes: Dict[str, int] = {}
+    
+    def intern(text: str) -> int:
+        index = indexes.get(text)
+        if index is None:
+            index = indexes[text] = len(strings)
+            strings.append(text)
+        return index
+    
+    intern(order.id)
+    intern(order.customer_id)
+    
+    totals = order.subtotals.totals()
+    lines = order.lines
+    currency_slots = {currency: slot for slot, currency in enumerate(totals)}
+    line_counts = [0] * len(totals)
+    currencies = [intern(currency) for currency in totals]
+    line_parts = []
+    for line in lines:
+        price = line.unit_price
+        slot = currency_slots[price.currency]
+        line_counts[slot] += 1
+        line_parts.append(_LINE.pack(
+            intern(line.product_id), intern(line.product_name), line.quantity,
+            slot, *_scaled(price.amount, price.currency),
+        ))
+    parts = [b""]
+    for (currency, amount), index, count in zip(totals.items(), currencies, line_counts):
+        parts.append(_TOTAL.pack(index, count, *_scaled(amount, currency)))
+    parts.extend(line_parts)
+    
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets, position = [0], 0
+    for text in encoded:
+        position += len(text)
+        offsets.append(position)
+    parts.append(struct.pack(f"<{len(offsets)}I", *offsets))
+    parts.extend(encoded)
+    
+    parts[0] = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, _STATUS_CODES[order.status], order.version,
+        len(lines), len(totals), len(strings), position,
+    )
+    return b"".join(parts)
+
+
+def decode_order(data: Buffer, line_store: Optional[MutableMapping[str, OrderLine]] = None) -> Order:
+    """Заказ из двоичного снимка"""
+    return OrderSnapshot(data).to_order(line_store)
+
+
+class OrderSnapshot:
+    """Чтение двоичного снимка заказа без копирования и полного разбора
+    
+    Поля читаются из буфера (bytes, bytearray, memoryview, mmap) по
+    смещениям при обращении: статус и итоги доступны без создания линий,
+    отдельная линия - без разбора остальных.
+    """
+    
+    __slots__ = ('_view', 'status', 'version', 'line_count', '_currency_count',
+                 '_string_count', '_totals_at', '_lines_at', '_offsets_at', '_strings_at')
+    
+    def __init__(self, data: Buffer):
+        view = memoryview(data)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast("B")
+        if len(view) < _HEADER.size:
+            raise SnapshotFormatError("Snapshot is truncated")
+        
+        (magic, format_version, status, version, line_count,
+         currency_count, string_count, strings_size) = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise SnapshotFormatError("Not an order snapshot")
+        if format_version != FORMAT_VERSION:
+            raise SnapshotFormatError(f"Unsupported snapshot format version {format_version}")
+        if status >= len(_STATUSES):
+            raise SnapshotFormatError(f"Unknown order status code {status}")
+        
+        self._view = view
+        self.status = _STATUSES[status]
+        self.version = version
+        self.line_count = line_count
+        self._currency_count = currency_count
+        self._string_count = string_count
+        self._totals_at = _HEADER.size
+        self._lines_at = self._totals_at + currency_count * _TOTAL.size
+        self._offsets_at = self._lines_at + line_count * _LINE.size
+        self._strings_at = self._offsets_at + (string_count + 1) * _OFFSET.size
+        if len(view) < self._strings_at + strings_size:
+            raise SnapshotFormatError("Snapshot is truncated")
+    
+    @property
+    def id(self) -> str:
+        return self._string(0)
+    
+    @property
+    def customer_id(self) -> str:
+        return self._string(1)
+    
+    def is_paid(self) -> bool:
+        return self.status == OrderStatus.PAID
+    
+    def totals(self) -> Dict[str, Decimal]:
+        """Суммы заказа по валютам"""
+        view, unpack, size, at = self._view, _TOTAL.unpack_from, _TOTAL.size, self._totals_at
+        totals = {}
+        for slot in range(self._currency_count):
+            index, _, scale, units = unpack(view, at + slot * size)
+            totals[self._string(index)] = Decimal(units).scaleb(-scale)
+        return totals
+    
+    @property
+    def subtotals(self) -> MoneyBag:
+        return MoneyBag.from_totals(self.totals())
+    
+    @property
+    def total_amount(self) -> Money:
+        """Общая сумма заказа (как Order.total_amount)"""
+        return self.subtotals.to_money()
+    
+    def line(self, position: int) -> OrderLine:
+        """Линия по позиции в заказе"""
+        if not 0 <= position < self.line_count:
+            raise IndexError("line position out of range")
+        product, name, quantity, slot, scale, units = _LINE.unpack_from(
+            self._view, self._lines_at + position * _LINE.size
+        )
+        currency = self._string(self._currency_indexes()[slot])
+        price = Money._unchecked(Decimal(units).scaleb(-scale), currency)
+        return OrderLine(self._string(product), self._string(name), quantity, price)
+    
+    def lines(self) -> Iterator[OrderLine]:
+        """Линии заказа по одной, в порядке добавления"""
+        strings = self._strings()
+        currencies = [strings[index] for index in self._currency_indexes()]
+        records = _LINE.iter_unpack(self._view[self._lines_at:self._offsets_at])
+        money, line = Money._unchecked, OrderLine
+        for product, name, quantity, slot, scale, units in records:
+            price = money(Decimal(units).scaleb(-scale), currencies[slot])
+            yield line(strings[product], strings[name], quantity, price)
+    
+    def to_order(self, line_store: Optional[MutableMapping[str, OrderLine]] = None) -> Order:
+        """Заказ со всеми линиями; суммы берутся из снимка без пересчета"""
+        view, unpack, size, at = self._view, _TOTAL.unpack_from, _TOTAL.size, self._totals_at
+        totals, line_counts = {}, {}
+        for slot in range(self._currency_count):
+            index, count, scale, units = unpack(view, at + slot * size)
+            currency = self._string(index)
+            totals[currency] = Decimal(units).scaleb(-scale)
+            line_counts[currency] = count
+        return Order.restore(self.id, self.customer_id, self.lines(), self.status, self.version,
+                             totals, line_counts, line_store)
+    
+    def __len__(self) -> int:
+        return self.line_count
+    
+    def _currency_indexes(self) -> List[int]:
+        view, unpack, size, at = self._view, _TOTAL.unpack_from, _TOTAL.size, self._totals_at
+        return [unpack(view, at + slot * size)[0] for slot in range(self._currency_count)]
+    
+    def _strings(self) -> List[str]:
+        """Вся таблица строк (для разбора всех линий)"""
+        count = self._string_count
+        offsets = struct.unpack_from(f"<{count + 1}I", self._view, self._offsets_at)
+        blob = self._view[self._strings_at:self._strings_at + offsets[-1]]
+        text = str(blob, "utf-8")
+        if len(text) == len(blob):
+            # Только ASCII: смещения в байтах совпадают со смещениями в символах
+            return [text[offsets[index]:offsets[index + 1]] for index in range(count)]
+        return [str(blob[offsets[index]:offsets[index + 1]], "utf-8") for index in range(count)]
+    
+    def _string(self, index: int) -> str:
+        if index >= self._string_count:
+            raise SnapshotFormatError(f"String index {index} out of range")
+        start, end = struct.unpack_from("<II", self._view, self._offsets_at + index * _OFFSET.size)
+        at = self._strings_at
+        return str(self._view[at + start:at + end], "utf-8")
+
+
+def _scaled(amount: Decimal, currency: str) -> Tuple[int, int]:
+    """(масштаб, целое число единиц): минорные единицы валюты или мельче"""
+    # as_integer_ratio заметно быстрее as_tuple; знаменатель конечного
+    # Decimal - делитель степени 10, поэтому цикл конечен
+    numerator, denominator = amount.as_integer_ratio()
+    scale = currency_exponent(currency)
+    factor, remainder = divmod(10 ** scale, denominator)
+    while remainder:
+        scale += 1
+        factor, remainder = divmod(10 ** scale, denominator)
+    units = numerator * factor
+    if units > _MAX_UNITS or scale > _MAX_SCALE:
+        raise ValueError(f"Amount {amount} {currency} does not fit into a snapshot")
+    return scale, units
+
+
+def order_to_dict(order: Order) -> dict:
+    """JSON-совместимое представление заказа (для отладки и диагностики)"""
+    return {
+        "format": FORMAT_VERSION,
+        "id": order.id,
+        "customer_id": order.customer_id,
+        "status": order.status.value,
+        "version": order.version,
+        "totals": {currency: str(amount) for currency, amount in order.subtotals.totals().items()},
+        "lines": [
+            {
+                "product_id": line.product_id,
+                "product_name": line.product_name,
+                "quantity": line.quantity,
+                "unit_price": str(line.unit_price.amount),
+                "currency": line.unit_price.currency,
+            }
+            for line in order.lines
+        ],
+    }
+
+
+def order_from_dict(data: dict) -> Order:
+    """Заказ из представления order_to_dict; итоги пересчитываются по линиям"""
+    if data.get("format") != FORMAT_VERSION:
+        raise SnapshotFormatError(f"Unsupported snapshot format version {data.get('format')}")
+    return Order(
+        data["id"],
+        data["customer_id"],
+        lines=[
+            OrderLine(line["product_id"], line["product_name"], line["quantity"],
+                      Money(Decimal(line["unit_price"]), line["currency"]))
+            for line in data["lines"]
+        ],
+        status=OrderStatus(data["status"]),
+        version=data["version"],
+    )
+
+
+def order_to_json(order: Order, indent: Optional[int] = 2) -> str:
+    return json.dumps(order_to_dict(order), ensure_ascii=False, indent=indent)
+
+
+def order_from_json(text: str) -> Order:
+    return order_from_dict(json.loads(text))
@@ -0,0 +1,22 @@
+import pytest
+
+
+class FakeClock:
+    """Управляемые часы: время задает тест (now, sleep), step - сдвиг при каждом чтении"""
+    
+    def __init__(self, step: float = 0.0):
+        self.now = 0.0
+        self.step = step
+    
+    def __call__(self):
+        self.now += self.step
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    """Фикстура управляемых часов"""
+    return FakeClock()
@@ -0,0 +1,101 @@
+import asyncio
+import time
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.application.async_use_cases import AsyncPayOrderUseCaseImpl, AsyncPaymentRunner
+from src.application.dto import PayOrderRequest
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.async_order_repository_adapter import AsyncOrderRepositoryAdapter
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.payment_gateways.thread_pool_payment_gateway import ThreadPoolPaymentGateway
+
+
+class TestAsyncPayOrderUseCase:
+    """Тесты для асинхронного Use Case оплаты заказа"""
+    
+    @pytest.fixture
+    def order_repository(self):
+        """Фикстура репозитория заказов"""
+        return InMemoryOrderRepository()
+    
+    @pytest.fixture
+    def payment_gateway(self):
+        """Фикстура платежного шлюза"""
+        return FakePaymentGateway()
+    
+    def _create_orders(self, order_repository, count):
+        for i in range(count):
+            order = Order(id=f"order_{i}", customer_id="cust_1")
+            order.add_line("prod_1", "Product 1", 2, Money(Decimal('10.00')))
+            order_repository.save(order)
+    
+    def _run(self, order_repository, payment_gateway, requests, concurrency=10, latency=0.0):
+        async def main():
+            with ThreadPoolPaymentGateway(payment_gateway, max_workers=concurrency,
+                                          latency=latency) as async_gateway:
+                use_case = AsyncPayOrderUseCaseImpl(
+                    AsyncOrderRepositoryAdapter(order_repository), async_gateway
+                )
+                return await AsyncPaymentRunner(use_case, concurrency).run(requests)
+        
+        return asyncio.run(main())
+    
+    def test_successful_payment(self, order_repository, payment_gateway):
+        """Тест успешной асинхронной оплаты"""
+        self._create_orders(order_repository, 1)
+        
+        responses = self._run(order_repository, payment_gateway, [PayOrderRequest(order_id="order_0")])
+        
+        assert responses[0].success is True
+        assert responses[0].amount_paid == "USD 20.00"
+        assert order_repository.get_by_id("order_0").status == OrderStatus.PAID
+        assert payment_gateway.get_charges_count() == 1
+    
+    def test_failures_match_sync_use_case(self, order_repository, payment_gateway):
+        """Тест ошибок оплаты"""
+        self._create_orders(order_repository, 1)
+        order_repository.save(Order(id="order_empty", customer_id="cust_1"))
+        payment_gateway.fail_on_orders = {"order_0"}
+        
+        responses = self._run(order_repository, payment_gateway, [
+            PayOrderRequest(order_id="order_0"),
+            PayOrderRequest(order_id="order_empty"),
+            PayOrderRequest(order_id="non_existent"),
+        ])
+        
+        assert responses[0].error_message == "Payment failed"
+        assert "Cannot pay empty order" in responses[1].error_message
+        assert "not found" in responses[2].error_message
+        assert order_repository.get_by_id("order_0").status == OrderStatus.CREATED
+    
+    def test_runner_preserves_order_and_runs_concurrently(self, order_repository, payment_gateway):
+        """Тест параллельной оплаты с ограничением конкурентности"""
+        self._create_orders(order_repository, 20)
+        requests = [PayOrderRequest(order_id=f"order_{i}") for i in range(20)]
+        
+        started = time.perf_counter()
+        responses = self._run(order_repository, payment_gateway, iter(requests),
+                              concurrency=10, latency=0.05)
+        elapsed = time.perf_counter() - started
+        
+        assert [r.order_id for r in responses] == [r.order_id for r in requests]
+        assert all(r.success for r in responses)
+        # Последовательно это заняло бы 20 * 0.05 = 1 секунду
+        assert elapsed < 0.5
+    
+    def test_concurrent_duplicates_charge_once(self, order_repository, payment_gateway):
+        """Тест одновременной оплаты одного заказа"""
+        self._create_orders(order_repository, 1)
+        requests = [PayOrderRequest(order_id="order_0") for _ in range(5)]
+        
+        responses = self._run(order_repository, payment_gateway, requests, latency=0.01)
+        
+        assert sum(r.success for r in responses) == 1
+        assert payment_gateway.get_charges_count() == 1
+    
+    def test_invalid_concurrency(self, order_repository, payment_gateway):
+        """Тест валидации ограничения конкурентности"""
+        with pytest.raises(ValueError):
+            AsyncPaymentRunner(None, concurrency=0)
@@ -0,0 +1,54 @@
+import json
+from benchmarks.suite import BenchmarkParams, compare_with_baseline, main, percentile, run_suite
+
+
+class TestBenchmarkSuite:
+    """Тесты для набора бенчмарков"""
+    
+    def test_percentile(self):
+        """Тест вычисления перцентилей"""
+        values = list(range(1, 101))
+        
+        assert percentile(values, 0.50) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0.0
+    
+    def test_run_suite_reports_all_scenarios(self):
+        """Тест отчета по всем сценариям на малых параметрах"""
+        params = BenchmarkParams(lines=3, orders=20, currencies=["USD", "JPY"], failure_rate=0.5)
+        
+        report = run_suite(params, repeat=1)
+        
+        assert set(report["results"]) == {"money_arithmetic", "order_build", "total_amount", "pay_order"}
+        for result in report["results"].values():
+            assert result["ops_per_sec"] > 0
+            assert result["p99_us"] >= result["p50_us"]
+            assert result["peak_memory_kb"] > 0
+    
+    def test_compare_with_baseline(self):
+        """Тест обнаружения регрессий"""
+        baseline = {"results": {"pay_order": {"ops_per_sec": 1000, "p99_us": 10}}}
+        report = {"results": {
+            "pay_order": {"ops_per_sec": 700, "p99_us": 11},
+            "new_scenario": {"ops_per_sec": 1, "p99_us": 1},
+        }}
+        
+        regressions = compare_with_baseline(report, baseline, tolerance=0.2)
+        
+        assert len(regressions) == 1
+        assert regressions[0].startswith("pay_order: ops/sec")
+    
+    def test_cli_saves_report_and_flags_regression(self, tmp_path, capsys):
+        """Тест запуска из командной строки"""
+        output = tmp_path / "report.json"
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({
+            "results": {"money_arithmetic": {"ops_per_sec": 1e12, "p99_us": 1e-6}}
+        }))
+        
+        code = main(["--orders", "10", "--lines", "2", "--repeat", "1", "--scenario", "money_arithmetic",
+                     "--backend", "sqlite", "--output", str(output), "--baseline", str(baseline)])
+        
+        assert code == 1
+        assert "money_arithmetic" in json.loads(output.read_text())["results"]
+        assert "REGRESSION" in capsys.readouterr().err
@@ -0,0 +1,217 @@
+import pickle
+import pytest
+from dataclasses import FrozenInstanceError
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.caching_order_repository import CachingOrderRepository
+from src.infrastructure.repositories.file_order_repository import FileOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+def create_order(order_id, customer_id="cust_1"):
+    order = Order(id=order_id, customer_id=customer_id)
+    order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+    return order
+
+
+class CountingRepository(InMemoryOrderRepository):
+    """Репозиторий, считающий обращения к хранилищу"""
+    
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+        self.loaded_ids = []
+        self.fail_saves = False
+    
+    def get_by_id(self, order_id):
+        self.loads += 1
+        self.loaded_ids.append(order_id)
+        return super().get_by_id(order_id)
+    
+    def get_many(self, order_ids):
+        order_ids = list(order_ids)
+        self.loads += 1
+        self.loaded_ids.extend(order_ids)
+        return super().get_many(order_ids)
+    
+    def save(self, order):
+        if self.fail_saves:
+            raise IOError("disk is full")
+        super().save(order)
+
+
+class TestCachingOrderRepository:
+    """Тесты для кеширующего декоратора репозитория"""
+    
+    @pytest.fixture
+    def storage(self):
+        return CountingRepository()
+    
+    @pytest.fixture
+    def repository(self, storage, clock):
+        return CachingOrderRepository(storage, max_size=3, negative_ttl=5.0, clock=clock)
+    
+    def test_read_through(self, repository, storage):
+        """Тест загрузки из хранилища только при промахе"""
+        storage.save(create_order("order_1"))
+        
+        assert repository.get_by_id("order_1").id == "order_1"
+        assert repository.get_by_id("order_1").id == "order_1"
+        
+        assert storage.loads == 1
+        assert repository.hits == 1
+        assert repository.misses == 1
+        assert repository.hit_ratio == 0.5
+        assert repository.stats()["size"] == 1
+    
+    def test_copy_on_read(self, repository, storage):
+        """Тест изоляции кеша от изменений вызывающего"""
+        storage.save(create_order("order_1"))
+        repository.get_by_id("order_1")
+        
+        order = repository.get_by_id("order_1")
+        order.pay()
+        
+        assert repository.get_by_id("order_1").status == OrderStatus.CREATED
+        assert repository.get_by_id("order_1") is not repository.get_by_id("order_1")
+    
+    def test_cached_lines_cannot_be_mutated(self, repository, storage):
+        """Тест: линии из кеша неизменяемы, следующее чтение не затронуто"""
+        storage.save(create_order("order_1"))
+        line = repository.get_by_id("order_1").get_line("prod_1")
+        
+        with pytest.raises(FrozenInstanceError):
+            line.quantity = 99
+        
+        assert repository.get_by_id("order_1").get_line("prod_1").quantity == 1
+        assert pickle.loads(pickle.dumps(line)) == line
+    
+    def test_outbox_of_repository_without_outbox(self, tmp_path):
+        """Тест: у обертки файлового репозитория (без outbox) outbox равен None"""
+        with FileOrderRepository(str(tmp_path)) as storage:
+            assert CachingOrderRepository(storage).outbox is None
+    
+    def test_write_through(self, repository, storage):
+        """Тест сохранения в хранилище и кеш"""
+        order = create_order("order_1")
+        repository.save(order)
+        order.pay()
+        repository.save(order)
+        
+        cached = repository.get_by_id("order_1")
+        
+        assert cached.status == OrderStatus.PAID
+        assert cached.version == order.version
+        assert storage.get_by_id("order_1").status == OrderStatus.PAID
+        assert storage.loaded_ids == ["order_1"]
+    
+    def test_negative_caching(self, repository, storage, clock):
+        """Тест кеширования отсутствующих заказов на negative_ttl"""
+        assert repository.get_by_id("missing") is None
+        assert repository.get_by_id("missing") is None
+        assert storage.loads == 1
+        assert repository.negative_hits == 1
+        
+        clock.now = 6.0
+        assert repository.get_by_id("missing") is None
+        assert storage.loads == 2
+    
+    def test_save_replaces_negative_entry(self, repository):
+        """Тест снятия отрицательной записи при сохранении заказа"""
+        assert repository.get_by_id("order_1") is None
+        
+        repository.save(create_order("order_1"))
+        
+        assert repository.get_by_id("order_1").id == "order_1"
+    
+    def test_negative_caching_disabled(self, storage):
+        """Тест отключения отрицательного кеша"""
+        repository = CachingOrderRepository(storage, negative_ttl=0)
+        
+        repository.get_by_id("missing")
+        repository.get_by_id("missing")
+        
+        assert storage.loads == 2
+        assert len(repository) == 0
+    
+    def test_ttl(self, storage, clock):
+        """Тест устаревания закешированных заказов"""
+        repository = CachingOrderRepository(storage, ttl=10.0, clock=clock)
+        storage.save(create_order("order_1"))
+        repository.get_by_id("order_1")
+        
+        clock.now = 11.0
+        repository.get_by_id("order_1")
+        
+        assert storage.loads == 2
+    
+    def test_lru_eviction(self, repository, storage):
+        """Тест вытеснения давно не использованных заказов"""
+        for i in range(1, 5):
+            storage.save(create_order(f"order_{i}"))
+        for order_id in ("order_1", "order_2", "order_3"):
+            repository.get_by_id(order_id)
+        repository.get_by_id("order_1")
+        
+        repository.get_by_id("order_4")
+        
+        assert len(repository) == 3
+        storage.loaded_ids.clear()
+        repository.get_by_id("order_1")
+        repository.get_by_id("order_2")
+        assert storage.loaded_ids == ["order_2"]
+    
+    def test_failed_save_invalidates(self, repository, storage):
+        """Тест удаления записи кеша при ошибке сохранения"""
+        order = create_order("order_1")
+        repository.save(order)
+        storage.fail_saves = True
+        order.pay()
+        
+        with pytest.raises(IOError):
+            repository.save(order)
+        
+        assert len(repository) == 0
+        storage.loaded_ids.clear()
+        repository.get_by_id("order_1")
+        assert storage.loaded_ids == ["order_1"]
+    
+    def test_get_many_loads_only_misses(self, repository, storage):
+        """Тест пакетной загрузки только промахов"""
+        storage.save_many([create_order("order_1"), create_order("order_2")])
+        repository.get_by_id("order_1")
+        storage.loaded_ids.clear()
+        
+        orders = repository.get_many(["order_1", "order_2", "missing"])
+        
+        assert set(orders) == {"order_1", "order_2"}
+        assert storage.loaded_ids == ["order_2", "missing"]
+        assert set(repository.get_many(["order_2", "missing"])) == {"order_2"}
+        assert storage.loaded_ids == ["order_2", "missing"]
+    
+    def test_pay_unknown_order_served_from_cache(self, repository, storage):
+        """Тест ответа "Order not found" из отрицательного кеша"""
+        use_case = PayOrderUseCaseImpl(repository, FakePaymentGateway())
+        
+        for _ in range(3):
+            response = use_case.execute(PayOrderRequest(order_id="missing"))
+            assert response.success is False
+            assert "not found" in response.error_message
+        
+        assert storage.loads == 1
+    
+    def test_repeated_payment_served_from_cache(self, repository, storage):
+        """Тест повторной оплаты: заказ берется из кеша после write-through"""
+        storage.save(create_order("order_1"))
+        use_case = PayOrderUseCaseImpl(repository, FakePaymentGateway())
+        
+        assert use_case.execute(PayOrderRequest(order_id="order_1")).success is True
+        response = use_case.execute(PayOrderRequest(order_id="order_1"))
+        
+        assert response.success is False
+        assert "already paid" in response.error_message
+        assert storage.loads == 1
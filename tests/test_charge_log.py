@@ -0,0 +1,131 @@
+import pickle
+import threading
+import pytest
+from decimal import Decimal
+from src.domain.value_objects import Money
+from src.infrastructure.payment_gateways.charge_log import ChargeLog, ChargeRecord
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class TestChargeLog:
+    """Тесты для ограниченного журнала платежей"""
+    
+    def test_ring_buffer_keeps_recent_records(self):
+        """Тест вытеснения старых записей без файла"""
+        log = ChargeLog(capacity=3)
+        for i in range(5):
+            log.append(f"order_{i}", Money(Decimal('1.00')), True)
+        
+        assert [record.order_id for record in log] == ["order_2", "order_3", "order_4"]
+        assert len(log) == 3
+        assert log.count == 5
+        assert log.dropped == 2
+        assert log.truncated
+        assert log.total() == Money(Decimal('5.00'))
+    
+    def test_spill_to_disk(self, tmp_path):
+        """Тест сохранения вытесненных записей в файл"""
+        log = ChargeLog(capacity=2, spill_path=str(tmp_path / "charges.csv"))
+        log.extend([
+            ("order_1", Money(Decimal('1.50'), "EUR"), True),
+            ("order,2", Money(Decimal('2.00')), False),
+            ("order_3", Money(Decimal('3.00')), True),
+            ("order_4", Money(Decimal('4.00')), True),
+        ])
+        
+        records = list(log)
+        
+        assert [record.order_id for record in records] == ["order_1", "order,2", "order_3", "order_4"]
+        assert records[0] == ChargeRecord("order_1", Money(Decimal('1.50'), "EUR"), True)
+        assert records[1].success is False
+        assert len(log) == 4
+        assert log.spilled == 2
+        assert not log.truncated
+        log.close()
+    
+    def test_aggregates(self):
+        """Тест счетчиков и сумм по валютам"""
+        log = ChargeLog()
+        log.append("order_1", Money(Decimal('10.00')), True)
+        log.append("order_2", Money(Decimal('5.00')), False)
+        log.append("order_3", Money(Decimal('100'), "JPY"), True)
+        
+        assert (log.count, log.succeeded, log.failed) == (3, 2, 1)
+        assert log.totals() == {"USD": Money(Decimal('10.00')), "JPY": Money(Decimal('100'), "JPY")}
+        assert log.total("EUR") == Money(Decimal('0'), "EUR")
+    
+    def test_clear(self, tmp_path):
+        """Тест очистки журнала и файла"""
+        log = ChargeLog(capacity=1, spill_path=str(tmp_path / "charges.csv"))
+        log.append("order_1", Money(Decimal('1')), True)
+        log.append("order_2", Money(Decimal('1')), True)
+        
+        log.clear()
+        log.append("order_3", Money(Decimal('1')), True)
+        
+        assert [record.order_id for record in log] == ["order_3"]
+        assert log.count == 1
+        assert (tmp_path / "charges.csv").read_text() == ""
+    
+    def test_record_compatibility(self):
+        """Тест доступа к записи по ключу и сериализации"""
+        record = ChargeRecord("order_1", Money(Decimal('1')), True)
+        
+        assert record['amount'] == Money(Decimal('1'))
+        assert record[0] == "order_1"
+        assert pickle.loads(pickle.dumps(record)) == record
+    
+    def test_concurrent_appends(self):
+        """Тест параллельной записи"""
+        log = ChargeLog(capacity=100)
+        
+        def worker():
+            for _ in range(1000):
+                log.append("order_1", Money(Decimal('0.01')), True)
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert log.count == 4000
+        assert log.total() == Money(Decimal('40.00'))
+        assert len(log) == 100
+    
+    def test_invalid_capacity(self):
+        """Тест невалидного размера буфера"""
+        with pytest.raises(ValueError):
+            ChargeLog(capacity=0)
+
+
+class TestFakePaymentGatewayLog:
+    """Тесты для журнала платежей FakePaymentGateway"""
+    
+    def test_log_is_unbounded_by_default(self):
+        """Тест: по умолчанию журнал шлюза хранит все записи"""
+        gateway = FakePaymentGateway()
+        for i in range(100):
+            gateway.charge(f"order_{i}", Money(Decimal('1.00')))
+        
+        assert len(gateway.charges_log) == 100
+        assert gateway.charges_log.dropped == 0
+    
+    def test_counters_are_not_bounded_by_capacity(self, tmp_path):
+        """Тест счетчиков шлюза при ограниченном журнале"""
+        gateway = FakePaymentGateway(fail_on_orders={"order_0"}, log_capacity=10,
+                                     spill_path=str(tmp_path / "charges.csv"))
+        for i in range(100):
+            gateway.charge(f"order_{i}", Money(Decimal('2.00')))
+        
+        assert gateway.get_charges_count() == 100
+        assert gateway.get_total_charged() == Money(Decimal('198.00'))
+        assert len(gateway.charges_log) == 100
+        assert gateway.charges_log.spilled == 90
+        assert gateway.charges_log[-1]['order_id'] == "order_99"
+        gateway.charges_log.close()
+    
+    def test_capacity_requires_spill_path(self):
+        """Тест: ограничить журнал шлюза без файла выгрузки нельзя"""
+        with pytest.raises(ValueError):
+            FakePaymentGateway(log_capacity=10)
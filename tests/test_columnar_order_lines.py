@@ -0,0 +1,107 @@
+import random
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderLine, OrderStatus
+from src.domain.columnar_lines import ColumnarOrderLines
+from src.domain.value_objects import Money
+from src.domain.exceptions import InvalidMoneyValueException, OrderModificationException
+
+
+class TestColumnarOrderLines:
+    """Тесты для колоночного хранилища линий заказа"""
+    
+    @pytest.fixture
+    def store(self):
+        """Фикстура хранилища линий"""
+        return ColumnarOrderLines()
+    
+    @pytest.fixture
+    def order(self, store):
+        """Фикстура заказа с колоночным хранилищем"""
+        return Order(id="order_1", customer_id="cust_1", line_store=store)
+    
+    def test_order_operations(self, order, store):
+        """Тест операций заказа поверх колоночного хранилища"""
+        order.add_line("prod_1", "Product 1", 2, Money(Decimal('10.00')))
+        order.add_line("prod_2", "Product 2", 3, Money(Decimal('5.00')))
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+        order.remove_line("prod_2")
+        order.add_line("prod_3", "Product 3", 1, Money(Decimal('0.99')))
+        
+        assert [line.product_id for line in order.lines] == ["prod_1", "prod_3"]
+        assert order.lines[0] == OrderLine("prod_1", "Product 1", 3, Money(Decimal('10.00')))
+        assert order.total_amount == Money(Decimal('30.99'))
+        assert store.totals() == {"USD": Money(Decimal('30.99'))}
+        
+        order.pay()
+        
+        assert order.status == OrderStatus.PAID
+        with pytest.raises(OrderModificationException):
+            order.add_line("prod_4", "Product 4", 1, Money(Decimal('1.00')))
+    
+    def test_empty_order_cannot_be_paid(self, order):
+        """Тест оплаты пустого заказа с колоночным хранилищем"""
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+        order.remove_line("prod_1")
+        
+        with pytest.raises(Exception) as exc_info:
+            order.pay()
+        
+        assert "Cannot pay empty order" in str(exc_info.value)
+    
+    def test_totals_by_currency_and_product(self, order, store):
+        """Тест итогов по валютам и по товарам"""
+        order.add_line("prod_1", "Product 1", 2, Money(Decimal('10.00'), "USD"))
+        order.add_line("prod_2", "Product 2", 3, Money(Decimal('150'), "JPY"))
+        order.add_line("prod_3", "Product 3", 1, Money(Decimal('0.50'), "USD"))
+        
+        assert store.totals() == {
+            "USD": Money(Decimal('20.50'), "USD"),
+            "JPY": Money(Decimal('450'), "JPY"),
+        }
+        assert store.product_totals()["prod_2"] == Money(Decimal('450'), "JPY")
+        
+        order.remove_line("prod_2")
+        
+        assert store.totals() == {"USD": Money(Decimal('20.50'), "USD")}
+    
+    def test_filter(self, order, store):
+        """Тест фильтрации линий"""
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal('100.00')))
+        order.add_line("prod_2", "Product 2", 5, Money(Decimal('1.00')))
+        order.add_line("prod_3", "Product 3", 10, Money(Decimal('20.00')))
+        
+        assert [line.product_id for line in store.filter(min_quantity=5)] == ["prod_2", "prod_3"]
+        assert [line.product_id for line in store.filter(min_line_total=Money(Decimal('50')))] == [
+            "prod_1", "prod_3"
+        ]
+        assert list(store.filter(min_line_total=Money(Decimal('1'), "EUR"))) == []
+    
+    def test_price_must_fit_minor_units(self, order):
+        """Тест цены, не представимой в минорных единицах"""
+        with pytest.raises(InvalidMoneyValueException):
+            order.add_line("prod_1", "Product 1", 1, Money(Decimal('0.001')))
+        
+        assert order.lines == ()
+        assert order.total_amount == Money(Decimal('0'))
+    
+    def test_matches_dict_backed_order(self):
+        """Тест: колоночный заказ ведет себя как заказ со словарем линий"""
+        rnd = random.Random(42)
+        prices = [Money(Decimal(rnd.randrange(1, 10000)) / 100) for _ in range(50)]
+        columnar = Order(id="1", customer_id="cust_1", line_store=ColumnarOrderLines())
+        regular = Order(id="1", customer_id="cust_1")
+        
+        for _ in range(2000):
+            product = rnd.randrange(50)
+            remove = rnd.random() < 0.4
+            quantity = rnd.randint(1, 5)
+            for order in (columnar, regular):
+                if remove:
+                    order.remove_line(f"prod_{product}")
+                else:
+                    order.add_line(f"prod_{product}", "Product", quantity, prices[product])
+        
+        assert columnar.lines == regular.lines
+        assert columnar.total_amount == regular.total_amount
+        assert columnar == regular
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.domain.exceptions import ConcurrentModificationException
+from src.application.use_cases import PayOrderUseCaseImpl, PayOrdersBatchUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.infrastructure.repositories.concurrent_in_memory_order_repository import (
+    ConcurrentInMemoryOrderRepository
+)
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class SlowPaymentGateway(FakePaymentGateway):
+    """Шлюз с задержкой, расширяющей окно гонки"""
+    
+    def charge(self, order_id, amount):
+        time.sleep(0.001)
+        return super().charge(order_id, amount)
+
+
+class TestConcurrentInMemoryOrderRepository:
+    """Тесты для потокобезопасного репозитория заказов"""
+    
+    @pytest.fixture
+    def order_repository(self):
+        """Фикстура репозитория заказов"""
+        return ConcurrentInMemoryOrderRepository(stripes=8)
+    
+    def _create_orders(self, order_repository, count):
+        for i in range(count):
+            order = Order(id=f"order_{i}", customer_id="cust_1")
+            order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+            order_repository.save(order)
+    
+    def test_get_returns_isolated_copy(self, order_repository):
+        """Тест изоляции прочитанного заказа"""
+        self._create_orders(order_repository, 1)
+        
+        order = order_repository.get_by_id("order_0")
+        order.pay()
+        
+        assert order_repository.get_by_id("order_0").status == OrderStatus.CREATED
+        
+        order_repository.save(order)
+        
+        assert order_repository.get_by_id("order_0").status == OrderStatus.PAID
+        assert order.version == 2
+    
+    def test_save_detects_concurrent_modification(self, order_repository):
+        """Тест оптимистичной блокировки при сохранении"""
+        self._create_orders(order_repository, 1)
+        first = order_repository.get_by_id("order_0")
+        second = order_repository.get_by_id("order_0")
+        
+        first.pay()
+        order_repository.save(first)
+        second.add_line("prod_2", "Product 2", 1, Money(Decimal('5.00')))
+        
+        with pytest.raises(ConcurrentModificationException):
+            order_repository.save(second)
+        
+        with pytest.raises(ConcurrentModificationException):
+            order_repository.save(Order(id="order_0", customer_id="cust_2"))
+    
+    def test_lock_is_exclusive_per_order(self, order_repository):
+        """Тест взаимного исключения блокировки заказа"""
+        inside = Counter()
+        overlaps = []
+        
+        def worker(order_id):
+            for _ in range(50):
+                with order_repository.lock(order_id):
+                    inside[order_id] += 1
+                    if inside[order_id] > 1:
+                        overlaps.append(order_id)
+                    inside[order_id] -= 1
+        
+        threads = [threading.Thread(target=worker, args=(f"order_{i % 3}",)) for i in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert overlaps == []
+        assert all(not stripe.order_locks for stripe in order_repository._stripes)
+    
+    def test_parallel_payments_charge_each_order_once(self, order_repository):
+        """Стресс-тест: много потоков оплачивают одни и те же заказы"""
+        self._create_orders(order_repository, 20)
+        payment_gateway = SlowPaymentGateway()
+        use_case = PayOrderUseCaseImpl(order_repository, payment_gateway)
+        requests = [PayOrderRequest(order_id=f"order_{i % 20}") for i in range(400)]
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            responses = list(executor.map(use_case.execute, requests))
+        
+        assert sum(r.success for r in responses) == 20
+        assert all("Order is already paid" in r.error_message for r in responses if not r.success)
+        assert Counter(c['order_id'] for c in payment_gateway.charges_log) == {
+            f"order_{i}": 1 for i in range(20)
+        }
+        for i in range(20):
+            assert order_repository.get_by_id(f"order_{i}").status == OrderStatus.PAID
+    
+    def test_parallel_batches_charge_each_order_once(self, order_repository):
+        """Стресс-тест пакетной оплаты из нескольких потоков"""
+        self._create_orders(order_repository, 50)
+        payment_gateway = FakePaymentGateway()
+        use_case = PayOrdersBatchUseCaseImpl(order_repository, payment_gateway, batch_size=7)
+        batches = [
+            [PayOrderRequest(order_id=f"order_{(i * 13 + j) % 50}") for j in range(30)]
+            for i in range(8)
+        ]
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(use_case.execute, batches))
+        
+        assert sum(r.success for responses in results for r in responses) == 50
+        assert payment_gateway.get_charges_count() == 50
@@ -0,0 +1,123 @@
+import pickle
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order
+from src.domain.currency_conversion import CurrencyConverter
+from src.domain.exceptions import ExchangeRateNotFoundException
+from src.domain.value_objects import Money, MoneyBag
+from src.infrastructure.exchange_rates.static_exchange_rate_provider import StaticExchangeRateProvider
+
+
+class TestMoneyBag:
+    """Тесты для суммы денег в нескольких валютах"""
+    
+    def test_add_mixed_currencies(self):
+        """Тест сложения сумм в разных валютах"""
+        bag = MoneyBag([Money(Decimal('10.00')), Money(Decimal('5.00'), "EUR")])
+        bag = bag + Money(Decimal('2.50')) + MoneyBag([Money(Decimal('100'), "JPY")])
+        
+        assert bag.currencies == ("USD", "EUR", "JPY")
+        assert bag.amount("USD") == Money(Decimal('12.50'))
+        assert bag.amount("GBP") == Money(Decimal('0'), "GBP")
+        assert list(bag) == [Money(Decimal('12.50')), Money(Decimal('5.00'), "EUR"),
+                             Money(Decimal('100'), "JPY")]
+        assert str(bag) == "USD 12.50 + EUR 5.00 + JPY 100.00"
+    
+    def test_to_money(self):
+        """Тест перевода в Money для одной валюты"""
+        assert MoneyBag().to_money() == Money(Decimal('0'))
+        assert MoneyBag([Money(Decimal('1'), "EUR")]).to_money() == Money(Decimal('1'), "EUR")
+        with pytest.raises(ValueError):
+            MoneyBag([Money(Decimal('1')), Money(Decimal('1'), "EUR")]).to_money()
+    
+    def test_immutable_hashable_picklable(self):
+        """Тест неизменяемости, хеширования и сериализации"""
+        bag = MoneyBag([Money(Decimal('1')), Money(Decimal('2'), "EUR")])
+        
+        assert bag == MoneyBag([Money(Decimal('2'), "EUR"), Money(Decimal('1'))])
+        assert hash(bag) == hash(MoneyBag([Money(Decimal('2'), "EUR"), Money(Decimal('1'))]))
+        assert pickle.loads(pickle.dumps(bag)) == bag
+        with pytest.raises(AttributeError):
+            bag.extra = 1
+
+
+class TestCurrencyConverter:
+    """Тесты для перевода валют с кешем курсов"""
+    
+    @pytest.fixture
+    def provider(self):
+        """Фикстура источника курсов"""
+        return StaticExchangeRateProvider({
+            ("EUR", "USD"): Decimal('1.10'),
+            ("JPY", "USD"): Decimal('0.0067'),
+        })
+    
+    def test_convert_rounds_to_target_minor_units(self, provider):
+        """Тест округления до минорных единиц целевой валюты"""
+        converter = CurrencyConverter(provider)
+        
+        assert converter.convert(Money(Decimal('10.005'), "EUR"), "USD") == Money(Decimal('11.01'))
+        assert converter.convert(Money(Decimal('10.00'), "USD"), "JPY") == Money(Decimal('1493'), "JPY")
+        assert converter.convert(Money(Decimal('3')), "USD") == Money(Decimal('3'))
+    
+    def test_rates_are_cached(self, provider):
+        """Тест однократного запроса курса для многих сумм"""
+        converter = CurrencyConverter(provider)
+        amounts = [Money(Decimal(i) / 100, "EUR") for i in range(1000)]
+        
+        converted = converter.convert_many(amounts, "USD")
+        converter.convert(amounts[1], "USD")
+        
+        assert converted[100] == Money(Decimal('1.10'))
+        assert provider.lookups == 1
+        assert (converter.hits, converter.misses) == (1, 1)
+    
+    def test_ttl_eviction(self, provider, clock):
+        """Тест повторного запроса курса после истечения TTL"""
+        converter = CurrencyConverter(provider, ttl=60, clock=clock)
+        
+        converter.rate("EUR", "USD")
+        clock.now = 60
+        converter.rate("EUR", "USD")
+        assert provider.lookups == 1
+        
+        provider.set_rate("EUR", "USD", Decimal('1.20'))
+        clock.now = 61
+        assert converter.rate("EUR", "USD") == Decimal('1.20')
+        assert provider.lookups == 2
+    
+    def test_max_size(self, provider):
+        """Тест вытеснения самой давней пары валют"""
+        converter = CurrencyConverter(provider, max_size=1)
+        converter.rate("EUR", "USD")
+        converter.rate("JPY", "USD")
+        converter.rate("EUR", "USD")
+        
+        assert provider.lookups == 3
+    
+    def test_missing_rate(self, provider):
+        """Тест отсутствующего курса"""
+        converter = CurrencyConverter(provider)
+        
+        with pytest.raises(ExchangeRateNotFoundException):
+            converter.convert(Money(Decimal('1'), "GBP"), "USD")
+
+
+class TestOrderMultiCurrency:
+    """Тесты для заказа в нескольких валютах"""
+    
+    def test_subtotals_and_settlement_total(self):
+        """Тест сумм по валютам и итога в валюте расчетов"""
+        provider = StaticExchangeRateProvider({("EUR", "USD"): Decimal('1.10')})
+        converter = CurrencyConverter(provider)
+        order = Order(id="order_1", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 2, Money(Decimal('10.00')))
+        for i in range(500):
+            order.add_line(f"eur_{i}", f"EUR product {i}", 1, Money(Decimal('0.01'), "EUR"))
+        
+        assert order.subtotals == MoneyBag([Money(Decimal('20.00')), Money(Decimal('5.00'), "EUR")])
+        assert order.total_in("USD", converter) == Money(Decimal('25.50'))
+        assert order.total_in("EUR", converter) == Money(Decimal('23.18'), "EUR")
+        assert provider.lookups == 2
+        with pytest.raises(ValueError):
+            order.total_amount
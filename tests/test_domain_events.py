@@ -0,0 +1,302 @@
+import json
+import threading
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderLine, OrderStatus
+from src.domain.events import (
+    LineAdded,
+    LineQuantityChanged,
+    LineRemoved,
+    OrderPaid,
+    event_from_dict,
+    event_to_dict,
+)
+from src.domain.exceptions import ConcurrentModificationException
+from src.domain.value_objects import Money, MoneyBag
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.application.event_dispatcher import OutboxDispatcher
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.concurrent_in_memory_order_repository import (
+    ConcurrentInMemoryOrderRepository
+)
+from src.infrastructure.repositories.sqlite_order_repository import SQLiteOrderRepository
+from src.infrastructure.repositories.in_memory_outbox import InMemoryOutbox
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.messaging.event_subscribers import (
+    CallbackEventSubscriber,
+    JsonLinesEventSubscriber,
+    QueueEventSubscriber,
+)
+
+
+PRICE = Money(Decimal('10.00'))
+
+
+def create_order(order_id="order_1"):
+    order = Order(id=order_id, customer_id="cust_1", record_events=True)
+    order.add_line("prod_1", "Product 1", 2, PRICE)
+    return order
+
+
+class TestOrderEvents:
+    """Тесты для доменных событий заказа"""
+    
+    def test_line_changes_and_payment_are_recorded(self):
+        """Тест записи событий изменения линий и оплаты"""
+        order = create_order()
+        order.add_line("prod_2", "Product 2", 1, PRICE)
+        order.update_quantity("prod_2", 3)
+        order.remove_line("prod_2")
+        order.pay()
+        
+        events = order.domain_events
+        
+        assert [type(event) for event in events] == [
+            LineAdded, LineAdded, LineQuantityChanged, LineRemoved, OrderPaid
+        ]
+        assert events[0].product_id == "prod_1" and events[0].quantity == 2
+        assert events[2].quantity == 3
+        assert events[4].amounts == MoneyBag([Money(Decimal('20.00'))])
+        assert all(event.order_id == "order_1" for event in events)
+    
+    def test_loading_does_not_record_events(self):
+        """Тест отсутствия событий при восстановлении заказа"""
+        order = Order(id="order_1", customer_id="cust_1", lines=[OrderLine("prod_1", "Product 1", 1, PRICE)])
+        
+        assert order.domain_events == ()
+        assert create_order().copy().domain_events == ()
+    
+    def test_recording_is_opt_in(self):
+        """Тест: по умолчанию события не записываются"""
+        order = Order(id="order_1", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, PRICE)
+        order.pay()
+        
+        assert not order.records_events
+        assert order.domain_events == ()
+        assert order.pull_event_records() == []
+        
+        order.enable_events()
+        assert [type(event) for event in order.domain_events] == [LineAdded, OrderPaid]
+        order.clear_events()
+        order.revert_payment()
+        order.pay()
+        assert [type(event) for event in order.domain_events] == [OrderPaid]
+        assert order.copy().records_events
+    
+    def test_enabling_on_saved_order_records_nothing_retroactively(self):
+        """Тест: у сохранявшегося заказа включение записи не создает событий"""
+        order = Order(id="order_1", customer_id="cust_1", lines=[OrderLine("prod_1", "Product 1", 1, PRICE)],
+                      version=1)
+        
+        order.enable_events()
+        
+        assert order.domain_events == ()
+    
+    def test_pull_events_clears(self):
+        """Тест очистки событий после чтения"""
+        order = create_order()
+        
+        assert len(order.pull_events()) == 1
+        assert order.pull_events() == ()
+    
+    def test_reverted_payment_is_not_published(self):
+        """Тест отсутствия OrderPaid после отката оплаты"""
+        order = create_order()
+        order.clear_events()
+        order.pay()
+        order.revert_payment()
+        
+        assert order.status == OrderStatus.CREATED
+        assert order.domain_events == ()
+        
+        order.pay()
+        assert [type(event) for event in order.domain_events] == [OrderPaid]
+    
+    def test_serialization_roundtrip(self):
+        """Тест сериализации событий"""
+        order = create_order()
+        order.pay()
+        
+        for event in order.domain_events:
+            data = json.loads(json.dumps(event_to_dict(event)))
+            assert event_from_dict(data) == event
+
+
+class TestOutbox:
+    """Тесты для outbox репозиториев"""
+    
+    @pytest.fixture(params=["in_memory", "concurrent", "sqlite"])
+    def order_repository(self, request, tmp_path):
+        """Фикстура репозитория заказов с outbox"""
+        if request.param == "sqlite":
+            repository = SQLiteOrderRepository(str(tmp_path / "orders.db"), outbox=True)
+            yield repository
+            repository.close()
+        elif request.param == "concurrent":
+            yield ConcurrentInMemoryOrderRepository(outbox=InMemoryOutbox())
+        else:
+            yield InMemoryOrderRepository(outbox=InMemoryOutbox())
+    
+    def test_events_are_saved_with_order(self, order_repository):
+        """Тест записи событий в outbox при сохранении"""
+        order_repository.save(create_order())
+        use_case = PayOrderUseCaseImpl(order_repository, FakePaymentGateway())
+        use_case.execute(PayOrderRequest(order_id="order_1"))
+        
+        messages = order_repository.outbox.fetch_pending()
+        
+        assert [type(message.event) for message in messages] == [LineAdded, OrderPaid]
+        assert messages[0].id < messages[1].id
+        assert messages[1].event.amounts.to_money() == Money(Decimal('20.00'))
+    
+    def test_first_save_of_plain_order_publishes_lines(self, order_repository):
+        """Тест: линии заказа без записи событий попадают в outbox при первом сохранении"""
+        order = Order(id="order_1", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 2, PRICE)
+        order.add_line("prod_2", "Product 2", 1, PRICE)
+        
+        order_repository.save(order)
+        
+        events = [message.event for message in order_repository.outbox.fetch_pending()]
+        assert [(type(event), event.product_id) for event in events] == [
+            (LineAdded, "prod_1"), (LineAdded, "prod_2")
+        ]
+        assert events[0].quantity == 2 and events[0].unit_price == PRICE
+        
+        order_repository.save(order_repository.get_by_id("order_1"))
+        assert len(order_repository.outbox.fetch_pending()) == 2
+    
+    def test_declined_payment_publishes_nothing(self, order_repository):
+        """Тест отсутствия событий при отказе шлюза"""
+        order = create_order()
+        order_repository.save(order)
+        order_repository.outbox.mark_delivered(m.id for m in order_repository.outbox.fetch_pending())
+        use_case = PayOrderUseCaseImpl(order_repository, FakePaymentGateway(fail_on_orders={"order_1"}))
+        
+        use_case.execute(PayOrderRequest(order_id="order_1"))
+        order_repository.save(order_repository.get_by_id("order_1"))
+        
+        assert order_repository.outbox.fetch_pending() == []
+    
+    def test_saved_order_records_events(self, order_repository):
+        """Тест: заказ без записи событий публикует линии и дальнейшие изменения"""
+        order = Order(id="order_1", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, PRICE)
+        order_repository.save(order)
+        use_case = PayOrderUseCaseImpl(order_repository, FakePaymentGateway())
+        
+        use_case.execute(PayOrderRequest(order_id="order_1"))
+        
+        assert [type(m.event) for m in order_repository.outbox.fetch_pending()] == [LineAdded, OrderPaid]
+    
+    def test_dispatcher_at_least_once(self, order_repository):
+        """Тест повторной доставки после сбоя подписчика"""
+        order_repository.save_many(create_order(f"order_{i}") for i in range(5))
+        received = []
+        failures = [1]
+        
+        def flaky(messages):
+            if failures[0]:
+                failures[0] -= 1
+                raise ConnectionError("subscriber down")
+            received.extend(message.id for message in messages)
+        
+        delivered = []
+        dispatcher = OutboxDispatcher(order_repository.outbox, batch_size=2, subscribers=[
+            CallbackEventSubscriber(lambda messages: delivered.extend(m.id for m in messages)),
+            CallbackEventSubscriber(flaky),
+        ])
+        
+        with pytest.raises(ConnectionError):
+            dispatcher.dispatch_once()
+        assert dispatcher.dispatch_pending() == 5
+        
+        assert len(received) == 5
+        assert len(delivered) == 7
+        assert set(delivered) == set(received)
+        assert order_repository.outbox.fetch_pending() == []
+
+
+class TestOutboxConsistency:
+    """Тесты для согласованности outbox и состояния заказа"""
+    
+    def test_conflicting_save_keeps_events(self):
+        """Тест сохранения событий на заказе при конфликте версий"""
+        repository = ConcurrentInMemoryOrderRepository(outbox=InMemoryOutbox())
+        repository.save(create_order())
+        first, second = repository.get_by_id("order_1"), repository.get_by_id("order_1")
+        first.add_line("prod_2", "Product 2", 1, PRICE)
+        second.add_line("prod_3", "Product 3", 1, PRICE)
+        repository.save(first)
+        
+        with pytest.raises(ConcurrentModificationException):
+            repository.save(second)
+        
+        assert len(second.domain_events) == 1
+        assert [m.event.product_id for m in repository.outbox.fetch_pending()] == ["prod_1", "prod_2"]
+
+
+class TestEventSubscribers:
+    """Тесты для локальных подписчиков"""
+    
+    def test_queue_and_file_subscribers(self, tmp_path):
+        """Тест доставки в очередь и файл JSON lines"""
+        repository = InMemoryOrderRepository(outbox=InMemoryOutbox())
+        repository.save(create_order())
+        queue_subscriber = QueueEventSubscriber()
+        path = str(tmp_path / "events.jsonl")
+        dispatcher = OutboxDispatcher(repository.outbox, [queue_subscriber, JsonLinesEventSubscriber(path)])
+        
+        dispatcher.dispatch_pending()
+        
+        assert queue_subscriber.queue.get_nowait().event.product_id == "prod_1"
+        with open(path, encoding="utf-8") as events:
+            record = json.loads(events.readline())
+        assert record["id"] == 1
+        assert record["type"] == "LineAdded"
+        assert record["unit_price"] == {"amount": "10.00", "currency": "USD"}
+    
+    def test_run_until_stopped(self):
+        """Тест фонового цикла доставки"""
+        repository = InMemoryOrderRepository(outbox=InMemoryOutbox())
+        queue_subscriber = QueueEventSubscriber()
+        dispatcher = OutboxDispatcher(repository.outbox, [queue_subscriber])
+        stop = threading.Event()
+        thread = threading.Thread(target=dispatcher.run, args=(stop, 0.01))
+        thread.start()
+        
+        repository.save(create_order())
+        message = queue_subscriber.queue.get(timeout=2)
+        stop.set()
+        thread.join(timeout=2)
+        
+        assert isinstance(message.event, LineAdded)
+        assert not thread.is_alive()
+
+
+class TestRepositoriesWithoutOutbox:
+    """Тесты для репозиториев без outbox (по умолчанию)"""
+    
+    @pytest.mark.parametrize("factory", [InMemoryOrderRepository, ConcurrentInMemoryOrderRepository])
+    def test_nothing_is_collected(self, factory):
+        """Тест: без outbox события не записываются и не накапливаются"""
+        repository = factory()
+        order = Order(id="order_1", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, PRICE)
+        repository.save(order)
+        
+        PayOrderUseCaseImpl(repository, FakePaymentGateway()).execute(PayOrderRequest(order_id="order_1"))
+        
+        assert repository.outbox is None
+        assert repository.get_by_id("order_1").domain_events == ()
+    
+    def test_sqlite_skips_outbox_table(self, tmp_path):
+        """Тест: SQLite без outbox не пишет события в таблицу"""
+        with SQLiteOrderRepository(str(tmp_path / "orders.db")) as repository:
+            repository.save(create_order())
+            
+            assert repository.outbox is None
+            with repository._connection() as connection:
+                assert connection.execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 0
@@ -0,0 +1,148 @@
+import os
+import threading
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.infrastructure.repositories.file_order_repository import FileOrderRepository
+
+
+class TestFileOrderRepository:
+    """Тесты для файлового репозитория заказов"""
+    
+    def _create_order(self, order_id, lines=1):
+        order = Order(id=order_id, customer_id="cust_1")
+        for i in range(lines):
+            order.add_line(f"prod_{i}", f"Товар {i}", i + 1, Money(Decimal('10.50'), "EUR"))
+        return order
+    
+    def _log_size(self, directory):
+        return os.path.getsize(os.path.join(directory, FileOrderRepository.LOG_FILE))
+    
+    def test_orders_survive_reopen(self, tmp_path):
+        """Тест сохранности заказов после переоткрытия"""
+        with FileOrderRepository(str(tmp_path)) as repository:
+            order = self._create_order("order_1", lines=3)
+            repository.save(order)
+            order.pay()
+            repository.save(order)
+        
+        with FileOrderRepository(str(tmp_path)) as repository:
+            loaded = repository.get_by_id("order_1")
+            
+            assert loaded.status == OrderStatus.PAID
+            assert loaded.lines == order.lines
+            assert loaded.total_amount == Money(Decimal('63.00'), "EUR")
+            assert loaded.version == 2
+            assert repository.get_by_id("missing") is None
+    
+    def test_status_change_appends_small_record(self, tmp_path):
+        """Тест: смена статуса без изменения линий пишет только статус"""
+        repository = FileOrderRepository(str(tmp_path))
+        order = self._create_order("order_1", lines=50)
+        repository.save(order)
+        size_after_snapshot = self._log_size(str(tmp_path))
+        
+        order.pay()
+        repository.save(order)
+        
+        assert self._log_size(str(tmp_path)) - size_after_snapshot < 200
+        assert repository.get_by_id("order_1").is_paid()
+        repository.close()
+    
+    def test_changed_lines_with_same_crc32_are_saved(self, tmp_path):
+        """Тест: линии с тем же crc32, но другим содержимым сохраняются"""
+        with FileOrderRepository(str(tmp_path)) as repository:
+            order = Order(id="order_1", customer_id="cust_1")
+            order.add_line("prod_1", "1b0368ce75fbd918", 1, Money(Decimal('1.00')))
+            repository.save(order)
+            order.remove_line("prod_1")
+            order.add_line("prod_1", "4a2411efd7a54f27", 1, Money(Decimal('1.00')))
+            repository.save(order)
+            
+            assert repository.get_by_id("order_1").get_line("prod_1").product_name == "4a2411efd7a54f27"
+        
+        with FileOrderRepository(str(tmp_path)) as repository:
+            assert repository.get_by_id("order_1").get_line("prod_1").product_name == "4a2411efd7a54f27"
+    
+    def test_replay_without_checkpoint_and_torn_tail(self, tmp_path):
+        """Тест восстановления индекса из журнала и отбрасывания оборванной записи"""
+        repository = FileOrderRepository(str(tmp_path))
+        repository.save(self._create_order("order_1"))
+        repository.save(self._create_order("order_2"))
+        repository.flush()
+        # Имитация сбоя: контрольной точки нет, последняя запись оборвана
+        with open(os.path.join(str(tmp_path), FileOrderRepository.LOG_FILE), "ab") as log:
+            log.write(b'{"op":"put","id":"order_3"')
+        
+        reopened = FileOrderRepository(str(tmp_path))
+        
+        assert len(reopened) == 2
+        assert reopened.get_by_id("order_2") is not None
+        reopened.save(self._create_order("order_3"))
+        reopened.close()
+        
+        with FileOrderRepository(str(tmp_path)) as repository:
+            assert repository.get_by_id("order_3").customer_id == "cust_1"
+    
+    def test_checkpoint_plus_log_tail(self, tmp_path):
+        """Тест загрузки индекса из контрольной точки и хвоста журнала"""
+        with FileOrderRepository(str(tmp_path)) as repository:
+            repository.save(self._create_order("order_1"))
+        
+        repository = FileOrderRepository(str(tmp_path))
+        repository.save(self._create_order("order_2"))
+        repository.flush()
+        
+        reopened = FileOrderRepository(str(tmp_path))
+        
+        assert reopened.get_by_id("order_1") is not None
+        assert reopened.get_by_id("order_2") is not None
+    
+    def test_compact_keeps_latest_state(self, tmp_path):
+        """Тест уплотнения журнала"""
+        repository = FileOrderRepository(str(tmp_path))
+        for i in range(10):
+            order = self._create_order(f"order_{i}", lines=5)
+            repository.save(order)
+            order.remove_line("prod_0")
+            repository.save(order)
+            order.pay()
+            repository.save(order)
+        size_before = self._log_size(str(tmp_path))
+        
+        repository.compact()
+        
+        assert self._log_size(str(tmp_path)) < size_before
+        loaded = repository.get_by_id("order_3")
+        assert loaded.is_paid()
+        assert [line.product_id for line in loaded.lines] == ["prod_1", "prod_2", "prod_3", "prod_4"]
+        repository.save(self._create_order("order_new"))
+        repository.close()
+        
+        with FileOrderRepository(str(tmp_path)) as reopened:
+            assert len(reopened) == 11
+            assert reopened.get_by_id("order_3").is_paid()
+    
+    def test_concurrent_saves_with_group_commit(self, tmp_path):
+        """Тест параллельных сохранений"""
+        repository = FileOrderRepository(str(tmp_path))
+        
+        def worker(start):
+            for i in range(start, start + 25):
+                repository.save(self._create_order(f"order_{i}"))
+        
+        threads = [threading.Thread(target=worker, args=(n * 25,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        repository.close()
+        
+        with FileOrderRepository(str(tmp_path), sync_every=10) as reopened:
+            assert len(reopened) == 100
+    
+    def test_invalid_sync_every(self, tmp_path):
+        """Тест валидации параметра группового fsync"""
+        with pytest.raises(ValueError):
+            FileOrderRepository(str(tmp_path), sync_every=0)
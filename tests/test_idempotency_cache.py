@@ -0,0 +1,140 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order
+from src.domain.value_objects import Money
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.application.idempotency import IdempotencyCache
+from src.application.dto import PayOrderRequest, PayOrderResponse
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class CountingOrderRepository(InMemoryOrderRepository):
+    """Репозиторий, считающий обращения"""
+    
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+    
+    def get_by_id(self, order_id):
+        self.reads += 1
+        return super().get_by_id(order_id)
+
+
+class SlowPaymentGateway(FakePaymentGateway):
+    """Шлюз с задержкой"""
+    
+    def charge(self, order_id, amount):
+        time.sleep(0.02)
+        return super().charge(order_id, amount)
+
+
+class TestIdempotencyCache:
+    """Тесты для кеша ответов по ключу идемпотентности"""
+    
+    def _response(self, order_id="order_1"):
+        return PayOrderResponse(success=True, order_id=order_id, amount_paid="USD 10.00")
+    
+    def test_lru_eviction(self):
+        """Тест вытеснения самых давних ключей"""
+        cache = IdempotencyCache(max_size=2, ttl=None)
+        cache.put("a", self._response())
+        cache.put("b", self._response())
+        cache.get("a")
+        cache.put("c", self._response())
+        
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert len(cache) == 2
+    
+    def test_ttl_expiration(self):
+        """Тест истечения времени жизни ответа"""
+        now = [0.0]
+        cache = IdempotencyCache(ttl=10, clock=lambda: now[0])
+        cache.put("a", self._response())
+        
+        now[0] = 5
+        assert cache.get("a") is not None
+        now[0] = 16
+        assert cache.get("a") is None
+        assert len(cache) == 0
+    
+    def test_counters(self):
+        """Тест счетчиков попаданий и промахов"""
+        cache = IdempotencyCache()
+        cache.get("a")
+        cache.put("a", self._response())
+        cache.get("a")
+        cache.get("a")
+        
+        assert cache.stats() == {"hits": 2, "misses": 1, "hit_ratio": 2 / 3, "size": 1}
+
+
+class TestPayOrderUseCaseIdempotency:
+    """Тесты идемпотентности Use Case оплаты заказа"""
+    
+    @pytest.fixture
+    def order_repository(self):
+        """Фикстура репозитория заказов"""
+        repository = CountingOrderRepository()
+        order = Order(id="order_1", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+        repository.save(order)
+        return repository
+    
+    def test_retry_returns_stored_response(self, order_repository):
+        """Тест: повтор запроса не обращается к репозиторию и шлюзу"""
+        payment_gateway = FakePaymentGateway()
+        cache = IdempotencyCache()
+        use_case = PayOrderUseCaseImpl(order_repository, payment_gateway, idempotency_cache=cache)
+        request = PayOrderRequest(order_id="order_1", idempotency_key="key_1")
+        
+        first = use_case.execute(request)
+        second = use_case.execute(request)
+        
+        assert first.success is True
+        assert second == first
+        assert order_repository.reads == 1
+        assert payment_gateway.get_charges_count() == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_failed_payment_is_not_cached(self, order_repository):
+        """Тест: неуспешную оплату можно повторить"""
+        payment_gateway = FakePaymentGateway(fail_on_orders={"order_1"})
+        use_case = PayOrderUseCaseImpl(order_repository, payment_gateway,
+                                       idempotency_cache=IdempotencyCache())
+        request = PayOrderRequest(order_id="order_1", idempotency_key="key_1")
+        
+        assert use_case.execute(request).success is False
+        payment_gateway.fail_on_orders = set()
+        
+        assert use_case.execute(request).success is True
+        assert payment_gateway.get_charges_count() == 2
+    
+    def test_key_reused_for_another_order(self, order_repository):
+        """Тест повторного использования ключа для другого заказа"""
+        use_case = PayOrderUseCaseImpl(order_repository, FakePaymentGateway(),
+                                       idempotency_cache=IdempotencyCache())
+        use_case.execute(PayOrderRequest(order_id="order_1", idempotency_key="key_1"))
+        
+        response = use_case.execute(PayOrderRequest(order_id="order_2", idempotency_key="key_1"))
+        
+        assert response.success is False
+        assert "was used for order order_1" in response.error_message
+    
+    def test_concurrent_retries_charge_once(self, order_repository):
+        """Тест одновременных повторов с одним ключом"""
+        payment_gateway = SlowPaymentGateway()
+        use_case = PayOrderUseCaseImpl(order_repository, payment_gateway,
+                                       idempotency_cache=IdempotencyCache())
+        request = PayOrderRequest(order_id="order_1", idempotency_key="key_1")
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(use_case.execute, [request] * 8))
+        
+        assert all(response.success for response in responses)
+        assert payment_gateway.get_charges_count() == 1
+        assert order_repository.reads == 1
@@ -0,0 +1,112 @@
+import pytest
+import src
+from benchmarks.bench_import_time import SCENARIOS, check_scenario, measure, parse_importtime
+from src.domain.interfaces import OrderRepository, PaymentGateway
+from src.domain.exceptions import DomainException
+from src.infrastructure.registry import AdapterRegistry, create_payment_gateway, create_repository
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+
+
+class TestPackageFacade:
+    """Тесты для публичного API пакета"""
+    
+    def test_exports_resolve_to_single_modules(self):
+        """Тест: имена фасада - те же объекты, что и в модулях слоев"""
+        assert src.OrderRepository is OrderRepository
+        assert src.DomainException is DomainException
+        assert "PayOrderUseCaseImpl" in dir(src)
+        assert set(src.__all__) <= set(dir(src))
+    
+    def test_unknown_attribute(self):
+        """Тест ошибки для неизвестного имени"""
+        with pytest.raises(AttributeError):
+            src.NoSuchThing
+    
+    def test_adapters_implement_domain_interfaces(self):
+        """Тест: адаптеры импортируют домен через тот же пакет"""
+        assert isinstance(src.create_repository("memory"), OrderRepository)
+        assert isinstance(src.create_payment_gateway("fake"), PaymentGateway)
+
+
+class TestAdapterRegistry:
+    """Тесты для реестра адаптеров"""
+    
+    def test_create_builtin_adapters(self, tmp_path):
+        """Тест создания встроенных адаптеров по имени"""
+        storage = create_repository("memory")
+        caching = create_repository("caching", storage, max_size=10)
+        sqlite = create_repository("sqlite", str(tmp_path / "orders.db"))
+        gateway = create_payment_gateway("resilient", create_payment_gateway("fake"), max_retries=0)
+        
+        try:
+            assert isinstance(storage, InMemoryOrderRepository)
+            assert caching.repository is storage
+            assert isinstance(sqlite, OrderRepository)
+            assert isinstance(gateway, PaymentGateway)
+        finally:
+            sqlite.close()
+            gateway.shutdown()
+    
+    def test_lazy_target_is_imported_on_first_use(self):
+        """Тест отложенного импорта фабрики по строке"""
+        registry = AdapterRegistry("repository")
+        registry.register("memory", ".repositories.in_memory_order_repository:InMemoryOrderRepository")
+        
+        assert "memory" in registry
+        assert registry.resolve("memory") is InMemoryOrderRepository
+        assert registry.resolve("memory") is InMemoryOrderRepository
+    
+    def test_register_callable_and_duplicates(self):
+        """Тест регистрации фабрики и запрета повторного имени"""
+        registry = AdapterRegistry("repository")
+        registry.register("custom", InMemoryOrderRepository)
+        
+        with pytest.raises(ValueError):
+            registry.register("custom", InMemoryOrderRepository)
+        registry.register("custom", dict, replace=True)
+        
+        assert registry.create("custom") == {}
+        assert registry.names() == ["custom"]
+    
+    def test_unknown_adapter(self):
+        """Тест ошибки для неизвестного адаптера"""
+        with pytest.raises(ValueError, match="available: caching, concurrent, file, memory, sqlite"):
+            create_repository("postgres")
+
+
+class TestImportTime:
+    """Тесты времени запуска (-X importtime)"""
+    
+    def test_parse_importtime(self):
+        """Тест разбора вывода -X importtime"""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 | site\n"
+            "-- scenario --\n"
+            "import time:       200 |        200 |   typing\n"
+            "import time:       300 |        500 | src.domain\n"
+            "import time:        50 |         50 | json\n"
+        )
+        
+        result = parse_importtime(output)
+        
+        assert result.total_us == 550
+        assert result.loaded() == ["typing", "src.domain", "json"]
+        assert result.slowest(1) == [("src.domain", 300, 500)]
+    
+    def test_check_scenario_reports_forbidden_imports(self):
+        """Тест обнаружения лишних импортов"""
+        result = parse_importtime("-- scenario --\nimport time:       10 |         10 | sqlite3\n")
+        
+        assert check_scenario("pay_order_worker", result) == [
+            "pay_order_worker: unexpected imports sqlite3"
+        ]
+    
+    @pytest.mark.parametrize("name", sorted(SCENARIOS))
+    def test_startup_within_budget(self, name):
+        """Тест: запуск укладывается в бюджет и не тянет лишних модулей"""
+        result = measure(SCENARIOS[name].code, runs=3)
+        
+        assert check_scenario(name, result) == []
+        assert not any(module.startswith(("domain", "application", "infrastructure"))
+                       for module in result.loaded())
@@ -0,0 +1,145 @@
+import json
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order
+from src.domain.value_objects import Money
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.application.metrics import MetricsRegistry, to_json, to_prometheus_text
+from src.application.instrumentation import (
+    InstrumentedOrderRepository,
+    InstrumentedPaymentGateway,
+    MetricsInstrumentation,
+)
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from tests.conftest import FakeClock
+
+
+class TestMetricsRegistry:
+    """Тесты для реестра метрик и выгрузки"""
+    
+    def test_prometheus_text_format(self):
+        """Тест текстового формата Prometheus"""
+        registry = MetricsRegistry()
+        registry.counter("payments_total", "Payments by outcome", ("outcome",)).inc("success", amount=3)
+        histogram = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "load")
+        histogram.observe(0.5, "load")
+        histogram.observe(5, "load")
+        
+        text = to_prometheus_text(registry)
+        
+        assert "# TYPE payments_total counter" in text
+        assert 'payments_total{outcome="success"} 3.0' in text
+        assert 'latency_seconds_bucket{stage="load",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{stage="load",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{stage="load",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{stage="load"} 3' in text
+        assert 'latency_seconds_sum{stage="load"} 5.55' in text
+    
+    def test_json_export(self):
+        """Тест выгрузки в JSON"""
+        registry = MetricsRegistry()
+        registry.counter("events_total", "Events").inc()
+        
+        data = json.loads(to_json(registry))
+        
+        assert data["events_total"] == {
+            "type": "counter", "help": "Events", "samples": [{"labels": {}, "value": 1}]
+        }
+    
+    def test_register_returns_existing_metric(self):
+        """Тест повторной регистрации метрики"""
+        registry = MetricsRegistry()
+        counter = registry.counter("events_total", "Events", ("kind",))
+        
+        assert registry.counter("events_total", "Events", ("kind",)) is counter
+        with pytest.raises(ValueError):
+            registry.histogram("events_total", "Events", ("kind",))
+
+
+class TestPaymentInstrumentation:
+    """Тесты для инструментирования Use Case оплаты"""
+    
+    @pytest.fixture
+    def order_repository(self):
+        """Фикстура репозитория с оплачиваемым, пустым и отклоняемым заказами"""
+        repository = InMemoryOrderRepository()
+        for order_id in ("order_ok", "order_declined"):
+            order = Order(id=order_id, customer_id="cust_1")
+            order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+            repository.save(order)
+        repository.save(Order(id="order_empty", customer_id="cust_1"))
+        return repository
+    
+    def test_stage_timers_and_outcomes(self, order_repository):
+        """Тест таймеров этапов и счетчиков результатов"""
+        instrumentation = MetricsInstrumentation(clock=FakeClock(step=0.001))
+        use_case = PayOrderUseCaseImpl(
+            order_repository, FakePaymentGateway(fail_on_orders={"order_declined"}),
+            instrumentation=instrumentation
+        )
+        
+        for order_id in ("order_ok", "order_ok", "order_empty", "order_declined", "missing"):
+            use_case.execute(PayOrderRequest(order_id=order_id))
+        
+        payments = instrumentation.payments
+        assert payments.value("success") == 1
+        assert payments.value("OrderAlreadyPaidException") == 1
+        assert payments.value("EmptyOrderException") == 1
+        assert payments.value("payment_declined") == 1
+        assert payments.value("order_not_found") == 1
+        
+        stages = instrumentation.stage_seconds
+        assert stages.count("total") == 5
+        assert stages.count("load") == 5
+        assert stages.count("pay") == 4
+        assert stages.count("charge") == 2
+        assert stages.count("save") == 1
+    
+    @pytest.mark.parametrize("instrumented", [False, True])
+    def test_adapters_can_be_replaced(self, order_repository, instrumented):
+        """Тест: замена шлюза и репозитория после создания Use Case учитывается"""
+        instrumentation = MetricsInstrumentation(clock=FakeClock(step=0.001)) if instrumented else None
+        use_case = PayOrderUseCaseImpl(InMemoryOrderRepository(), FakePaymentGateway(),
+                                       instrumentation=instrumentation)
+        gateway = FakePaymentGateway(fail_on_orders={"order_declined"})
+        use_case.order_repository = order_repository
+        use_case.payment_gateway = gateway
+        
+        assert use_case.execute(PayOrderRequest(order_id="order_ok")).success
+        assert not use_case.execute(PayOrderRequest(order_id="order_declined")).success
+        assert gateway.get_charges_count() == 2
+        assert order_repository.get_by_id("order_ok").is_paid()
+    
+    def test_instrumented_repository_and_gateway(self, order_repository):
+        """Тест декораторов репозитория и шлюза"""
+        registry = MetricsRegistry()
+        repository = InstrumentedOrderRepository(order_repository, registry)
+        gateway = InstrumentedPaymentGateway(FakePaymentGateway(fail_on_orders={"order_declined"}), registry)
+        use_case = PayOrderUseCaseImpl(repository, gateway)
+        
+        use_case.execute(PayOrderRequest(order_id="order_ok"))
+        use_case.execute(PayOrderRequest(order_id="order_declined"))
+        gateway.charge_many([("a", Money(Decimal('1'))), ("order_declined", Money(Decimal('1')))])
+        
+        text = to_prometheus_text(registry)
+        assert 'repository_call_seconds_count{method="get_by_id"} 2' in text
+        assert 'repository_call_seconds_count{method="save"} 1' in text
+        assert 'gateway_charges_total{result="success"} 2.0' in text
+        assert 'gateway_charges_total{result="declined"} 2.0' in text
+    
+    def test_errors_are_counted_and_reraised(self):
+        """Тест учета исключений в декораторе"""
+        class BrokenGateway(FakePaymentGateway):
+            def charge(self, order_id, amount):
+                raise ConnectionError("down")
+        
+        registry = MetricsRegistry()
+        gateway = InstrumentedPaymentGateway(BrokenGateway(), registry)
+        
+        with pytest.raises(ConnectionError):
+            gateway.charge("order_1", Money(Decimal('1')))
+        
+        assert 'gateway_errors_total{method="charge",exception="ConnectionError"} 1.0' in to_prometheus_text(registry)
@@ -0,0 +1,196 @@
+import mmap
+import random
+import pytest
+from decimal import Decimal
+from src.domain.columnar_lines import ColumnarOrderLines
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money, MoneyBag
+from src.infrastructure.serialization.order_codec import (
+    FORMAT_VERSION,
+    OrderSnapshot,
+    SnapshotFormatError,
+    decode_order,
+    encode_order,
+    order_from_dict,
+    order_from_json,
+    order_to_dict,
+    order_to_json,
+)
+
+
+CURRENCIES = ("USD", "EUR", "JPY", "BHD")
+NAMES = ("Ноутбук", "Mouse", "Café crème", "", "商品")
+
+
+def random_order(rnd: random.Random, index: int) -> Order:
+    """Случайный заказ: валюты с разным числом знаков, цены с лишними знаками"""
+    order = Order(id=f"order_{index}", customer_id=f"клиент_{rnd.randrange(50)}")
+    for j in range(rnd.randrange(0, 30)):
+        currency = rnd.choice(CURRENCIES)
+        places = rnd.choice((0, 1, 2, 3, 5))
+        price = Money(Decimal(rnd.randrange(0, 10 ** 7)).scaleb(-places), currency)
+        order.add_line(f"prod_{j}", rnd.choice(NAMES), rnd.randint(1, 1000), price)
+    if order.lines and rnd.random() < 0.5:
+        order.pay()
+    order.version = rnd.randrange(0, 2 ** 40)
+    order.clear_events()
+    return order
+
+
+def assert_same_order(actual: Order, expected: Order):
+    assert actual == expected
+    assert actual.version == expected.version
+    assert actual.lines == expected.lines
+    assert actual.subtotals == expected.subtotals
+
+
+class TestOrderCodec:
+    """Тесты для двоичного и JSON представлений заказа"""
+    
+    @pytest.mark.parametrize("seed", range(5))
+    def test_binary_round_trip(self, seed):
+        """Свойство: decode(encode(order)) совпадает с заказом"""
+        rnd = random.Random(seed)
+        for index in range(50):
+            order = random_order(rnd, index)
+            
+            assert_same_order(decode_order(encode_order(order)), order)
+    
+    @pytest.mark.parametrize("seed", range(5))
+    def test_json_round_trip(self, seed):
+        """Свойство: JSON-представление восстанавливает заказ"""
+        rnd = random.Random(seed)
+        for index in range(50):
+            order = random_order(rnd, index)
+            
+            assert_same_order(order_from_json(order_to_json(order)), order)
+    
+    @pytest.mark.parametrize("seed", range(3))
+    def test_snapshot_reads_without_decoding_lines(self, seed):
+        """Свойство: ленивое чтение совпадает с полями заказа"""
+        rnd = random.Random(seed)
+        for index in range(50):
+            order = random_order(rnd, index)
+            snapshot = OrderSnapshot(encode_order(order))
+            
+            assert snapshot.id == order.id
+            assert snapshot.customer_id == order.customer_id
+            assert snapshot.status == order.status
+            assert snapshot.is_paid() == order.is_paid()
+            assert len(snapshot) == len(order.lines)
+            assert snapshot.subtotals == order.subtotals
+            assert tuple(snapshot.lines()) == order.lines
+            if order.lines:
+                position = rnd.randrange(len(order.lines))
+                assert snapshot.line(position) == order.lines[position]
+    
+    def test_decoded_order_stays_consistent(self):
+        """Тест: восстановленные суммы продолжают обновляться при изменениях"""
+        order = Order("order_1", "cust_1")
+        order.add_line("prod_1", "Product 1", 2, Money(Decimal("10.50")))
+        order.add_line("prod_2", "Product 2", 1, Money(Decimal("1.25")))
+        
+        decoded = decode_order(encode_order(order))
+        decoded.enable_events()
+        decoded.update_quantity("prod_1", 1)
+        decoded.remove_line("prod_2")
+        
+        assert decoded.total_amount == Money(Decimal("10.50"))
+        assert decoded.domain_events[0].product_id == "prod_1"
+    
+    def test_decode_from_buffers_without_copy(self, tmp_path):
+        """Тест чтения из memoryview, bytearray и mmap"""
+        order = Order("order_1", "cust_1")
+        order.add_line("prod_1", "Product 1", 3, Money(Decimal("19.99"), "EUR"))
+        data = encode_order(order)
+        framed = b"header" + data + b"trailer"
+        path = tmp_path / "snapshot.bin"
+        path.write_bytes(data)
+        
+        assert_same_order(decode_order(memoryview(framed)[6:6 + len(data)]), order)
+        assert_same_order(decode_order(bytearray(data)), order)
+        with open(path, "rb") as source, mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            snapshot = OrderSnapshot(view)
+            assert snapshot.total_amount == Money(Decimal("59.97"), "EUR")
+            del snapshot
+    
+    def test_decode_into_columnar_store(self):
+        """Тест восстановления в колоночное хранилище линий"""
+        order = Order("order_1", "cust_1")
+        order.add_line("prod_1", "Product 1", 3, Money(Decimal("19.99")))
+        
+        decoded = decode_order(encode_order(order), line_store=ColumnarOrderLines())
+        
+        assert isinstance(decoded._lines, ColumnarOrderLines)
+        assert decoded.lines == order.lines
+    
+    def test_strings_are_interned(self):
+        """Тест: повторяющиеся названия товаров хранятся один раз"""
+        shared, distinct = Order("order_1", "cust_1"), Order("order_1", "cust_1")
+        for j in range(20):
+            shared.add_line(f"prod_{j}", "Одинаковое название", 1, Money(Decimal("1.00")))
+            distinct.add_line(f"prod_{j}", f"Название товара {j:04d}", 1, Money(Decimal("1.00")))
+        
+        assert len(encode_order(distinct)) - len(encode_order(shared)) > 19 * 30
+    
+    def test_minor_units_keep_extra_precision(self):
+        """Тест цен с большим числом знаков, чем у валюты"""
+        order = Order("order_1", "cust_1")
+        order.add_line("prod_1", "Product 1", 3, Money(Decimal("0.0005")))
+        order.add_line("prod_2", "Product 2", 1, Money(Decimal("1500"), "JPY"))
+        
+        decoded = decode_order(encode_order(order))
+        
+        assert decoded.get_line("prod_1").unit_price.amount == Decimal("0.0005")
+        assert decoded.subtotals == MoneyBag([Money(Decimal("0.0015")), Money(Decimal("1500"), "JPY")])
+    
+    def test_status_and_empty_order(self):
+        """Тест пустого отмененного заказа"""
+        order = Order("order_1", "cust_1", status=OrderStatus.CANCELLED, version=7)
+        
+        decoded = decode_order(encode_order(order))
+        
+        assert decoded.status == OrderStatus.CANCELLED
+        assert decoded.version == 7
+        assert decoded.lines == ()
+        assert OrderSnapshot(encode_order(order)).total_amount == Money(Decimal("0"))
+    
+    def test_amount_out_of_range(self):
+        """Тест суммы, не помещающейся в 64 бита"""
+        order = Order("order_1", "cust_1")
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal(10) ** 20))
+        
+        with pytest.raises(ValueError):
+            encode_order(order)
+    
+    def test_rejects_invalid_data(self):
+        """Тест ошибок формата"""
+        order = Order("order_1", "cust_1")
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal("1.00")))
+        data = encode_order(order)
+        
+        with pytest.raises(SnapshotFormatError, match="Not an order snapshot"):
+            OrderSnapshot(b"XX" + data[2:])
+        with pytest.raises(SnapshotFormatError, match="format version"):
+            OrderSnapshot(data[:2] + bytes([FORMAT_VERSION + 1]) + data[3:])
+        with pytest.raises(SnapshotFormatError, match="truncated"):
+            OrderSnapshot(data[:-1])
+        with pytest.raises(SnapshotFormatError, match="format version"):
+            order_from_dict(dict(order_to_dict(order), format=FORMAT_VERSION + 1))
+    
+    def test_json_is_readable(self):
+        """Тест отладочного JSON-представления"""
+        order = Order("order_1", "cust_1")
+        order.add_line("prod_1", "Ноутбук", 2, Money(Decimal("999.99")))
+        
+        data = order_to_dict(order)
+        
+        assert data["totals"] == {"USD": "1999.98"}
+        assert data["lines"][0] == {
+            "product_id": "prod_1",
+            "product_name": "Ноутбук",
+            "quantity": 2,
+            "unit_price": "999.99",
+            "currency": "USD",
+        }
+        assert "Ноутбук" in order_to_json(order)
@@ -1,11 +1,17 @@
+import pickle
+import random
 import pytest
+from dataclasses import FrozenInstanceError
 from decimal import Decimal
 from src.domain.entities import Order, OrderLine, OrderStatus
-from src.domain.value_objects import Money
+from src.domain.value_objects import Money, MinorUnits
 from src.domain.exceptions import (
     EmptyOrderException, 
     OrderAlreadyPaidException, 
-    OrderModificationException
+    OrderModificationException,
+    OrderLineNotFoundException,
+    InvalidQuantityException,
+    InvalidMoneyValueException
 )
 
 
@@ -108,6 +114,127 @@ class TestOrderEntity:
         assert len(order.lines) == 1
         assert order.lines[0].product_id == "prod_2"
         assert order.total_amount == Money(Decimal('5.00'))
+    
+    def test_lines_are_read_only(self):
+        """Тест: список линий нельзя изменить в обход агрегата"""
+        order = Order(id="123", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 2, Money(Decimal('10.00')))
+        
+        with pytest.raises(AttributeError):
+            order.lines.append(OrderLine("prod_2", "Product 2", 1, Money(Decimal('5.00'))))
+        assert len(order.lines) == 1
+    
+    def test_order_created_with_lines(self):
+        """Тест суммы заказа, созданного с готовыми линиями"""
+        lines = [
+            OrderLine("prod_1", "Product 1", 2, Money(Decimal('10.00'))),
+            OrderLine("prod_2", "Product 2", 1, Money(Decimal('5.00'))),
+        ]
+        order = Order(id="123", customer_id="cust_1", lines=lines)
+        
+        assert order.total_amount == Money(Decimal('25.00'))
+    
+    def test_total_amount_in_single_foreign_currency(self):
+        """Тест суммы заказа в валюте, отличной от USD"""
+        order = Order(id="123", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 2, Money(Decimal('10.00'), "EUR"))
+        
+        assert order.total_amount == Money(Decimal('20.00'), "EUR")
+    
+    def test_total_amount_with_mixed_currencies_raises(self):
+        """Тест суммы заказа с разными валютами"""
+        order = Order(id="123", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00'), "USD"))
+        order.add_line("prod_2", "Product 2", 1, Money(Decimal('10.00'), "EUR"))
+        
+        with pytest.raises(ValueError):
+            order.total_amount
+        
+        order.remove_line("prod_2")
+        assert order.total_amount == Money(Decimal('10.00'), "USD")
+    
+    @pytest.mark.parametrize("seed", range(20))
+    def test_running_total_matches_recomputed_sum(self, seed):
+        """Тест: текущая сумма всегда равна пересчитанной сумме линий"""
+        rnd = random.Random(seed)
+        currency = rnd.choice(["USD", "EUR"])
+        prices = [rnd.randrange(0, 100000) for _ in range(30)]
+        order = Order(id="123", customer_id="cust_1")
+        
+        for _ in range(200):
+            action = rnd.random()
+            if order.lines and action < 0.3:
+                order.remove_line(rnd.choice(order.lines).product_id)
+            elif order.lines and action < 0.5:
+                order.update_quantity(rnd.choice(order.lines).product_id, rnd.randint(0, 50))
+            else:
+                product = rnd.randrange(30)
+                order.add_line(
+                    f"prod_{product}",
+                    "Product",
+                    rnd.randint(1, 50),
+                    Money(Decimal(prices[product]) / 100, currency)
+                )
+            
+            expected = sum((line.total_price.amount for line in order.lines), Decimal('0'))
+            assert order.total_amount.amount == expected
+            if order.lines:
+                assert order.total_amount.currency == currency
+
+    
+    def test_add_same_product_merges_lines(self):
+        """Тест объединения линий одного товара"""
+        order = Order(id="123", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 2, Money(Decimal('10.00')))
+        order.add_line("prod_2", "Product 2", 1, Money(Decimal('5.00')))
+        order.add_line("prod_1", "Product 1", 3, Money(Decimal('10.00')))
+        
+        assert [line.product_id for line in order.lines] == ["prod_1", "prod_2"]
+        assert order.get_line("prod_1").quantity == 5
+        assert order.total_amount == Money(Decimal('55.00'))
+    
+    def test_add_same_product_with_different_price_raises(self):
+        """Тест добавления товара с другой ценой"""
+        order = Order(id="123", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+        
+        with pytest.raises(OrderModificationException):
+            order.add_line("prod_1", "Product 1", 1, Money(Decimal('12.00')))
+        
+        assert order.total_amount == Money(Decimal('10.00'))
+    
+    def test_update_quantity(self):
+        """Тест изменения количества товара"""
+        order = Order(id="123", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+        order.add_line("prod_2", "Product 2", 1, Money(Decimal('5.00')))
+        
+        order.update_quantity("prod_1", 4)
+        
+        assert [line.product_id for line in order.lines] == ["prod_1", "prod_2"]
+        assert order.get_line("prod_1").quantity == 4
+        assert order.total_amount == Money(Decimal('45.00'))
+        
+        order.update_quantity("prod_1", 0)
+        
+        assert order.get_line("prod_1") is None
+        assert order.total_amount == Money(Decimal('5.00'))
+    
+    def test_update_quantity_errors(self):
+        """Тест ошибок изменения количества"""
+        order = Order(id="123", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+        
+        with pytest.raises(OrderLineNotFoundException):
+            order.update_quantity("prod_2", 1)
+        
+        with pytest.raises(InvalidQuantityException):
+            order.update_quantity("prod_1", -1)
+        
+        order.pay()
+        
+        with pytest.raises(OrderModificationException):
+            order.update_quantity("prod_1", 2)
 
 
 class TestMoneyValueObject:
@@ -144,3 +271,60 @@ class TestMoneyValueObject:
         
         assert money.amount == Decimal('100.50')
         assert money.currency == "USD"
+    
+    def test_money_is_immutable_and_slotted(self):
+        """Тест неизменяемости Money и отсутствия __dict__"""
+        money = Money(Decimal('10.00'))
+        
+        with pytest.raises(FrozenInstanceError):
+            money.amount = Decimal('20.00')
+        
+        assert not hasattr(money, '__dict__')
+        assert not hasattr(OrderLine("p", "P", 1, money), '__dict__')
+    
+    def test_money_equality_hash_and_pickle(self):
+        """Тест сравнения, хеширования и сериализации Money"""
+        money = Money(Decimal('10.00'), "EUR")
+        
+        assert money == Money(Decimal('10'), "EUR")
+        assert money != Money(Decimal('10.00'), "USD")
+        assert len({money, Money(Decimal('10'), "EUR")}) == 1
+        assert pickle.loads(pickle.dumps(money)) == money
+    
+    def test_negative_money_raises(self):
+        """Тест валидации отрицательной суммы"""
+        with pytest.raises(InvalidMoneyValueException):
+            Money(Decimal('-1'))
+        
+        with pytest.raises(InvalidMoneyValueException):
+            Money(Decimal('10')) * -1
+
+
+class TestMinorUnits:
+    """Тесты для представления в минорных единицах"""
+    
+    def test_round_trip(self):
+        """Тест точного перевода Money в минорные единицы и обратно"""
+        money = Money(Decimal('123.45'), "USD")
+        
+        units = money.to_minor_units()
+        
+        assert units == MinorUnits(12345, "USD")
+        assert units.to_money() == money
+        assert MinorUnits.from_money(Money(Decimal('500'), "JPY")) == MinorUnits(500, "JPY")
+    
+    def test_integer_arithmetic(self):
+        """Тест целочисленной арифметики"""
+        total = MinorUnits(1050) * 3 + MinorUnits(25)
+        
+        assert total == MinorUnits(3175)
+        assert total.to_money() == Money(Decimal('31.75'))
+        assert str(total) == "USD 31.75"
+        
+        with pytest.raises(ValueError):
+            MinorUnits(1, "USD") + MinorUnits(1, "EUR")
+    
+    def test_inexact_amount_raises(self):
+        """Тест суммы, не представимой в минорных единицах"""
+        with pytest.raises(InvalidMoneyValueException):
+            Money(Decimal('10.005'), "USD").to_minor_units()
@@ -0,0 +1,193 @@
+import json
+import pytest
+from decimal import Decimal
+from src.domain.entities import OrderStatus
+from src.domain.value_objects import Money
+from src.infrastructure.importers.order_importer import OrderImporter, read_csv_rows
+from src.infrastructure.repositories.concurrent_in_memory_order_repository import (
+    ConcurrentInMemoryOrderRepository
+)
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+
+
+CSV_HEADER = "order_id,customer_id,product_id,product_name,quantity,unit_price,currency,status\n"
+
+
+class RecordingRepository(InMemoryOrderRepository):
+    """Репозиторий, запоминающий размеры порций save_many"""
+    
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+    
+    def save_many(self, orders):
+        orders = list(orders)
+        self.batches.append(len(orders))
+        super().save_many(orders)
+
+
+class TestOrderImporter:
+    """Тесты для потокового импорта заказов"""
+    
+    @pytest.fixture
+    def order_repository(self):
+        """Фикстура репозитория заказов"""
+        return RecordingRepository()
+    
+    def test_import_csv(self, order_repository, tmp_path):
+        """Тест импорта CSV с группировкой линий по заказам"""
+        path = tmp_path / "orders.csv"
+        path.write_text(
+            CSV_HEADER
+            + "order_1,cust_1,prod_1,Product 1,2,10.50,EUR,\n"
+            + "order_1,cust_1,prod_2,Product 2,1,4.00,EUR,\n"
+            + "order_2,cust_2,prod_1,Product 1,3,1000,JPY,paid\n",
+            encoding="utf-8"
+        )
+        
+        report = OrderImporter(order_repository).import_csv(str(path))
+        
+        assert report.rows_read == 3
+        assert report.orders_imported == 2
+        assert report.lines_imported == 3
+        assert report.rows_rejected == 0
+        order_1 = order_repository.get_by_id("order_1")
+        assert order_1.total_amount == Money(Decimal('25.00'), "EUR")
+        assert order_1.status == OrderStatus.CREATED
+        order_2 = order_repository.get_by_id("order_2")
+        assert order_2.total_amount == Money(Decimal('3000'), "JPY")
+        assert order_2.status == OrderStatus.PAID
+    
+    def test_import_jsonl_lines_and_orders(self, order_repository, tmp_path):
+        """Тест импорта JSON lines: линии и заказы целиком"""
+        path = tmp_path / "orders.jsonl"
+        records = [
+            {"order_id": "order_1", "customer_id": "cust_1", "product_id": "prod_1",
+             "product_name": "Product 1", "quantity": 1, "unit_price": "5.00"},
+            {"id": "order_2", "customer_id": "cust_2", "currency": "EUR", "lines": [
+                {"product_id": "prod_1", "product_name": "Product 1", "quantity": 2, "unit_price": "1.25"},
+                {"product_id": "prod_2", "product_name": "Product 2", "quantity": 1, "unit_price": "0.50"},
+            ]},
+        ]
+        path.write_text("\n".join(json.dumps(record) for record in records) + "\n\n", encoding="utf-8")
+        
+        report = OrderImporter(order_repository).import_jsonl(str(path))
+        
+        assert report.orders_imported == 2
+        assert report.lines_imported == 3
+        assert order_repository.get_by_id("order_1").total_amount == Money(Decimal('5.00'))
+        assert order_repository.get_by_id("order_2").total_amount == Money(Decimal('3.00'), "EUR")
+    
+    def test_malformed_rows_reject_whole_order(self, order_repository, tmp_path):
+        """Тест отклонения заказа с невалидной строкой"""
+        path = tmp_path / "orders.csv"
+        path.write_text(
+            CSV_HEADER
+            + "order_1,cust_1,prod_1,Product 1,1,10.00,USD,\n"
+            + "order_1,cust_1,prod_2,Product 2,abc,10.00,USD,\n"
+            + "order_2,cust_1,prod_1,Product 1,1,-1,USD,\n"
+            + "order_3,cust_1,prod_1,Product 1,1,0.001,USD,\n"
+            + "order_4,cust_1,prod_1,Product 1,1,1.00,USD,unknown\n"
+            + ",cust_1,prod_1,Product 1,1,1.00,USD,\n"
+            + "order_5,cust_1,prod_1,Product 1,1,1.00,USD,\n",
+            encoding="utf-8"
+        )
+        
+        report = OrderImporter(order_repository).import_csv(str(path))
+        
+        assert report.orders_imported == 1
+        assert report.orders_rejected == 4
+        assert report.rows_rejected == 5
+        assert [row.line_number for row in report.rejected] == [3, 4, 5, 6, 7]
+        assert "Invalid quantity" in report.rejected[0].reason
+        assert order_repository.get_by_id("order_1") is None
+        assert order_repository.get_by_id("order_5") is not None
+    
+    def test_non_contiguous_lines_are_rejected(self, order_repository):
+        """Тест строк заказа, идущих не подряд"""
+        def row(order_id, product_id):
+            return {"order_id": order_id, "customer_id": "cust_1", "product_id": product_id,
+                    "product_name": product_id, "quantity": "1", "unit_price": "1.00"}
+        
+        rows = enumerate([row("order_1", "a"), row("order_2", "a"), row("order_1", "b")], start=2)
+        report = OrderImporter(order_repository).import_rows(rows)
+        
+        assert report.orders_imported == 2
+        assert report.rows_rejected == 1
+        assert "not contiguous" in report.rejected[0].reason
+        assert len(order_repository.get_by_id("order_1").lines) == 1
+    
+    def test_contiguity_window_is_bounded(self, order_repository):
+        """Тест: окно проверки разрыва групп ограничено recent_orders"""
+        def row(order_id, product_id):
+            return {"order_id": order_id, "customer_id": "cust_1", "product_id": product_id,
+                    "product_name": product_id, "quantity": "1", "unit_price": "1.00"}
+        
+        ids = ["order_1", "order_2", "order_3", "order_1", "order_3"]
+        rows = enumerate([row(order_id, f"p{i}") for i, order_id in enumerate(ids)], start=2)
+        report = OrderImporter(order_repository, recent_orders=2).import_rows(rows)
+        
+        # order_1 уже вытеснен из окна и сохраняется заново, order_3 - нет
+        assert report.rows_rejected == 1
+        assert report.rejected[0].order_id == "order_3"
+        assert [line.product_id for line in order_repository.get_by_id("order_1").lines] == ["p3"]
+    
+    def test_version_conflicts_are_rejected_per_order(self, tmp_path):
+        """Тест повторного импорта в репозиторий с проверкой версий"""
+        path = tmp_path / "orders.csv"
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(CSV_HEADER)
+            for i in range(5):
+                output.write(f"order_{i},cust_1,prod_1,Product 1,1,1.00,USD,\n")
+        repository = ConcurrentInMemoryOrderRepository()
+        importer = OrderImporter(repository, batch_size=2)
+        importer.import_csv(str(path))
+        path.write_text(CSV_HEADER + "order_new,cust_1,prod_1,Product 1,1,1.00,USD,\n"
+                        + "order_3,cust_1,prod_1,Product 1,1,1.00,USD,\n", encoding="utf-8")
+        
+        report = importer.import_csv(str(path))
+        
+        assert report.orders_imported == 1
+        assert report.orders_rejected == 1
+        assert report.rows_rejected == 0
+        assert (report.rejected[0].order_id, report.rejected[0].line_number) == ("order_3", 3)
+        assert "modified concurrently" in report.rejected[0].reason
+        assert repository.get_by_id("order_new") is not None
+        assert repository.get_by_id("order_3").version == 1
+    
+    def test_batches_and_progress(self, order_repository, tmp_path):
+        """Тест записи порциями и отчета о прогрессе"""
+        path = tmp_path / "orders.csv"
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(CSV_HEADER)
+            for i in range(25):
+                output.write(f"order_{i},cust_1,prod_1,Product 1,1,1.00,USD,\n")
+        progress = []
+        
+        importer = OrderImporter(order_repository, batch_size=10,
+                                 progress=lambda report: progress.append(report.orders_imported))
+        report = importer.import_csv(str(path))
+        
+        assert report.orders_imported == 25
+        assert order_repository.batches == [10, 10, 5]
+        assert progress == [10, 20, 25]
+    
+    def test_rows_are_read_lazily(self, tmp_path):
+        """Тест ленивого чтения строк файла"""
+        path = tmp_path / "orders.csv"
+        path.write_text(CSV_HEADER + "order_1,cust_1,prod_1,Product 1,1,1.00,USD,\n", encoding="utf-8")
+        
+        rows = read_csv_rows(str(path))
+        
+        assert next(rows) == (2, {
+            "order_id": "order_1", "customer_id": "cust_1", "product_id": "prod_1",
+            "product_name": "Product 1", "quantity": "1", "unit_price": "1.00",
+            "currency": "USD", "status": "",
+        })
+    
+    def test_invalid_batch_size(self, order_repository):
+        """Тест невалидного размера порции"""
+        with pytest.raises(ValueError):
+            OrderImporter(order_repository, batch_size=0)
+        with pytest.raises(ValueError):
+            OrderImporter(order_repository, recent_orders=-1)
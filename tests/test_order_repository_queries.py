@@ -0,0 +1,131 @@
+import json
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.application.use_cases import PayOrderUseCaseImpl, PayOrdersBatchUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.concurrent_in_memory_order_repository import (
+    ConcurrentInMemoryOrderRepository
+)
+from src.infrastructure.repositories.file_order_repository import FileOrderRepository
+from src.infrastructure.repositories.sqlite_order_repository import SQLiteOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+def create_order(order_id, customer_id="cust_1"):
+    order = Order(id=order_id, customer_id=customer_id)
+    order.add_line("prod_1", "Product 1", 1, Money(Decimal('10.00')))
+    return order
+
+
+class TestOrderRepositoryQueries:
+    """Тесты для поиска заказов по клиенту и статусу"""
+    
+    @pytest.fixture(params=["in_memory", "concurrent", "file", "sqlite"])
+    def order_repository(self, request, tmp_path):
+        """Фикстура репозитория заказов (все реализации проходят одни тесты)"""
+        if request.param == "file":
+            repository = FileOrderRepository(str(tmp_path))
+            yield repository
+            repository.close()
+        elif request.param == "sqlite":
+            repository = SQLiteOrderRepository(str(tmp_path / "orders.db"))
+            yield repository
+            repository.close()
+        elif request.param == "concurrent":
+            yield ConcurrentInMemoryOrderRepository()
+        else:
+            yield InMemoryOrderRepository()
+    
+    def test_find_by_customer(self, order_repository):
+        """Тест поиска заказов клиента"""
+        order_repository.save_many([
+            create_order("order_1", "cust_1"),
+            create_order("order_2", "cust_2"),
+            create_order("order_3", "cust_1"),
+        ])
+        
+        assert [order.id for order in order_repository.find_by_customer("cust_1")] == ["order_1", "order_3"]
+        assert [order.id for order in order_repository.find_by_customer("cust_1", limit=1)] == ["order_1"]
+        assert list(order_repository.find_by_customer("missing")) == []
+    
+    def test_customer_change_moves_order(self, order_repository):
+        """Тест переноса заказа при смене клиента"""
+        order = create_order("order_1", "cust_1")
+        order_repository.save(order)
+        order.customer_id = "cust_2"
+        order_repository.save(order)
+        
+        assert list(order_repository.find_by_customer("cust_1")) == []
+        assert [order.id for order in order_repository.find_by_customer("cust_2")] == ["order_1"]
+    
+    def test_payment_moves_order_between_statuses(self, order_repository):
+        """Тест переноса заказа между статусами при оплате"""
+        for i in range(3):
+            order_repository.save(create_order(f"order_{i}"))
+        use_case = PayOrderUseCaseImpl(order_repository, FakePaymentGateway(fail_on_orders={"order_2"}))
+        
+        use_case.execute(PayOrderRequest(order_id="order_0"))
+        use_case.execute(PayOrderRequest(order_id="order_2"))
+        
+        created = [order.id for order in order_repository.find_by_status(OrderStatus.CREATED)]
+        paid = [order.id for order in order_repository.find_by_status(OrderStatus.PAID)]
+        assert created == ["order_1", "order_2"]
+        assert paid == ["order_0"]
+        assert list(order_repository.find_by_status(OrderStatus.CANCELLED)) == []
+    
+    def test_outstanding_sweep(self, order_repository):
+        """Тест оплаты всех неоплаченных заказов во время обхода"""
+        order_repository.save_many(create_order(f"order_{i}") for i in range(10))
+        use_case = PayOrdersBatchUseCaseImpl(order_repository, FakePaymentGateway(), batch_size=4)
+        
+        responses = use_case.execute(
+            PayOrderRequest(order_id=order.id)
+            for order in order_repository.find_by_status(OrderStatus.CREATED)
+        )
+        
+        assert len(responses) == 10
+        assert all(response.success for response in responses)
+        assert list(order_repository.find_by_status(OrderStatus.CREATED)) == []
+        assert len(list(order_repository.find_by_status(OrderStatus.PAID, limit=3))) == 3
+
+
+class TestInMemoryOrderRepositoryQueries:
+    """Тесты для поиска в репозитории, хранящем сами экземпляры заказов"""
+    
+    def test_limit_applies_after_stale_entries(self):
+        """Тест: заказ со статусом, измененным без save, не укорачивает страницу"""
+        repository = InMemoryOrderRepository()
+        orders = [create_order(f"order_{i}") for i in range(3)]
+        repository.save_many(orders)
+        orders[0].pay()
+        
+        created = [order.id for order in repository.find_by_status(OrderStatus.CREATED, limit=2)]
+        
+        assert created == ["order_1", "order_2"]
+
+
+class TestFileOrderRepositoryIndexes:
+    """Тесты для восстановления вторичных индексов файлового репозитория"""
+    
+    def test_indexes_survive_reopen(self, tmp_path):
+        """Тест восстановления индексов из контрольной точки и журнала"""
+        with FileOrderRepository(str(tmp_path)) as repository:
+            repository.save(create_order("order_1", "cust_1"))
+            repository.save(create_order("order_2", "cust_2"))
+        
+        with FileOrderRepository(str(tmp_path)) as repository:
+            # Запись статуса после контрольной точки
+            order = repository.get_by_id("order_1")
+            order.pay()
+            repository.save(order)
+        
+        with open(tmp_path / FileOrderRepository.CHECKPOINT_FILE, "w") as checkpoint:
+            json.dump({"generation": "stale"}, checkpoint)
+        
+        repository = FileOrderRepository(str(tmp_path))
+        assert [order.id for order in repository.find_by_status(OrderStatus.PAID)] == ["order_1"]
+        assert [order.id for order in repository.find_by_customer("cust_2")] == ["order_2"]
+        repository.close()
@@ -5,16 +5,35 @@ from src.domain.value_objects import Money
 from src.application.use_cases import PayOrderUseCaseImpl
 from src.application.dto import PayOrderRequest
 from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.repositories.concurrent_in_memory_order_repository import (
+    ConcurrentInMemoryOrderRepository
+)
+from src.infrastructure.repositories.file_order_repository import FileOrderRepository
+from src.infrastructure.repositories.sqlite_order_repository import SQLiteOrderRepository
+from src.infrastructure.repositories.caching_order_repository import CachingOrderRepository
 from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
 
 
 class TestPayOrderUseCase:
     """Тесты для Use Case оплаты заказа"""
     
-    @pytest.fixture
-    def order_repository(self):
-        """Фикстура репозитория заказов"""
-        return InMemoryOrderRepository()
+    @pytest.fixture(params=["in_memory", "concurrent", "file", "sqlite", "caching"])
+    def order_repository(self, request, tmp_path):
+        """Фикстура репозитория заказов (все реализации проходят одни тесты)"""
+        if request.param == "caching":
+            yield CachingOrderRepository(InMemoryOrderRepository())
+        elif request.param == "file":
+            repository = FileOrderRepository(str(tmp_path))
+            yield repository
+            repository.close()
+        elif request.param == "sqlite":
+            repository = SQLiteOrderRepository(str(tmp_path / "orders.db"))
+            yield repository
+            repository.close()
+        elif request.param == "concurrent":
+            yield ConcurrentInMemoryOrderRepository()
+        else:
+            yield InMemoryOrderRepository()
     
     @pytest.fixture
     def payment_gateway(self):
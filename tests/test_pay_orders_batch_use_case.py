@@ -0,0 +1,131 @@
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.domain.interfaces import PaymentGateway
+from src.application.use_cases import PayOrdersBatchUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class SingleChargeGateway(PaymentGateway):
+    """Шлюз без нативного пакетного API"""
+
+    def __init__(self, fail_on_orders=None):
+        self.fail_on_orders = fail_on_orders or set()
+        self.charged = []
+
+    def charge(self, order_id, amount):
+        self.charged.append(order_id)
+        return order_id not in self.fail_on_orders
+
+
+class TestPayOrdersBatchUseCase:
+    """Тесты для Use Case пакетной оплаты заказов"""
+
+    @pytest.fixture
+    def order_repository(self):
+        """Фикстура репозитория заказов"""
+        return InMemoryOrderRepository()
+
+    @pytest.fixture
+    def payment_gateway(self):
+        """Фикстура платежного шлюза"""
+        return FakePaymentGateway()
+
+    @pytest.fixture
+    def use_case(self, order_repository, payment_gateway):
+        """Фикстура Use Case"""
+        return PayOrdersBatchUseCaseImpl(order_repository, payment_gateway, batch_size=2)
+
+    def _create_order(self, order_repository, order_id, price='10.00', quantity=1):
+        order = Order(id=order_id, customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", quantity, Money(Decimal(price)))
+        order_repository.save(order)
+        return order
+
+    def test_successful_batch_payment(self, order_repository, payment_gateway, use_case):
+        """Тест успешной оплаты нескольких заказов"""
+        for i in range(5):
+            self._create_order(order_repository, f"order_{i}", quantity=i + 1)
+
+        responses = use_case.execute(PayOrderRequest(order_id=f"order_{i}") for i in range(5))
+
+        assert [r.order_id for r in responses] == [f"order_{i}" for i in range(5)]
+        assert all(r.success for r in responses)
+        assert responses[2].amount_paid == "USD 30.00"
+        assert payment_gateway.get_charges_count() == 5
+        for i in range(5):
+            assert order_repository.get_by_id(f"order_{i}").status == OrderStatus.PAID
+
+    def test_mixed_failures(self, order_repository, payment_gateway, use_case):
+        """Тест ошибок отдельных заказов в пакете"""
+        self._create_order(order_repository, "order_ok")
+        self._create_order(order_repository, "order_declined")
+        order_repository.save(Order(id="order_empty", customer_id="cust_1"))
+        paid = self._create_order(order_repository, "order_paid")
+        paid.pay()
+        payment_gateway.fail_on_orders = {"order_declined"}
+
+        responses = use_case.execute([
+            PayOrderRequest(order_id="order_ok"),
+            PayOrderRequest(order_id="order_declined"),
+            PayOrderRequest(order_id="order_empty"),
+            PayOrderRequest(order_id="order_paid"),
+            PayOrderRequest(order_id="non_existent"),
+        ])
+
+        assert responses[0].success is True
+        assert responses[1].error_message == "Payment failed"
+        assert "Cannot pay empty order" in responses[2].error_message
+        assert "Order is already paid" in responses[3].error_message
+        assert "not found" in responses[4].error_message
+        assert order_repository.get_by_id("order_declined").status == OrderStatus.CREATED
+        # Шлюз вызывается только для заказов, прошедших доменную проверку
+        assert payment_gateway.get_charges_count() == 2
+
+    def test_duplicate_requests_behave_like_sequential(self, order_repository, payment_gateway, use_case):
+        """Тест повторного запроса на тот же заказ внутри пакета"""
+        self._create_order(order_repository, "order_1")
+
+        responses = use_case.execute([
+            PayOrderRequest(order_id="order_1"),
+            PayOrderRequest(order_id="order_1"),
+        ])
+
+        assert responses[0].success is True
+        assert "Order is already paid" in responses[1].error_message
+        assert payment_gateway.get_charges_count() == 1
+
+    def test_fallback_to_single_charge(self, order_repository):
+        """Тест шлюза без пакетного API"""
+        payment_gateway = SingleChargeGateway(fail_on_orders={"order_1"})
+        use_case = PayOrdersBatchUseCaseImpl(order_repository, payment_gateway)
+        self._create_order(order_repository, "order_0")
+        self._create_order(order_repository, "order_1")
+
+        responses = use_case.execute([PayOrderRequest(order_id="order_0"),
+                                      PayOrderRequest(order_id="order_1")])
+
+        assert [r.success for r in responses] == [True, False]
+        assert payment_gateway.charged == ["order_0", "order_1"]
+
+    def test_gateway_exception_rolls_back_chunk(self, order_repository, payment_gateway, use_case):
+        """Тест отката порции при исключении в шлюзе"""
+        def broken_charge_many(charges):
+            raise ConnectionError("gateway is down")
+
+        payment_gateway.charge_many = broken_charge_many
+        self._create_order(order_repository, "order_1")
+
+        responses = use_case.execute([PayOrderRequest(order_id="order_1")])
+
+        assert responses[0].success is False
+        assert "Unexpected error: gateway is down" in responses[0].error_message
+        assert order_repository.get_by_id("order_1").status == OrderStatus.CREATED
+
+    def test_invalid_batch_size(self, order_repository, payment_gateway):
+        """Тест валидации размера порции"""
+        with pytest.raises(ValueError):
+            PayOrdersBatchUseCaseImpl(order_repository, payment_gateway, batch_size=0)
@@ -0,0 +1,221 @@
+import threading
+import time
+import pytest
+from concurrent.futures import CancelledError
+from decimal import Decimal
+from src.domain.entities import Order
+from src.domain.value_objects import Money
+from src.application.dto import PayOrderRequest, PayOrderResponse
+from src.application.interfaces import PayOrderUseCase
+from src.application.metrics import to_prometheus_text
+from src.application.rate_limiter import TokenBucket
+from src.application.scheduler import PaymentScheduler, Priority, SchedulerQueueFullError
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class RecordingUseCase(PayOrderUseCase):
+    """Use case, записывающий порядок выполнения; первый вызов ждет gate"""
+    
+    def __init__(self, block_first=False):
+        self.executed = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.block_first = block_first
+        self.fail_on = set()
+    
+    def execute(self, request):
+        if self.block_first and not self.executed:
+            self.started.set()
+            self.executed.append(request.order_id)
+            self.gate.wait(5)
+        else:
+            self.executed.append(request.order_id)
+        if request.order_id in self.fail_on:
+            raise RuntimeError("boom")
+        return PayOrderResponse(success=True, order_id=request.order_id)
+
+
+class TestTokenBucket:
+    """Тесты для ограничителя частоты"""
+    
+    def test_rate_and_capacity(self, clock):
+        """Тест выдачи маркеров со скоростью rate до capacity"""
+        bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+        
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == pytest.approx(0.1)
+        
+        clock.now = 0.05
+        assert bucket.try_acquire() == pytest.approx(0.05)
+        clock.now = 10.0
+        assert bucket.available() == 2
+        assert bucket.throttled == 2
+    
+    def test_refund(self, clock):
+        """Тест возврата маркера"""
+        bucket = TokenBucket(rate=1, clock=clock)
+        
+        bucket.try_acquire()
+        bucket.refund()
+        
+        assert bucket.try_acquire() == 0
+        assert bucket.acquired == 1
+    
+    def test_acquire_waits_or_times_out(self, clock):
+        """Тест ожидания маркеров с таймаутом"""
+        bucket = TokenBucket(rate=2, clock=clock)
+        bucket.try_acquire()
+        
+        assert bucket.acquire(timeout=0.1, sleep=clock.sleep) is False
+        assert bucket.acquire(sleep=clock.sleep) is True
+        assert clock.now == pytest.approx(0.5)
+    
+    def test_validation(self):
+        """Тест проверки параметров"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+        with pytest.raises(ValueError):
+            TokenBucket(rate=1, capacity=0.5)
+
+
+class TestPaymentScheduler:
+    """Тесты для планировщика оплат"""
+    
+    def test_priority_order(self):
+        """Тест: приоритетные запросы выполняются раньше, внутри приоритета - FIFO"""
+        use_case = RecordingUseCase(block_first=True)
+        
+        with PaymentScheduler(use_case, workers=1) as scheduler:
+            scheduler.submit(PayOrderRequest("first"))
+            assert use_case.started.wait(5)
+            futures = [
+                scheduler.submit(PayOrderRequest("background"), Priority.BACKGROUND),
+                scheduler.submit(PayOrderRequest("normal_1")),
+                scheduler.submit(PayOrderRequest("interactive"), Priority.INTERACTIVE),
+                scheduler.submit(PayOrderRequest("normal_2"), Priority.NORMAL),
+            ]
+            assert scheduler.queue_depth() == 4
+            assert scheduler.queue_depth(Priority.NORMAL) == 2
+            use_case.gate.set()
+            for future in futures:
+                assert future.result(5).success is True
+        
+        assert use_case.executed == ["first", "interactive", "normal_1", "normal_2", "background"]
+    
+    def test_rate_limit(self):
+        """Тест: запросы выполняются не чаще rate в секунду"""
+        use_case = RecordingUseCase()
+        limiter = TokenBucket(rate=50)
+        
+        with PaymentScheduler(use_case, limiter=limiter, workers=4) as scheduler:
+            started = time.monotonic()
+            futures = [scheduler.submit(PayOrderRequest(f"order_{i}")) for i in range(11)]
+            for future in futures:
+                future.result(5)
+            elapsed = time.monotonic() - started
+        
+        # Первый маркер есть сразу, остальные 10 появляются раз в 20 мс
+        assert elapsed >= 0.18
+        assert limiter.acquired == 11
+    
+    def test_expired_in_queue(self):
+        """Тест: запрос с истекшим сроком не выполняется"""
+        use_case = RecordingUseCase(block_first=True)
+        
+        with PaymentScheduler(use_case, workers=1) as scheduler:
+            scheduler.submit(PayOrderRequest("first"))
+            assert use_case.started.wait(5)
+            stale = scheduler.submit(PayOrderRequest("stale"), timeout=0.01)
+            fresh = scheduler.submit(PayOrderRequest("fresh"), timeout=5)
+            time.sleep(0.05)
+            use_case.gate.set()
+            
+            response = stale.result(5)
+            assert fresh.result(5).success is True
+        
+        assert response.success is False
+        assert response.error_message == "Payment request deadline exceeded"
+        assert "stale" not in use_case.executed
+        assert scheduler.stats()["by_priority"]["normal"]["expired"] == 1
+    
+    def test_expired_before_token(self):
+        """Тест: запрос, срок которого наступит раньше маркера, снимается сразу"""
+        use_case = RecordingUseCase()
+        limiter = TokenBucket(rate=0.5)
+        
+        with PaymentScheduler(use_case, limiter=limiter, workers=1) as scheduler:
+            assert scheduler.submit(PayOrderRequest("first")).result(5).success is True
+            started = time.monotonic()
+            
+            response = scheduler.submit(PayOrderRequest("late"), timeout=0.2).result(5)
+        
+        assert response.success is False
+        assert time.monotonic() - started < 1.0
+        assert use_case.executed == ["first"]
+    
+    def test_queue_full(self):
+        """Тест ограничения длины очереди"""
+        use_case = RecordingUseCase(block_first=True)
+        
+        with PaymentScheduler(use_case, workers=1, max_queue_size=1) as scheduler:
+            scheduler.submit(PayOrderRequest("first"))
+            assert use_case.started.wait(5)
+            scheduler.submit(PayOrderRequest("queued"), Priority.BACKGROUND)
+            
+            with pytest.raises(SchedulerQueueFullError):
+                scheduler.submit(PayOrderRequest("rejected"), Priority.BACKGROUND)
+            use_case.gate.set()
+        
+        assert scheduler.stats()["by_priority"]["background"]["rejected"] == 1
+    
+    def test_shutdown_cancels_pending(self):
+        """Тест отмены ожидающих запросов при остановке"""
+        use_case = RecordingUseCase(block_first=True)
+        scheduler = PaymentScheduler(use_case, workers=1)
+        scheduler.submit(PayOrderRequest("first"))
+        assert use_case.started.wait(5)
+        pending = scheduler.submit(PayOrderRequest("pending"))
+        
+        use_case.gate.set()
+        scheduler.shutdown(cancel_pending=True)
+        
+        with pytest.raises(CancelledError):
+            pending.result(5)
+        with pytest.raises(RuntimeError):
+            scheduler.submit(PayOrderRequest("late"))
+    
+    def test_use_case_error_is_propagated(self):
+        """Тест передачи исключения Use Case вызывающему"""
+        use_case = RecordingUseCase()
+        use_case.fail_on.add("order_1")
+        
+        with PaymentScheduler(use_case, workers=1) as scheduler:
+            future = scheduler.submit(PayOrderRequest("order_1"))
+            with pytest.raises(RuntimeError):
+                future.result(5)
+        
+        assert scheduler.stats()["by_priority"]["normal"]["failed"] == 1
+    
+    def test_execute_through_scheduler(self):
+        """Тест: планировщик заменяет Use Case для вызывающего"""
+        repository = InMemoryOrderRepository()
+        order = Order("order_1", "cust_1")
+        order.add_line("prod_1", "Product 1", 2, Money(Decimal("10.00")))
+        repository.save(order)
+        use_case = PayOrderUseCaseImpl(repository, FakePaymentGateway())
+        
+        with PaymentScheduler(use_case, limiter=TokenBucket(rate=100), workers=2) as scheduler:
+            response = scheduler.execute(PayOrderRequest("order_1"))
+            stats = scheduler.stats()
+        
+        assert response.success is True
+        assert response.amount_paid == "USD 20.00"
+        assert stats["depth"] == 0
+        assert stats["by_priority"]["normal"]["completed"] == 1
+        assert stats["by_priority"]["normal"]["wait_avg_seconds"] >= 0
+        text = to_prometheus_text(scheduler.registry)
+        assert 'payment_scheduler_requests_total{priority="normal",outcome="completed"} 1.0' in text
+        assert "payment_scheduler_wait_seconds_count" in text
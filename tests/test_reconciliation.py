@@ -0,0 +1,182 @@
+import os
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money, MoneyBag
+from src.application.dto import PayOrderRequest
+from src.application.reconciliation import MismatchKind, Reconciler, TruncatedChargeLogError
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.charge_log import ChargeLog
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.serialization.order_codec import OrderSnapshot, encode_order
+
+
+def create_order(order_id, amount="10.00", currency="USD", paid=True):
+    order = Order(id=order_id, customer_id="cust_1")
+    order.add_line("prod_1", "Product 1", 1, Money(Decimal(amount), currency))
+    if paid:
+        order.pay()
+    return order
+
+
+def charge(order_id, amount="10.00", currency="USD", success=True):
+    return order_id, Money(Decimal(amount), currency), success
+
+
+class TestReconciler:
+    """Тесты для сверки заказов с журналом платежей"""
+    
+    def test_all_orders_matched(self):
+        """Тест сверки без расхождений"""
+        orders = [create_order(f"order_{i}") for i in range(10)]
+        charges = [charge(f"order_{i}") for i in range(10)]
+        
+        report = Reconciler(partitions=4).reconcile(orders, charges)
+        
+        assert report.ok
+        assert report.orders_checked == 10
+        assert report.paid_orders == 10
+        assert report.charges_checked == 10
+        assert report.matched == 10
+        assert report.samples == []
+    
+    def test_detects_each_mismatch_kind(self):
+        """Тест всех видов расхождений"""
+        orders = [
+            create_order("missing"),
+            create_order("double"),
+            create_order("amount"),
+            create_order("created", paid=False),
+            create_order("ok"),
+        ]
+        charges = [
+            charge("double"), charge("double"),
+            charge("amount", "9.99"),
+            charge("created"),
+            charge("unknown"),
+            charge("ok"),
+        ]
+        
+        report = Reconciler(partitions=3).reconcile(orders, charges)
+        
+        kinds = {mismatch.order_id: mismatch.kind for mismatch in report.samples}
+        assert kinds == {
+            "missing": MismatchKind.MISSING_CHARGE,
+            "double": MismatchKind.DOUBLE_CHARGE,
+            "amount": MismatchKind.AMOUNT_MISMATCH,
+            "created": MismatchKind.ORPHANED_CHARGE,
+            "unknown": MismatchKind.ORPHANED_CHARGE,
+        }
+        assert report.mismatches[MismatchKind.ORPHANED_CHARGE] == 2
+        assert report.matched == 1
+        assert not report.ok
+        
+        by_id = {mismatch.order_id: mismatch for mismatch in report.samples}
+        assert by_id["amount"].expected == MoneyBag([Money(Decimal("10.00"))])
+        assert by_id["amount"].charged == (Money(Decimal("9.99")),)
+        assert by_id["created"].status == OrderStatus.CREATED
+        assert by_id["unknown"].status is None
+        assert by_id["unknown"].expected is None
+    
+    def test_failed_charges_are_only_counted(self):
+        """Тест: неуспешные списания не участвуют в сверке"""
+        orders = [create_order("order_1")]
+        charges = [charge("order_1", success=False), charge("order_1"), charge("order_2", success=False)]
+        
+        report = Reconciler().reconcile(orders, charges)
+        
+        assert report.ok
+        assert report.failed_charges == 2
+        assert report.charges_checked == 3
+    
+    def test_amounts_compared_by_value_and_currency(self):
+        """Тест: 10.5 равно 10.50, но не 10.50 в другой валюте"""
+        orders = [create_order("order_1", "10.50"), create_order("order_2", "10.50")]
+        charges = [charge("order_1", "10.5"), charge("order_2", "10.50", "EUR")]
+        
+        report = Reconciler().reconcile(orders, charges)
+        
+        assert report.matched == 1
+        assert report.samples[0].order_id == "order_2"
+        assert report.samples[0].kind == MismatchKind.AMOUNT_MISMATCH
+    
+    def test_multi_currency_order_needs_single_charge(self):
+        """Тест заказа в нескольких валютах: одно списание не покрывает заказ"""
+        order = create_order("order_1", paid=False)
+        order.add_line("prod_2", "Product 2", 1, Money(Decimal("5.00"), "EUR"))
+        order.pay()
+        
+        report = Reconciler().reconcile([order], [charge("order_1")])
+        
+        assert report.samples[0].kind == MismatchKind.AMOUNT_MISMATCH
+        assert report.samples[0].expected == order.subtotals
+    
+    def test_spills_partitions_to_disk(self, tmp_path):
+        """Тест выгрузки секций на диск: результат тот же, файлы удаляются"""
+        orders = [create_order(f"order_{i}", f"{i}.00") for i in range(1, 501)]
+        charges = [charge(f"order_{i}", f"{i}.00") for i in range(1, 501) if i % 50]
+        charges += [charge("order_7", "7.00"), charge("order_404", "1.00"), charge("stray", "2.00")]
+        
+        in_memory = Reconciler(partitions=8).reconcile(orders, charges)
+        spilled = Reconciler(partitions=8, max_in_memory=37, spill_dir=str(tmp_path)).reconcile(orders, charges)
+        
+        assert in_memory.spilled_records == 0
+        assert spilled.spilled_records > 0
+        assert spilled.mismatches == in_memory.mismatches
+        assert spilled.matched == in_memory.matched == 500 - 10 - 2
+        assert sorted((m.order_id, m.kind.value, m.charged) for m in spilled.samples) == \
+            sorted((m.order_id, m.kind.value, m.charged) for m in in_memory.samples)
+        assert os.listdir(tmp_path) == []
+    
+    def test_samples_are_capped_but_callback_sees_all(self):
+        """Тест ограничения примеров и потоковой выдачи расхождений"""
+        orders = [create_order(f"order_{i}") for i in range(20)]
+        seen = []
+        
+        report = Reconciler(max_samples=5, on_mismatch=seen.append).reconcile(orders, [])
+        
+        assert report.mismatches[MismatchKind.MISSING_CHARGE] == 20
+        assert len(report.samples) == 5
+        assert sorted(mismatch.order_id for mismatch in seen) == sorted(order.id for order in orders)
+    
+    def test_accepts_snapshots(self):
+        """Тест сверки снимков заказов без полного декодирования"""
+        snapshots = [OrderSnapshot(encode_order(create_order(f"order_{i}"))) for i in range(3)]
+        
+        report = Reconciler().reconcile(snapshots, [charge(f"order_{i}") for i in range(3)])
+        
+        assert report.matched == 3
+    
+    def test_reconcile_repository_with_gateway_log(self):
+        """Тест сверки репозитория с журналом FakePaymentGateway после оплат"""
+        repository = InMemoryOrderRepository()
+        gateway = FakePaymentGateway()
+        use_case = PayOrderUseCaseImpl(repository, gateway)
+        for i in range(5):
+            repository.save(create_order(f"order_{i}", paid=False))
+        for i in range(5):
+            use_case.execute(PayOrderRequest(order_id=f"order_{i}"))
+        gateway.charge("order_3", Money(Decimal("10.00")))
+        
+        report = Reconciler().reconcile_repository(repository, gateway.charges_log)
+        
+        assert report.paid_orders == 5
+        assert report.matched == 4
+        assert [(m.order_id, m.kind) for m in report.samples] == [("order_3", MismatchKind.DOUBLE_CHARGE)]
+    
+    def test_truncated_log_is_rejected(self):
+        """Тест: журнал с отброшенными записями не сверяется"""
+        log = ChargeLog(capacity=2)
+        for i in range(3):
+            log.append(f"order_{i}", Money(Decimal("10.00")), True)
+        
+        with pytest.raises(TruncatedChargeLogError):
+            Reconciler().reconcile([create_order(f"order_{i}") for i in range(3)], log)
+    
+    def test_invalid_arguments(self):
+        """Тест проверки параметров"""
+        with pytest.raises(ValueError):
+            Reconciler(partitions=0)
+        with pytest.raises(ValueError):
+            Reconciler(max_in_memory=0)
@@ -0,0 +1,180 @@
+import time
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.application.dto import PayOrderRequest
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+from src.infrastructure.payment_gateways.resilient_payment_gateway import (
+    BreakerState,
+    CircuitBreaker,
+    CircuitOpenError,
+    GatewayTimeoutError,
+    ResilientPaymentGateway,
+)
+
+
+class FlakyGateway(FakePaymentGateway):
+    """Шлюз, падающий на первых failures вызовах"""
+    
+    def __init__(self, failures, error_type=ConnectionError):
+        super().__init__()
+        self.failures = failures
+        self.error_type = error_type
+        self.calls = 0
+    
+    def charge(self, order_id, amount):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error_type("connection reset")
+        return super().charge(order_id, amount)
+
+
+AMOUNT = Money(Decimal('10.00'))
+
+
+class TestResilientPaymentGateway:
+    """Тесты для шлюза с повторами, таймаутом и предохранителем"""
+    
+    def test_retries_transient_errors_with_backoff(self):
+        """Тест повтора временных ошибок с растущей задержкой"""
+        delays = []
+        gateway = FlakyGateway(failures=2)
+        resilient = ResilientPaymentGateway(gateway, max_retries=2, backoff_base=0.1,
+                                            sleep=delays.append)
+        
+        assert resilient.charge("order_1", AMOUNT) is True
+        assert gateway.calls == 3
+        assert gateway.get_charges_count() == 1
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 0.1 and 0 <= delays[1] <= 0.2
+    
+    def test_gives_up_after_max_retries(self):
+        """Тест исчерпания повторов"""
+        gateway = FlakyGateway(failures=10)
+        resilient = ResilientPaymentGateway(gateway, max_retries=1, sleep=lambda delay: None)
+        
+        with pytest.raises(ConnectionError):
+            resilient.charge("order_1", AMOUNT)
+        assert gateway.calls == 2
+    
+    def test_declines_and_other_errors_are_not_retried(self):
+        """Тест отсутствия повторов для отказа шлюза и невременных ошибок"""
+        declining = FakePaymentGateway(fail_on_orders={"order_1"})
+        resilient = ResilientPaymentGateway(declining, sleep=lambda delay: None)
+        assert resilient.charge("order_1", AMOUNT) is False
+        assert declining.get_charges_count() == 1
+        
+        broken = FlakyGateway(failures=1, error_type=ValueError)
+        resilient = ResilientPaymentGateway(broken, sleep=lambda delay: None)
+        with pytest.raises(ValueError):
+            resilient.charge("order_1", AMOUNT)
+        assert broken.calls == 1
+    
+    def test_timeout(self):
+        """Тест таймаута медленного вызова"""
+        with ResilientPaymentGateway(FakePaymentGateway(latency=0.5), timeout=0.05) as resilient:
+            started = time.perf_counter()
+            with pytest.raises(GatewayTimeoutError):
+                resilient.charge("order_1", AMOUNT)
+            assert time.perf_counter() - started < 0.4
+            assert resilient.breaker.stats()["failure_rate"] == 1.0
+            resilient.shutdown(wait=False)
+    
+    def test_gateway_timeout_error_is_not_relabeled(self):
+        """Тест: TimeoutError самого шлюза не выдается за таймаут ожидания"""
+        gateway = FlakyGateway(failures=1, error_type=TimeoutError)
+        with ResilientPaymentGateway(gateway, timeout=5.0, max_retries=0) as resilient:
+            with pytest.raises(TimeoutError) as error:
+                resilient.charge("order_1", AMOUNT)
+        
+        assert not isinstance(error.value, GatewayTimeoutError)
+        assert str(error.value) == "connection reset"
+    
+    def test_circuit_breaker_opens_and_recovers(self, clock):
+        """Тест размыкания и восстановления предохранителя"""
+        breaker = CircuitBreaker(failure_threshold=0.5, window_size=4, min_calls=4,
+                                 reset_timeout=10, clock=clock)
+        gateway = FakePaymentGateway(error_rate=1.0)
+        resilient = ResilientPaymentGateway(gateway, max_retries=0, breaker=breaker)
+        
+        for _ in range(4):
+            with pytest.raises(ConnectionError):
+                resilient.charge("order_1", AMOUNT)
+        assert breaker.state is BreakerState.OPEN
+        
+        # Разомкнутый предохранитель отклоняет вызов, не обращаясь к шлюзу
+        gateway.error_rate = 0.0
+        with pytest.raises(CircuitOpenError):
+            resilient.charge("order_1", AMOUNT)
+        assert gateway.get_charges_count() == 0
+        assert breaker.stats()["rejected_total"] == 1
+        
+        clock.now = 10
+        assert breaker.state is BreakerState.HALF_OPEN
+        assert resilient.charge("order_1", AMOUNT) is True
+        assert breaker.state is BreakerState.CLOSED
+        assert breaker.stats()["opened_total"] == 1
+    
+    def test_half_open_failure_reopens(self, clock):
+        """Тест повторного размыкания после неудачного пробного вызова"""
+        breaker = CircuitBreaker(window_size=2, min_calls=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+        clock.now = 5
+        
+        assert breaker.allow() is True
+        assert breaker.allow() is False
+        breaker.record_failure()
+        
+        assert breaker.state is BreakerState.OPEN
+        assert breaker.stats()["opened_total"] == 2
+    
+    def test_use_case_with_degraded_gateway(self):
+        """Тест Use Case оплаты с разомкнутым предохранителем"""
+        repository = InMemoryOrderRepository()
+        order = Order(id="order_1", customer_id="cust_1")
+        order.add_line("prod_1", "Product 1", 1, AMOUNT)
+        repository.save(order)
+        breaker = CircuitBreaker(window_size=1, min_calls=1)
+        breaker.record_failure()
+        use_case = PayOrderUseCaseImpl(repository, ResilientPaymentGateway(FakePaymentGateway(), breaker=breaker))
+        
+        response = use_case.execute(PayOrderRequest(order_id="order_1"))
+        
+        assert response.success is False
+        assert "circuit breaker is open" in response.error_message
+        assert repository.get_by_id("order_1").status == OrderStatus.CREATED
+
+
+class TestFakePaymentGatewayFaults:
+    """Тесты для имитации задержек и сбоев в FakePaymentGateway"""
+    
+    def test_error_injection(self):
+        """Тест доли имитируемых сбоев"""
+        gateway = FakePaymentGateway(error_rate=0.3, seed=1)
+        errors = 0
+        for i in range(1000):
+            try:
+                gateway.charge(f"order_{i}", AMOUNT)
+            except ConnectionError:
+                errors += 1
+        
+        assert 250 < errors < 350
+        assert gateway.get_charges_count() == 1000 - errors
+    
+    def test_latency_injection(self):
+        """Тест имитируемой задержки"""
+        gateway = FakePaymentGateway(latency=0.02)
+        started = time.perf_counter()
+        gateway.charge("order_1", AMOUNT)
+        
+        assert time.perf_counter() - started >= 0.02
+    
+    def test_invalid_parameters(self):
+        """Тест невалидных параметров имитации"""
+        with pytest.raises(ValueError):
+            FakePaymentGateway(error_rate=1.5)
+        with pytest.raises(ValueError):
+            FakePaymentGateway(latency=-1)
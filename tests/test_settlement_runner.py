@@ -0,0 +1,106 @@
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.application.dto import PayOrderRequest
+from src.application.reconciliation import TruncatedChargeLogError
+from src.application.settlement import ProcessSettlementRunner, SettlementContextFactory, shard_for
+from src.infrastructure.repositories.sqlite_order_repository import SQLiteOrderRepository
+from src.infrastructure.payment_gateways.charge_log import ChargeLog
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+class SQLiteSettlementFactory(SettlementContextFactory):
+    """Фабрика с общей базой SQLite для всех процессов"""
+    
+    def __init__(self, path, fail_on_orders=()):
+        self.path = path
+        self.fail_on_orders = set(fail_on_orders)
+    
+    def create(self, shard, shards):
+        return SQLiteOrderRepository(self.path, pool_size=1), FakePaymentGateway(self.fail_on_orders)
+    
+    def release(self, repository, gateway):
+        repository.close()
+
+
+class BrokenFactory(SettlementContextFactory):
+    """Фабрика, падающая при создании контекста"""
+    
+    def create(self, shard, shards):
+        raise RuntimeError("storage unavailable")
+
+
+class TestProcessSettlementRunner:
+    """Тесты для многопроцессного расчета заказов"""
+    
+    @pytest.fixture
+    def database(self, tmp_path):
+        """Фикстура базы с 40 заказами по 1.50 USD"""
+        path = str(tmp_path / "orders.db")
+        with SQLiteOrderRepository(path) as repository:
+            orders = []
+            for i in range(40):
+                order = Order(id=f"order_{i}", customer_id="cust_1")
+                order.add_line("prod_1", "Product 1", 1, Money(Decimal('1.50')))
+                orders.append(order)
+            repository.save_many(orders)
+        return path
+    
+    def test_pays_all_orders_across_workers(self, database):
+        """Тест оплаты всех заказов с сохранением порядка ответов"""
+        runner = ProcessSettlementRunner(SQLiteSettlementFactory(database, {"order_7"}), workers=3)
+        requests = [PayOrderRequest(order_id=f"order_{i}") for i in range(40)]
+        
+        result = runner.run(requests)
+        
+        assert [response.order_id for response in result.responses] == [f"order_{i}" for i in range(40)]
+        assert sum(response.success for response in result.responses) == 39
+        assert result.responses[7].error_message == "Payment failed"
+        assert len(result.charges) == 40
+        assert sorted(shard.shard for shard in result.shards) == [0, 1, 2]
+        with SQLiteOrderRepository(database) as repository:
+            assert repository.get_by_id("order_0").status == OrderStatus.PAID
+            assert repository.get_by_id("order_7").status == OrderStatus.CREATED
+    
+    def test_duplicate_requests_are_charged_once(self, database):
+        """Тест однократного списания при повторных запросах"""
+        runner = ProcessSettlementRunner(SQLiteSettlementFactory(database), workers=4)
+        requests = [PayOrderRequest(order_id=f"order_{i % 10}") for i in range(30)]
+        
+        result = runner.run(requests)
+        
+        charged = [charge['order_id'] for charge in result.charges if charge['success']]
+        assert sorted(charged) == sorted(f"order_{i}" for i in range(10))
+        assert sum(response.success for response in result.responses) == 10
+        assert result.responses[10].error_message == "Order is already paid"
+    
+    def test_failed_shard_is_not_retried(self):
+        """Тест ответа с ошибкой для шарда с упавшим обработчиком"""
+        runner = ProcessSettlementRunner(BrokenFactory(), workers=2)
+        
+        result = runner.run([PayOrderRequest(order_id="order_1")])
+        
+        assert result.responses[0].success is False
+        assert "storage unavailable" in result.responses[0].error_message
+        assert result.charges == []
+    
+    def test_truncated_charge_log_is_rejected(self):
+        """Тест: журнал шлюза с отброшенными записями не собирается"""
+        gateway = FakePaymentGateway()
+        gateway.charges_log = ChargeLog(capacity=1)
+        gateway.charge("order_1", Money(Decimal('1.50')))
+        gateway.charge("order_2", Money(Decimal('1.50')))
+        
+        with pytest.raises(TruncatedChargeLogError):
+            BrokenFactory().collect_charges(gateway)
+    
+    def test_shard_is_stable(self):
+        """Тест стабильного распределения заказов по шардам"""
+        assert shard_for("order_1", 8) == shard_for("order_1", 8)
+        assert {shard_for(f"order_{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+    
+    def test_invalid_workers(self):
+        """Тест невалидного числа процессов"""
+        with pytest.raises(ValueError):
+            ProcessSettlementRunner(BrokenFactory(), workers=0)
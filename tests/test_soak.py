@@ -0,0 +1,145 @@
+import json
+import pytest
+from benchmarks.soak import (
+    DeclinedOrders,
+    LatencyHistogram,
+    WindowStats,
+    Workload,
+    WorkloadParams,
+    classify,
+    main,
+    memory_growth_per_minute,
+    run_soak,
+)
+from src.application.dto import PayOrderResponse
+from src.application.use_cases import PayOrderUseCaseImpl
+from src.infrastructure.repositories.in_memory_order_repository import InMemoryOrderRepository
+from src.infrastructure.payment_gateways.fake_payment_gateway import FakePaymentGateway
+
+
+def create_setup(**params):
+    repository = InMemoryOrderRepository()
+    workload = Workload(WorkloadParams(**params), repository)
+    gateway = FakePaymentGateway(fail_on_orders=workload.declined)
+    return workload, PayOrderUseCaseImpl(repository, gateway), repository
+
+
+def window(offset, memory):
+    return WindowStats(offset, 0, 0.0, 0.0, 0.0, 0.0, 0.0, memory, {})
+
+
+class TestSoakHarness:
+    """Тесты для нагрузочного прогона оплаты"""
+    
+    def test_classify_outcomes(self):
+        """Тест разбора исходов по ответу"""
+        def failed(message):
+            return PayOrderResponse(success=False, order_id="order_1", error_message=message)
+        
+        assert classify(PayOrderResponse(success=True, order_id="order_1")) == "success"
+        assert classify(failed("Payment failed")) == "payment_declined"
+        assert classify(failed("Order is already paid")) == "already_paid"
+        assert classify(failed("Cannot pay empty order")) == "empty_order"
+        assert classify(failed("Order order_1 not found")) == "order_not_found"
+        assert classify(failed("Unexpected error: boom")) == "unexpected_error"
+        assert classify(None) == "exception"
+    
+    def test_histogram_percentiles(self):
+        """Тест: перцентили гистограммы в пределах 2% от точных"""
+        histogram = LatencyHistogram()
+        for i in range(1, 10001):
+            histogram.observe(i / 1e6)
+        
+        assert histogram.count == 10000
+        assert histogram.percentile(0.5) == pytest.approx(5000 / 1e6, rel=0.02)
+        assert histogram.percentile(0.99) == pytest.approx(9900 / 1e6, rel=0.02)
+        assert histogram.percentile(1.0) == histogram.max == 10000 / 1e6
+        assert LatencyHistogram().percentile(0.5) == 0.0
+    
+    def test_workload_mix(self):
+        """Тест: поток содержит новые заказы, пустые заказы, дубли и повторы"""
+        workload, use_case, repository = create_setup(
+            empty_rate=0.1, duplicate_rate=0.1, decline_rate=0.1, retry_rate=1.0, seed=1,
+        )
+        kinds, outcomes = {}, {}
+        for _ in range(500):
+            kind, request = workload.next_request()
+            response = use_case.execute(request)
+            workload.record(request, response)
+            kinds[kind] = kinds.get(kind, 0) + 1
+            outcomes[classify(response)] = outcomes.get(classify(response), 0) + 1
+        
+        assert set(kinds) == {"new", "duplicate", "retry"}
+        assert {"success", "empty_order", "already_paid", "payment_declined"} <= set(outcomes)
+        assert workload.created == kinds["new"]
+        orders = [repository.get_by_id(f"soak_{i}") for i in range(workload.created)]
+        hot = sum(1 for order in orders if int(order.customer_id[5:]) < 50)
+        assert 0.2 < hot / len(orders) < 0.45
+    
+    def test_declined_orders_are_hashed(self):
+        """Тест: отклоняемые заказы определяются хешем ID без хранения"""
+        declined = DeclinedOrders(0.1, seed=7)
+        ids = [f"soak_{i}" for i in range(10000)]
+        
+        hits = [order_id for order_id in ids if order_id in declined]
+        
+        assert 0.08 < len(hits) / len(ids) < 0.12
+        assert hits == [order_id for order_id in ids if order_id in DeclinedOrders(0.1, seed=7)]
+        assert not any(order_id in DeclinedOrders(0.0) for order_id in ids)
+    
+    def test_closed_loop_run(self):
+        """Тест замкнутого цикла с ограничением числа запросов"""
+        workload, use_case, _ = create_setup()
+        windows = []
+        
+        report = run_soak(use_case, workload, duration=10, concurrency=3, interval=0.05,
+                          max_requests=300, on_window=windows.append)
+        
+        assert report["requests"] == 300
+        assert sum(report["outcomes"].values()) == 300
+        assert sum(window.requests for window in windows) == 300
+        assert report["params"]["mode"] == "closed"
+        result = report["results"]["soak"]
+        assert result["ops_per_sec"] > 0
+        assert result["p99_us"] >= result["p50_us"] > 0
+        assert report["memory"]["start_kb"] > 0
+    
+    def test_open_loop_keeps_rate(self):
+        """Тест открытого цикла: запросы подаются с заданной частотой"""
+        workload, use_case, _ = create_setup()
+        
+        report = run_soak(use_case, workload, duration=0.5, rate=200, concurrency=2, interval=0.1)
+        
+        assert report["params"]["mode"] == "open"
+        assert 90 <= report["requests"] <= 100
+        assert report["results"]["soak"]["ops_per_sec"] == pytest.approx(200, rel=0.3)
+    
+    def test_memory_growth_slope(self):
+        """Тест прироста памяти по окнам без учета прогрева"""
+        windows = [window(0, 5000)] + [window(t, 1000 + 10 * t) for t in range(1, 6)]
+        
+        assert memory_growth_per_minute(windows, warmup=1) == pytest.approx(600)
+        assert memory_growth_per_minute(windows[:2], warmup=1) == 0.0
+    
+    def test_invalid_arguments(self):
+        """Тест проверки параметров"""
+        workload, use_case, _ = create_setup()
+        
+        with pytest.raises(ValueError):
+            run_soak(use_case, workload, duration=1, concurrency=0)
+        with pytest.raises(ValueError):
+            run_soak(use_case, workload, duration=1, rate=0)
+    
+    def test_cli_saves_report_and_flags_memory_growth(self, tmp_path, capsys):
+        """Тест запуска из командной строки"""
+        output = tmp_path / "soak.json"
+        
+        code = main(["--duration", "5", "--max-requests", "200", "--concurrency", "2",
+                     "--interval", "0.05", "--repository", "sqlite", "--warmup", "0",
+                     "--max-memory-growth=-1e9", "--output", str(output)])
+        
+        report = json.loads(output.read_text())
+        assert report["requests"] == 200
+        assert report["windows"]
+        assert code == 1
+        assert "REGRESSION memory growth" in capsys.readouterr().err
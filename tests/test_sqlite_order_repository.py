@@ -0,0 +1,82 @@
+import threading
+import pytest
+from decimal import Decimal
+from src.domain.entities import Order, OrderStatus
+from src.domain.value_objects import Money
+from src.infrastructure.repositories.sqlite_order_repository import SQLiteOrderRepository
+
+
+class TestSQLiteOrderRepository:
+    """Тесты для репозитория заказов на SQLite"""
+    
+    @pytest.fixture
+    def order_repository(self, tmp_path):
+        """Фикстура репозитория заказов"""
+        repository = SQLiteOrderRepository(str(tmp_path / "orders.db"), pool_size=4)
+        yield repository
+        repository.close()
+    
+    def _create_order(self, order_id, lines=2):
+        order = Order(id=order_id, customer_id="cust_1")
+        for i in range(lines):
+            order.add_line(f"prod_{i}", f"Product {i}", i + 1, Money(Decimal('0.10'), "EUR"))
+        return order
+    
+    def test_save_and_load(self, order_repository):
+        """Тест сохранения и загрузки заказа с линиями"""
+        order = self._create_order("order_1", lines=3)
+        order_repository.save(order)
+        order.remove_line("prod_0")
+        order.pay()
+        order_repository.save(order)
+        
+        loaded = order_repository.get_by_id("order_1")
+        
+        assert loaded.status == OrderStatus.PAID
+        assert loaded.lines == order.lines
+        assert loaded.total_amount == Money(Decimal('0.50'), "EUR")
+        assert loaded.version == 2
+        assert order_repository.get_by_id("missing") is None
+    
+    def test_bulk_save_and_get_many(self, order_repository):
+        """Тест пакетного сохранения и чтения"""
+        orders = [self._create_order(f"order_{i}", lines=i % 4) for i in range(1500)]
+        
+        order_repository.save_many(orders)
+        loaded = order_repository.get_many([f"order_{i}" for i in range(1500)] + ["missing"])
+        
+        assert len(loaded) == 1500
+        assert "missing" not in loaded
+        assert loaded["order_7"].lines == orders[7].lines
+        assert loaded["order_8"].lines == ()
+    
+    def test_save_many_is_atomic(self, order_repository):
+        """Тест отката пакетного сохранения при ошибке"""
+        broken = self._create_order("order_2")
+        broken.customer_id = None
+        
+        with pytest.raises(Exception):
+            order_repository.save_many([self._create_order("order_1"), broken])
+        
+        assert order_repository.get_by_id("order_1") is None
+    
+    def test_concurrent_access_from_threads(self, order_repository):
+        """Тест работы пула соединений из нескольких потоков"""
+        errors = []
+        
+        def worker(start):
+            try:
+                for i in range(start, start + 50):
+                    order_repository.save(self._create_order(f"order_{i}"))
+                    assert order_repository.get_by_id(f"order_{i}") is not None
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=worker, args=(n * 50,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert len(order_repository.get_many(f"order_{i}" for i in range(400))) == 400